@@ -1,6 +1,6 @@
 # app/api/deps.py
 from typing import Generator, Optional # Adicione Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 # from fastapi.security import OAuth2PasswordBearer # Para pegar o token do header Authorization
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials 
 from sqlalchemy.orm import Session
@@ -22,6 +22,8 @@ from app.services import user_service # Para buscar o usuário
 # De: reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/login")
 # Para:
 reusable_oauth2 = HTTPBearer(description="Insira o token Bearer JWT aqui para autorização")
+# Para streams (SSE): o EventSource do navegador não envia headers, então o token também pode vir na query
+optional_oauth2 = HTTPBearer(auto_error=False)
 
 def get_db() -> Generator:
     try:
@@ -50,7 +52,9 @@ async def get_current_user( # Adicionar async é uma boa prática
         raise credentials_exception
 
     token = http_credentials.credentials # Extrai o token da parte "Bearer <token>"
-    
+    return _user_from_token(db, token=token, credentials_exception=credentials_exception)
+
+def _user_from_token(db: Session, *, token: str, credentials_exception: HTTPException) -> User:
     try:
         user_email = security.verify_token_and_get_subject(
             token=token, credentials_exception=credentials_exception
@@ -74,6 +78,42 @@ def get_current_active_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
     return current_user
 
+async def get_current_active_user_for_stream(
+    db: Session = Depends(get_db),
+    http_credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_oauth2),
+    access_token: Optional[str] = Query(None, description="Token JWT, para clientes que não enviam headers (EventSource)")
+) -> User:
+    """
+    Como get_current_active_user, mas aceita o token no header Authorization ou em ?access_token=.
+    Usada apenas nos endpoints de stream.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if http_credentials is not None and http_credentials.scheme.lower() == "bearer":
+        token = http_credentials.credentials
+    elif access_token:
+        token = access_token
+    else:
+        raise credentials_exception
+    user = _user_from_token(db, token=token, credentials_exception=credentials_exception)
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
+    return user
+
+def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    """
+    Dependência para endpoints de administração da plataforma (diagnóstico, profiling).
+    Só passa quem estiver na lista ADMIN_EMAILS; os demais recebem 403.
+    """
+    if current_user.email.lower() not in settings.admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso restrito a administradores.")
+    return current_user
+
 """
 O que este código faz:
 - get_db(): Esta função cria uma dependência que fornece uma sessão do banco de dados. Ela é usada para garantir que a sessão seja fechada corretamente após o uso.     
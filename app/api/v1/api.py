@@ -3,6 +3,15 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import auth_router, service_router, establishment_router, appointment_router
 from app.api.v1.endpoints import user_router
 from app.api.v1.endpoints import auth_router, user_router, establishment_router, service_router, appointment_router, professional_router # Adicione professional_router
+from app.api.v1.endpoints import admin_router
+from app.api.v1.endpoints import customer_router
+from app.api.v1.endpoints import search_router
+from app.api.v1.endpoints import schedule_exception_router
+from app.api.v1.endpoints import event_router
+from app.api.v1.endpoints import appointment_series_router
+from app.api.v1.endpoints import appointment_event_router
+from app.api.v1.endpoints import stats_router
+from app.api.v1.endpoints import waitlist_router
 
 api_router = APIRouter()
 api_router.include_router(auth_router.router, prefix="/auth", tags=["Auth"])
@@ -25,4 +34,13 @@ api_router.include_router(professional_router.router, tags=["Professionals"])
 # podemos incluir o router sem um prefixo global para ele aqui, ou com um prefixo que não conflite.
 # Por agora, vamos manter as rotas como definidas no appointment_router.
 # O FastAPI é inteligente para montar as rotas.
-api_router.include_router(appointment_router.router, tags=["Appointments"]) # Adicionando tags para organização no /docs
\ No newline at end of file
+api_router.include_router(appointment_router.router, tags=["Appointments"]) # Adicionando tags para organização no /docs
+api_router.include_router(appointment_series_router.router, tags=["Appointment Series"])
+api_router.include_router(appointment_event_router.router, tags=["Appointment Events"])
+api_router.include_router(stats_router.router, tags=["Stats"])
+api_router.include_router(waitlist_router.router, tags=["Waitlist"])
+api_router.include_router(customer_router.router, tags=["Customers"])
+api_router.include_router(search_router.router, tags=["Search"])
+api_router.include_router(schedule_exception_router.router, tags=["Schedule Exceptions"])
+api_router.include_router(event_router.router, tags=["Events"])
+api_router.include_router(admin_router.router, prefix="/admin", tags=["Admin"])
@@ -0,0 +1,71 @@
+# Este arquivo é o router de administração da plataforma (diagnóstico de performance).
+# Todos os endpoints exigem um usuário listado em ADMIN_EMAILS.
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import HTMLResponse
+from typing import List, Literal
+
+from app.api import deps
+from app.models.user_model import User
+from app.schemas.admin_schema import SlowQueryEntry, ProfileSummary, ProfileDetail
+from app.core.slow_query_log import slow_query_log
+from app.core import profiling
+
+router = APIRouter()
+
+@router.get("/slow-queries", response_model=List[SlowQueryEntry])
+def list_slow_queries(
+    *,
+    limit: int = 50,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """
+    Lista as queries lentas capturadas por este worker (mais recentes primeiro),
+    com parâmetros mascarados, rota de origem e plano do EXPLAIN.
+    """
+    return slow_query_log.entries(limit=limit)
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(
+    *,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Esvazia o buffer de queries lentas (e o cache de planos) deste worker."""
+    slow_query_log.clear()
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def list_profiles(
+    *,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """
+    Lista os perfis capturados neste worker (mais recentes primeiro).
+    Para capturar, repita a requisição desejada com o header `X-Profile: 1` e um token de administrador.
+    """
+    return [profiling.summary(session) for session in profiling.profile_store.list()]
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail, responses={200: {"content": {"text/html": {}, "application/octet-stream": {}}}})
+def read_profile(
+    *,
+    profile_id: str,
+    format: Literal["json", "html", "pstats"] = "json",
+    sort: Literal["cumulative", "total"] = "cumulative",
+    limit: int = 50,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """
+    Retorna um perfil: `json` (funções mais caras), `html` (tabela para o navegador)
+    ou `pstats` (arquivo para snakeviz/pstats).
+    """
+    session = profiling.profile_store.get(profile_id)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil não encontrado (pode ter sido descartado ou capturado por outro worker).")
+
+    if format == "html":
+        return HTMLResponse(profiling.render_html(session, limit=limit, sort_by=sort))
+    if format == "pstats":
+        return Response(
+            content=profiling.dump_pstats(session),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{session.id}.pstats"'},
+        )
+    return {**profiling.summary(session), "functions": profiling.top_functions(session, limit=limit, sort_by=sort)}
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.api import deps
+from app.models.user_model import User
+from app.schemas.appointment_event_schema import AppointmentEvent
+from app.services import appointment_archive_service, appointment_service, audit_service, establishment_service
+
+router = APIRouter()
+
+@router.get("/appointments/{appointment_id}/events", response_model=List[AppointmentEvent])
+def read_appointment_timeline(
+    *,
+    db: Session = Depends(deps.get_db),
+    appointment_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Histórico do agendamento (criação e mudanças de status, com quem mudou e de onde), do mais
+    antigo ao mais recente. Continua disponível depois que o agendamento vai para o arquivo frio.
+    Agendamentos anteriores ao histórico existem sem eventos: a lista vem vazia.
+    """
+    events = audit_service.get_appointment_timeline(db, appointment_id=appointment_id)
+    if events:
+        establishment_id = events[0].establishment_id
+    else:
+        appointment = appointment_service.get_appointment(db, appointment_id=appointment_id)
+        if appointment is None:
+            appointment = appointment_archive_service.find_archived_appointment(db, appointment_id=appointment_id)
+        if appointment is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agendamento não encontrado")
+        establishment_id = appointment.establishment_id
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para ver este agendamento"
+        )
+    return events
+
+@router.get("/establishments/{establishment_id}/appointment-events", response_model=List[AppointmentEvent])
+def read_establishment_timeline(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    before_id: Optional[int] = None, # Paginação: id do último evento da página anterior
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Eventos de todos os agendamentos do estabelecimento, mais recentes primeiro."""
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para ver os agendamentos deste estabelecimento"
+        )
+    return audit_service.get_establishment_timeline(db, establishment_id=establishment_id, before_id=before_id, limit=limit)
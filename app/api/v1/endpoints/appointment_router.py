@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date, time # Para os filtros de data
+from datetime import date, datetime, time # Para os filtros de data
 
 from app.api import deps
+from app.db.session import SessionLocal
 from app.models.user_model import User
-from app.schemas.appointment_schema import Appointment as AppointmentSchema, AppointmentCreate, AppointmentStatus, AppointmentStatusUpdate # Nossos schemas
-from app.services import appointment_service, establishment_service # Nossos serviços
+from app.schemas.appointment_schema import AllowedStatuses, Appointment as AppointmentSchema, AppointmentBulkCreate, AppointmentCreate, AppointmentStatus, AppointmentStatusBulkUpdate, AppointmentStatusUpdate, BulkOperationResult, MAX_BULK_ITEMS, NextAvailableSlot # Nossos schemas
+from app.services import appointment_service, availability_service, establishment_service # Nossos serviços
 
 # Importa o modelo AppointmentModel para evitar conflito de nome com o schema Appointment
 from app.models.appointment_model import Appointment as AppointmentModel
 
-from app.services import status_validation_service # Novo import
 from app.services.status_validation_service import StatusTransitionError # Importa a exceção customizada
 
 router = APIRouter()
@@ -48,6 +49,81 @@ def create_new_appointment(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Ocorreu um erro ao processar sua solicitação.")
 
 
+def _bulk_response(results: List[dict]) -> BulkOperationResult:
+    succeeded = sum(1 for result in results if result["success"])
+    return BulkOperationResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+@router.post("/establishments/{establishment_id}/appointments/bulk", response_model=BulkOperationResult)
+def create_appointments_in_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    bulk_in: AppointmentBulkCreate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Cria até MAX_BULK_ITEMS agendamentos de uma vez (ex: importação de outra ferramenta).
+    Cada item tem seu resultado; os que falham (horário ocupado, serviço inválido) não impedem os demais.
+    Apenas membros do estabelecimento.
+    """
+    db_establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+    if not db_establishment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para criar agendamentos neste estabelecimento"
+        )
+    try:
+        results = appointment_service.create_appointments_bulk(
+            db, items=bulk_in.items, establishment_id=establishment_id, actor_user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _bulk_response(results)
+
+@router.patch("/establishments/{establishment_id}/appointments/status", response_model=BulkOperationResult)
+def update_appointment_statuses_in_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    bulk_in: AppointmentStatusBulkUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Atualiza o status de até MAX_BULK_ITEMS agendamentos do estabelecimento (ex: fechamento do dia),
+    com as mesmas regras do endpoint individual. Cada item tem seu resultado.
+    """
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para modificar os agendamentos deste estabelecimento"
+        )
+    results = appointment_service.update_appointment_statuses_bulk(
+        db, items=bulk_in.items, establishment_id=establishment_id, actor_user_id=current_user.id
+    )
+    return _bulk_response(results)
+
+@router.get("/establishments/{establishment_id}/appointments/allowed-statuses", response_model=List[AllowedStatuses])
+def get_allowed_statuses_for_appointments(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    appointment_ids: List[int] = Query(..., max_length=MAX_BULK_ITEMS),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Para cada agendamento (`?appointment_ids=1&appointment_ids=2`), os status para os quais ele
+    pode ir agora, pelas mesmas regras do PATCH de status. O painel usa a lista para montar os
+    botões em vez de repetir as regras.
+    """
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para ver os agendamentos deste estabelecimento"
+        )
+    return appointment_service.get_allowed_statuses(db, establishment_id=establishment_id, appointment_ids=appointment_ids)
+
 @router.get("/establishments/{establishment_id}/appointments/", response_model=List[AppointmentSchema])
 def list_appointments_for_establishment(
     *,
@@ -68,8 +144,8 @@ def list_appointments_for_establishment(
     if not db_establishment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
 
-    # Verificação de propriedade
-    if db_establishment.user_id != current_user.id:
+    # Verificação de permissão: apenas membros (dono ou colaboradores) veem a agenda
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Não tem permissão para ver os agendamentos deste estabelecimento"
@@ -86,6 +162,50 @@ def list_appointments_for_establishment(
     )
     return appointments
 
+@router.get("/establishments/{establishment_id}/appointments/export", response_class=StreamingResponse, responses={200: {"content": {"text/csv": {}}}})
+def export_appointments_for_establishment(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status_filter: Optional[AppointmentStatus] = None,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Exporta os agendamentos do estabelecimento em CSV (ordem cronológica), incluindo os que
+    já foram movidos para o arquivo frio. A resposta é gerada em streaming.
+    """
+    db_establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+    if not db_establishment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para exportar os agendamentos deste estabelecimento"
+        )
+
+    def generate_csv():
+        # Sessão própria: a do Depends(get_db) é fechada antes de o corpo da resposta ser enviado
+        export_db = SessionLocal()
+        try:
+            yield from appointment_service.export_appointments_csv(
+                export_db,
+                establishment_id=establishment_id,
+                start_date=start_date,
+                end_date=end_date,
+                status=status_filter
+            )
+        finally:
+            export_db.close()
+
+    filename = f"agendamentos_{establishment_id}.csv"
+    return StreamingResponse(
+        generate_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # Endpoints para GET específico, PUT (atualizar status), DELETE virão aqui...
 @router.get("/appointments/{appointment_id}", response_model=AppointmentSchema)
 def read_specific_appointment(
@@ -104,15 +224,10 @@ def read_specific_appointment(
     if not db_appointment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agendamento não encontrado")
 
-    # Agora verificamos a propriedade através do establishment_id no agendamento
-    # Esta abordagem requer que o objeto Establishment seja carregado ou que user_id esteja no Establishment
-    # Se db_appointment.establishment.user_id não funcionar diretamente por causa de lazy loading,
-    # podemos buscar o estabelecimento primeiro.
-    # Mas como temos establishment_id no appointment, podemos buscar o establishment.
-
-    db_establishment = establishment_service.get_establishment_by_id(db, establishment_id=db_appointment.establishment_id)
+    # Agora verificamos a permissão através do establishment_id no agendamento:
+    # o usuário precisa ser membro (dono ou colaborador) do estabelecimento.
 
-    if not db_establishment or db_establishment.user_id != current_user.id:
+    if not establishment_service.get_member_role(db, establishment_id=db_appointment.establishment_id, user_id=current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Não tem permissão para ver este agendamento"
@@ -141,34 +256,27 @@ def update_appointment_status_endpoint(
         )
 
     # 2. Verifica a propriedade (Autorização)
-    # Garante que o usuário logado é o dono do estabelecimento ao qual o agendamento pertence.
-    if db_appointment.establishment.user_id != current_user.id:
+    # Garante que o usuário logado é membro do estabelecimento ao qual o agendamento pertence.
+    if not establishment_service.get_member_role(db, establishment_id=db_appointment.establishment_id, user_id=current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Não tem permissão para modificar este agendamento"
         )
     
-    # 3. Valida a transição de status (Regras de Negócio)
-    # Chama nosso novo serviço de validação antes de qualquer alteração.
+    # 3. Atualiza o status. A transição é validada pelo serviço depois de travar a linha (com o
+    # status do banco, não o lido acima); uma transição inválida vira um erro 400.
     try:
-        # CORRETO:
-        status_validation_service.validate_status_transition( 
-            appointment=db_appointment, 
-            new_status=status_update.status
+        updated_appointment = appointment_service.update_appointment_status(
+            db=db, 
+            appointment_db_obj=db_appointment, 
+            status_in=status_update.status,
+            actor_user_id=current_user.id
         )
     except StatusTransitionError as e:
-        # Se o serviço de validação levantar um erro de regra, retorna um erro 400.
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-
-    # 4. Se todas as validações e autorizações passaram, atualiza o status
-    updated_appointment = appointment_service.update_appointment_status(
-        db=db, 
-        appointment_db_obj=db_appointment, 
-        status_in=status_update.status
-    )
     
     return updated_appointment
 
@@ -178,17 +286,20 @@ def get_available_appointment_slots(
     db: Session = Depends(deps.get_db),
     establishment_id: int,
     service_id: int,
-    appointment_date: date # Recebe a data como parâmetro de query (ex: ?date=2025-06-10)
+    appointment_date: date, # Recebe a data como parâmetro de query (ex: ?date=2025-06-10)
+    professional_id: Optional[int] = None # Só os horários deste profissional
 ):
     """
     Retorna uma lista de horários de início disponíveis para um serviço em uma data específica.
+    Sem professional_id, um horário aparece se qualquer profissional apto ao serviço estiver livre.
     """
     try:
         available_slots = appointment_service.get_available_slots(
             db=db,
             establishment_id=establishment_id,
             service_id=service_id,
-            appointment_date=appointment_date
+            appointment_date=appointment_date,
+            professional_id=professional_id
         )
         return available_slots
     except Exception as e:
@@ -199,6 +310,34 @@ def get_available_appointment_slots(
             detail=str(e)
         )
 
+@router.get("/establishments/{establishment_id}/next-available-slots", response_model=List[NextAvailableSlot])
+def get_next_available_slots(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    service_id: List[int] = Query(...), # Um ou mais: ?service_id=1&service_id=2
+    professional_id: Optional[List[int]] = Query(None), # Restringe a estes profissionais
+    after: Optional[datetime] = None, # Padrão: agora
+    limit: int = Query(5, ge=1, le=50),
+    horizon_days: int = Query(availability_service.DEFAULT_SEARCH_HORIZON_DAYS, ge=1, le=availability_service.MAX_SEARCH_HORIZON_DAYS)
+):
+    """
+    Retorna os primeiros horários livres a partir de `after`, em ordem, para os serviços pedidos,
+    procurando no máximo `horizon_days` dias à frente. Responde "qual o próximo horário?" numa chamada só.
+    """
+    try:
+        return appointment_service.find_next_available_slots(
+            db,
+            establishment_id=establishment_id,
+            service_ids=service_id,
+            after=after,
+            limit=limit,
+            horizon_days=horizon_days,
+            professional_ids=professional_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 """
 Explicação dos Endpoints:
 
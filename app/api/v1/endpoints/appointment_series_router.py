@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date, datetime
+
+from app.api import deps
+from app.models.appointment_series_model import AppointmentSeries as AppointmentSeriesModel
+from app.models.user_model import User
+from app.schemas.appointment_schema import Appointment as AppointmentSchema
+from app.schemas.appointment_series_schema import AppointmentSeries, AppointmentSeriesCreate, OccurrenceUpdate
+from app.services import appointment_series_service, availability_service, establishment_service
+
+router = APIRouter()
+
+def _ensure_member(db: Session, *, establishment_id: int, current_user: User) -> None:
+    """Séries são cadastradas e mantidas pela equipe (dono ou colaboradores) do estabelecimento."""
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para gerenciar os agendamentos recorrentes deste estabelecimento"
+        )
+
+def _get_series(db: Session, *, establishment_id: int, series_id: int, current_user: User) -> AppointmentSeriesModel:
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    series = appointment_series_service.get_series(db, establishment_id=establishment_id, series_id=series_id)
+    if not series:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Série não encontrada")
+    return series
+
+@router.post("/establishments/{establishment_id}/appointment-series", response_model=AppointmentSeries, status_code=status.HTTP_201_CREATED)
+def create_appointment_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    series_in: AppointmentSeriesCreate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Cria um agendamento recorrente a partir de uma regra RRULE (ex: "FREQ=WEEKLY;BYDAY=TU").
+    `start_time` é a primeira ocorrência; as demais repetem o mesmo horário local. A série vai
+    até no máximo SERIES_MAX_DAYS dias (padrão 365) após o início: sem fim (ou com fim depois
+    disso), `until_date` da resposta fica no limite. Todas as ocorrências são verificadas.
+    """
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    try:
+        return appointment_series_service.create_series(db, series_in=series_in, establishment_id=establishment_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/establishments/{establishment_id}/appointment-series", response_model=List[AppointmentSeries])
+def list_appointment_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Lista as séries do estabelecimento (mais recentes primeiro)."""
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    return appointment_series_service.get_series_by_establishment(db, establishment_id=establishment_id, skip=skip, limit=limit)
+
+@router.get("/establishments/{establishment_id}/appointment-series/{series_id}", response_model=AppointmentSeries)
+def read_appointment_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    series_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    return _get_series(db, establishment_id=establishment_id, series_id=series_id, current_user=current_user)
+
+@router.delete("/establishments/{establishment_id}/appointment-series/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+def end_appointment_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    series_id: int,
+    from_date: Optional[date] = None, # Padrão: hoje (no fuso do estabelecimento)
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Encerra a série a partir de `from_date` (inclusive). As ocorrências anteriores e as já
+    alteradas continuam na agenda.
+    """
+    series = _get_series(db, establishment_id=establishment_id, series_id=series_id, current_user=current_user)
+    if from_date is None:
+        establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+        tz = availability_service.establishment_timezone(establishment)
+        from_date = datetime.now(tz).date() if tz else date.today()
+    appointment_series_service.end_series(db, series_db_obj=series, from_date=from_date)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.delete("/establishments/{establishment_id}/appointment-series/{series_id}/occurrences/{occurrence_date}", status_code=status.HTTP_204_NO_CONTENT)
+def skip_appointment_occurrence(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    series_id: int,
+    occurrence_date: date,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Pula uma ocorrência da série; o horário fica livre."""
+    series = _get_series(db, establishment_id=establishment_id, series_id=series_id, current_user=current_user)
+    try:
+        appointment_series_service.skip_occurrence(db, series_db_obj=series, occurrence_date=occurrence_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.patch("/establishments/{establishment_id}/appointment-series/{series_id}/occurrences/{occurrence_date}", response_model=AppointmentSchema)
+def update_appointment_occurrence(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    series_id: int,
+    occurrence_date: date,
+    occurrence_in: OccurrenceUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Remarca (`start_time`) e/ou muda o status de uma ocorrência. A ocorrência vira um agendamento
+    comum (com id), que passa a ser alterado pelos endpoints de agendamento.
+    """
+    series = _get_series(db, establishment_id=establishment_id, series_id=series_id, current_user=current_user)
+    try:
+        return appointment_series_service.update_occurrence(
+            db, series_db_obj=series, occurrence_date=occurrence_date, occurrence_in=occurrence_in,
+            actor_user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.api import deps
+from app.models.user_model import User
+from app.schemas.appointment_schema import Appointment as AppointmentSchema
+from app.schemas.customer_schema import Customer as CustomerSchema
+from app.services import customer_service, establishment_service
+
+router = APIRouter()
+
+def _ensure_member(db: Session, *, establishment_id: int, current_user: User) -> None:
+    """Apenas membros (dono ou colaboradores) do estabelecimento acessam o diretório de clientes."""
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para ver os clientes deste estabelecimento"
+        )
+
+@router.get("/establishments/{establishment_id}/customers", response_model=List[CustomerSchema])
+def list_customers_for_establishment(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    phone: Optional[str] = None, # Busca pelo telefone em qualquer formato (é normalizado)
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Lista os clientes do estabelecimento (agendamento mais recente primeiro) ou busca um cliente pelo telefone.
+    """
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    return customer_service.get_customers_by_establishment(
+        db, establishment_id=establishment_id, phone=phone, skip=skip, limit=limit
+    )
+
+@router.get("/establishments/{establishment_id}/customers/{customer_id}", response_model=CustomerSchema)
+def read_customer(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    customer_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Dados do cliente com a contagem de agendamentos e visitas e as datas do último agendamento e da última visita.
+    """
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    customer = customer_service.get_customer(db, establishment_id=establishment_id, customer_id=customer_id)
+    if not customer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
+    return customer
+
+@router.get("/establishments/{establishment_id}/customers/{customer_id}/appointments", response_model=List[AppointmentSchema])
+def read_customer_history(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    customer_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Histórico de agendamentos do cliente, mais recentes primeiro.
+    """
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    customer = customer_service.get_customer(db, establishment_id=establishment_id, customer_id=customer_id)
+    if not customer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
+    return customer_service.get_customer_history(db, customer_id=customer.id, skip=skip, limit=limit)
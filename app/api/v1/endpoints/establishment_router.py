@@ -10,7 +10,7 @@ from app.models.user_model import User # Para o current_user
 from app.models.establishment_model import Establishment # Para type hint
 from app.schemas.establishment_schema import Establishment as EstablishmentSchema # Para o GET
 from app.schemas.working_hours_schema import WorkingHoursConfig # Para o corpo do PUT
-from app.schemas.establishment_schema import CollaboratorCreate
+from app.schemas.establishment_schema import CollaboratorCreate, PastAppointmentPolicyUpdate
 from app.services import establishment_service, user_service
 
 from app.models.role_enum import Role # Importe o Role
@@ -37,7 +37,8 @@ def set_establishment_working_hours(
         )
     
     # Verificação de propriedade
-    if establishment.user_id != current_user.id:
+    role = establishment_service.get_member_role(db, establishment_id=establishment.id, user_id=current_user.id)
+    if role != Role.OWNER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Não tem permissão para configurar os horários deste estabelecimento"
@@ -54,6 +55,30 @@ def set_establishment_working_hours(
     )
     return response_data
 
+@router.put("/{establishment_id}/past-appointment-policy", response_model=EstablishmentSchema)
+def set_past_appointment_policy(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    policy_in: PastAppointmentPolicyUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Define o que o scheduler faz com agendamentos pendentes/confirmados que já passaram do horário:
+    nada (manual), concluído, não-comparecimento, ou concluído só para os confirmados.
+    """
+    establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+    if not establishment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
+    role = establishment_service.get_member_role(db, establishment_id=establishment.id, user_id=current_user.id)
+    if role != Role.OWNER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para configurar este estabelecimento"
+        )
+    establishment_service.update_past_appointment_policy(db, establishment_db_obj=establishment, policy=policy_in.policy)
+    return establishment_service.get_establishment_for_api_response(db=db, establishment_id=establishment.id)
+
 @router.get("/{establishment_id}", response_model=EstablishmentSchema)
 def read_establishment_details(
     *,
@@ -64,7 +89,8 @@ def read_establishment_details(
     """
     Obtém os detalhes de um estabelecimento, incluindo seus horários de atendimento.
     """
-    establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+    # Monta a resposta com os membros e seus papéis (o papel vem da tabela de associação)
+    establishment = establishment_service.get_establishment_for_api_response(db, establishment_id=establishment_id)
     if not establishment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
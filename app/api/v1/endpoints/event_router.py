@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core import realtime
+from app.core.config import settings
+from app.models.user_model import User
+from app.services import establishment_service
+
+router = APIRouter()
+
+RECONNECT_DELAY_MS = 3000 # Sugestão de espera para o EventSource reconectar
+
+@router.get("/establishments/{establishment_id}/events", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}})
+async def stream_establishment_events(
+    *,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    current_user: User = Depends(deps.get_current_active_user_for_stream)
+):
+    """
+    Stream SSE (text/event-stream) com os eventos do estabelecimento: appointment.created,
+    appointment.status_changed, availability.invalidated e resync (recarregar a agenda).
+    Apenas membros do estabelecimento. O token pode ir no header Authorization ou em ?access_token=.
+    """
+    if not settings.REALTIME_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Eventos em tempo real desativados")
+    role = await run_in_threadpool(
+        establishment_service.get_member_role, db, establishment_id=establishment_id, user_id=current_user.id
+    )
+    if role is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para acompanhar os eventos deste estabelecimento"
+        )
+
+    async def event_stream():
+        # Nenhuma sessão de banco fica aberta durante o stream: só a fila em memória da conexão
+        subscriber = realtime.hub.subscribe(establishment_id)
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            while True:
+                frame = await subscriber.get(timeout=settings.REALTIME_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                # Sem eventos no intervalo: comentário de heartbeat mantém proxies e load balancers com a conexão aberta
+                yield frame if frame is not None else ": ping\n\n"
+        finally:
+            realtime.hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
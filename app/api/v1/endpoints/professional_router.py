@@ -1,14 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.api import deps
+from app.models.professional_model import Professional as ProfessionalModel
+from app.models.role_enum import Role
 from app.models.user_model import User
-from app.schemas.professional_schema import Professional, ProfessionalCreate, ProfessionalUpdate
+from app.schemas.professional_schema import Professional, ProfessionalCreate, ProfessionalUpdate, ProfessionalServicesUpdate
+from app.schemas.working_hours_schema import WorkingHoursConfig
 from app.services import establishment_service, professional_service
 
 router = APIRouter()
 
+def _get_managed_professional(db: Session, *, establishment_id: int, professional_id: int, current_user: User) -> ProfessionalModel:
+    """Busca o profissional do estabelecimento, exigindo que o usuário seja o dono."""
+    role = establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id)
+    if role != Role.OWNER:
+        raise HTTPException(status_code=403, detail="Não tem permissão para gerenciar os profissionais deste estabelecimento.")
+    professional = professional_service.get_professional(db, establishment_id=establishment_id, professional_id=professional_id)
+    if not professional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado.")
+    return professional
+
 @router.post("/establishments/{establishment_id}/professionals", response_model=Professional, status_code=status.HTTP_201_CREATED)
 def create_new_professional(
     *,
@@ -22,7 +35,10 @@ def create_new_professional(
     if not establishment or current_user not in establishment.users:
         raise HTTPException(status_code=403, detail="Não tem permissão para adicionar profissionais a este estabelecimento.")
 
-    return professional_service.create_professional(db=db, professional_in=professional_in, establishment_id=establishment_id)
+    try:
+        return professional_service.create_professional(db=db, professional_in=professional_in, establishment_id=establishment_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/establishments/{establishment_id}/professionals", response_model=List[Professional])
 def list_professionals_for_establishment(
@@ -33,4 +49,60 @@ def list_professionals_for_establishment(
     """Lista os profissionais de um estabelecimento (endpoint público)."""
     return professional_service.get_professionals_by_establishment(db=db, establishment_id=establishment_id)
 
-# Adicione aqui os endpoints para PUT e DELETE de um profissional se desejar, seguindo o mesmo padrão de segurança do POST.
\ No newline at end of file
+@router.get("/establishments/{establishment_id}/professionals/{professional_id}", response_model=Professional)
+def read_professional(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    professional_id: int
+):
+    """Detalhes de um profissional, com serviços e horário (endpoint público)."""
+    professional = professional_service.get_professional(db, establishment_id=establishment_id, professional_id=professional_id)
+    if not professional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado.")
+    return professional
+
+@router.put("/establishments/{establishment_id}/professionals/{professional_id}", response_model=Professional)
+def update_existing_professional(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    professional_id: int,
+    professional_in: ProfessionalUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Atualiza os dados, os serviços e/ou o horário do profissional (apenas o dono)."""
+    professional = _get_managed_professional(db, establishment_id=establishment_id, professional_id=professional_id, current_user=current_user)
+    try:
+        return professional_service.update_professional(db, professional_db_obj=professional, professional_in=professional_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/establishments/{establishment_id}/professionals/{professional_id}/services", response_model=Professional)
+def set_professional_services(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    professional_id: int,
+    services_in: ProfessionalServicesUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Define quais serviços o profissional realiza (substitui a lista atual)."""
+    professional = _get_managed_professional(db, establishment_id=establishment_id, professional_id=professional_id, current_user=current_user)
+    try:
+        return professional_service.set_professional_services(db, professional_db_obj=professional, service_ids=services_in.service_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/establishments/{establishment_id}/professionals/{professional_id}/working-hours", response_model=Professional)
+def set_professional_working_hours(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    professional_id: int,
+    working_hours_in: Optional[WorkingHoursConfig] = None, # Corpo vazio/null: volta a seguir o horário do estabelecimento
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Define o horário de trabalho próprio do profissional."""
+    professional = _get_managed_professional(db, establishment_id=establishment_id, professional_id=professional_id, current_user=current_user)
+    return professional_service.set_professional_working_hours(db, professional_db_obj=professional, working_hours_in=working_hours_in)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from app.api import deps
+from app.models.role_enum import Role
+from app.models.user_model import User
+from app.schemas.schedule_exception_schema import ScheduleException, ScheduleExceptionCreate
+from app.services import establishment_service, schedule_exception_service
+
+router = APIRouter()
+
+def _ensure_role(db: Session, *, establishment_id: int, current_user: User, owner_only: bool) -> None:
+    role = establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id)
+    if role is None or (owner_only and role != Role.OWNER):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para gerenciar as exceções de horário deste estabelecimento"
+        )
+
+@router.post("/establishments/{establishment_id}/schedule-exceptions", response_model=ScheduleException, status_code=status.HTTP_201_CREATED)
+def create_schedule_exception(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    exception_in: ScheduleExceptionCreate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Cadastra um feriado/fechamento (closed), uma faixa bloqueada (blocked) ou um horário
+    especial (special_hours) numa data, para o estabelecimento inteiro ou para um profissional.
+    """
+    _ensure_role(db, establishment_id=establishment_id, current_user=current_user, owner_only=True)
+    try:
+        return schedule_exception_service.create_schedule_exception(
+            db, exception_in=exception_in, establishment_id=establishment_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/establishments/{establishment_id}/schedule-exceptions", response_model=List[ScheduleException])
+def list_schedule_exceptions(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Lista as exceções de horário do período (as recorrentes anuais aparecem sempre)."""
+    _ensure_role(db, establishment_id=establishment_id, current_user=current_user, owner_only=False)
+    return schedule_exception_service.list_schedule_exceptions(
+        db, establishment_id=establishment_id, start_date=start_date, end_date=end_date
+    )
+
+@router.delete("/establishments/{establishment_id}/schedule-exceptions/{exception_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_schedule_exception(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    exception_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Remove uma exceção de horário."""
+    _ensure_role(db, establishment_id=establishment_id, current_user=current_user, owner_only=True)
+    exception = schedule_exception_service.get_schedule_exception(db, establishment_id=establishment_id, exception_id=exception_id)
+    if not exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exceção de horário não encontrada")
+    schedule_exception_service.delete_schedule_exception(db, exception_db_obj=exception)
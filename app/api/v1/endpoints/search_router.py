@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.models.user_model import User
+from app.schemas.search_schema import SearchResults
+from app.services import establishment_service, search_service
+
+router = APIRouter()
+
+@router.get("/establishments/{establishment_id}/search", response_model=SearchResults)
+def search_establishment(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    q: str = Query(..., min_length=search_service.MIN_QUERY_LENGTH, max_length=100),
+    limit: int = Query(10, ge=1, le=50), # Resultados por tipo
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Busca por pedaço de nome, telefone ou e-mail nos clientes, serviços e profissionais do estabelecimento.
+    Apenas membros do estabelecimento podem buscar.
+    """
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para buscar neste estabelecimento"
+        )
+    return search_service.search(db, establishment_id=establishment_id, term=q, limit=limit)
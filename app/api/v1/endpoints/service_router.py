@@ -7,6 +7,8 @@ from app.models.user_model import User # Importe o modelo User
 from app.api import deps # Nossa dependência get_db
 from app.schemas.service_schema import Service, ServiceCreate, ServiceUpdate # Nossos schemas de serviço
 from app.services import service_service # Nossos serviços CRUD para Service
+from app.services import establishment_service
+from app.models.role_enum import Role
 # Para autenticação (vamos precisar em breve para proteger e verificar o dono)
 # from app.services import user_service 
 # from app.core.security import get_current_active_user # Placeholder para a dependência do usuário atual
@@ -28,7 +30,7 @@ def create_service_for_establishment(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
 
     # VERIFICAÇÃO DE PROPRIEDADE
-    if establishment.user_id != current_user.id:
+    if establishment_service.get_member_role(db, establishment_id=establishment.id, user_id=current_user.id) != Role.OWNER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não tem permissão para adicionar serviços a este estabelecimento")
 
     service = service_service.create_establishment_service(db=db, service_in=service_in, establishment_id=establishment_id)
@@ -85,9 +87,7 @@ def update_existing_service(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serviço não encontrado")
 
     # VERIFICAÇÃO DE PROPRIEDADE
-    # Precisamos acessar service.establishment.user_id. O relacionamento deve estar carregado.
-    # Se o relacionamento 'establishment' no modelo 'Service' estiver configurado corretamente, isso deve funcionar.
-    if db_service.establishment.user_id != current_user.id:
+    if establishment_service.get_member_role(db, establishment_id=db_service.establishment_id, user_id=current_user.id) != Role.OWNER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não tem permissão para atualizar este serviço")
 
     updated_service = service_service.update_service(db=db, service_db_obj=db_service, service_in=service_in)
@@ -105,7 +105,7 @@ def delete_existing_service(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Serviço não encontrado")
 
     # VERIFICAÇÃO DE PROPRIEDADE
-    if db_service.establishment.user_id != current_user.id:
+    if establishment_service.get_member_role(db, establishment_id=db_service.establishment_id, user_id=current_user.id) != Role.OWNER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não tem permissão para deletar este serviço")
 
     deleted_service = service_service.delete_service(db=db, service_id=service_id)
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from app.api import deps
+from app.models.establishment_model import Establishment
+from app.models.user_model import User
+from app.schemas.stats_schema import EstablishmentStats, ProfessionalStats
+from app.services import establishment_service, professional_service, stats_service
+
+router = APIRouter()
+
+def _get_member_establishment(db: Session, *, establishment_id: int, current_user: User) -> Establishment:
+    """Estatísticas (com faturamento) são vistas só pela equipe do estabelecimento."""
+    establishment = establishment_service.get_establishment_by_id(db, establishment_id=establishment_id)
+    if not establishment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para ver as estatísticas deste estabelecimento"
+        )
+    return establishment
+
+@router.get("/establishments/{establishment_id}/stats", response_model=EstablishmentStats)
+def read_establishment_stats(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    start_date: Optional[date] = None, # Padrão: primeiro dia do mês corrente
+    end_date: Optional[date] = None, # Padrão: último dia do mês corrente
+    professional_id: Optional[int] = None, # 0 = agendamentos sem profissional
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Agendamentos, faturamento e contagem por status no período e em cada dia, lidos do rollup
+    diário (custo proporcional ao número de dias, não de agendamentos).
+    """
+    establishment = _get_member_establishment(db, establishment_id=establishment_id, current_user=current_user)
+    default_start, default_end = stats_service.default_range(establishment)
+    start_date, end_date = start_date or default_start, end_date or default_end
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date precisa ser igual ou posterior a start_date.")
+    if (end_date - start_date).days >= stats_service.MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O período pode ter no máximo {stats_service.MAX_RANGE_DAYS} dias."
+        )
+    return stats_service.establishment_stats(
+        db, establishment_id=establishment_id, start_date=start_date, end_date=end_date, professional_id=professional_id
+    )
+
+@router.get("/establishments/{establishment_id}/professionals/{professional_id}/stats", response_model=ProfessionalStats)
+def read_professional_stats(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    professional_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Totais do profissional desde sempre e no mês corrente, com os últimos atendimentos."""
+    establishment = _get_member_establishment(db, establishment_id=establishment_id, current_user=current_user)
+    if not professional_service.get_professional(db, establishment_id=establishment_id, professional_id=professional_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profissional não encontrado.")
+    return stats_service.professional_stats(db, establishment=establishment, professional_id=professional_id)
@@ -1,23 +1,43 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session # Se precisar de acesso direto ao db, mas get_current_active_user já faz
 
 from app.api import deps
 from app.models.user_model import User # Para o tipo do current_user
 from app.schemas.user_schema import UserMe # Nosso novo schema de resposta
+from app.schemas.stats_schema import OwnerDashboard
+from app.services import establishment_service, stats_service
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserMe)
 def read_users_me(
+    db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user) # Usa nossa dependência
 ):
     """
-    Obtém o perfil do usuário logado atualmente, incluindo seu estabelecimento.
+    Obtém o perfil do usuário logado atualmente, incluindo seus estabelecimentos e o papel em cada um.
     """
-    # O objeto current_user já vem com o relacionamento 'establishment'
-    # carregado (ou acessível via lazy loading) devido à configuração do SQLAlchemy.
-    # O Pydantic (com from_attributes=True) vai conseguir mapear user.establishment para o schema EstablishmentForUserMe.
-    return current_user
+    # O papel fica na tabela de associação, não no Establishment: por isso a lista é montada
+    # pelo serviço em vez de deixar o Pydantic ler current_user.establishments diretamente.
+    return UserMe(
+        id=current_user.id,
+        email=current_user.email,
+        is_active=current_user.is_active,
+        establishments=establishment_service.get_memberships_for_user(db, user_id=current_user.id),
+    )
+
+@router.get("/me/dashboard", response_model=OwnerDashboard)
+def read_owner_dashboard(
+    db: Session = Depends(deps.get_db),
+    next_limit: int = Query(5, ge=1, le=20), # Próximos agendamentos por unidade
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Painel de todos os estabelecimentos em que o usuário é dono: contagens por status e
+    faturamento de hoje e da semana, próximos agendamentos de cada unidade e a soma da rede.
+    Uma chamada, com o mesmo número de queries para 1 ou 100 unidades.
+    """
+    return stats_service.owner_dashboard(db, user_id=current_user.id, next_limit=next_limit)
 
 """
 - @router.get("/me", response_model=UserMe): Define o endpoint.
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.api import deps
+from app.models.user_model import User
+from app.models.waitlist_model import WaitlistStatus
+from app.schemas.waitlist_schema import WaitlistEntry, WaitlistEntryCreate
+from app.services import establishment_service, waitlist_service
+
+router = APIRouter()
+
+def _ensure_member(db: Session, *, establishment_id: int, current_user: User) -> None:
+    if not establishment_service.get_member_role(db, establishment_id=establishment_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não tem permissão para gerenciar a lista de espera deste estabelecimento"
+        )
+
+@router.post("/establishments/{establishment_id}/waitlist", response_model=WaitlistEntry, status_code=status.HTTP_201_CREATED)
+def create_waitlist_entry(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    entry_in: WaitlistEntryCreate,
+):
+    """
+    Coloca o cliente na lista de espera do serviço para um período (e, opcionalmente, uma faixa do
+    dia e um profissional). Público, como a criação de agendamentos. Quando um horário compatível
+    é cancelado, o primeiro da fila recebe uma reserva (agendamento PENDING) a ser confirmada.
+    """
+    if not establishment_service.get_establishment_by_id(db, establishment_id=establishment_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Estabelecimento não encontrado")
+    try:
+        return waitlist_service.create_entry(db, entry_in=entry_in, establishment_id=establishment_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/establishments/{establishment_id}/waitlist", response_model=List[WaitlistEntry])
+def list_waitlist_entries(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    status_filter: Optional[WaitlistStatus] = Query(None, alias="status"),
+    service_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Entradas da lista de espera na ordem da fila."""
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    return waitlist_service.list_entries(
+        db, establishment_id=establishment_id, status=status_filter, service_id=service_id, skip=skip, limit=limit
+    )
+
+@router.delete("/establishments/{establishment_id}/waitlist/{entry_id}", response_model=WaitlistEntry)
+def cancel_waitlist_entry(
+    *,
+    db: Session = Depends(deps.get_db),
+    establishment_id: int,
+    entry_id: int,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Retira da fila uma entrada que ainda aguarda (fica registrada como cancelled)."""
+    _ensure_member(db, establishment_id=establishment_id, current_user=current_user)
+    entry = waitlist_service.get_entry(db, establishment_id=establishment_id, entry_id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entrada da lista de espera não encontrada")
+    try:
+        return waitlist_service.cancel_entry(db, entry_db_obj=entry)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
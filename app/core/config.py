@@ -15,6 +15,74 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: str = os.getenv("TWILIO_AUTH_TOKEN", "")
     TWILIO_WHATSAPP_NUMBER: str = os.getenv("TWILIO_WHATSAPP_NUMBER", "")
 
+    # Inicialização: por padrão o app NÃO cria tabelas (use `python manage.py init-db`).
+    # Em desenvolvimento, AUTO_CREATE_TABLES=true roda init_db() no startup (nunca no import).
+    AUTO_CREATE_TABLES: bool = os.getenv("AUTO_CREATE_TABLES", "false").lower() == "true"
+
+    # Pool de conexões (por processo/worker)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_WARM_CONNECTIONS: int = int(os.getenv("DB_POOL_WARM_CONNECTIONS", 0)) # Conexões abertas no startup do worker
+
+    # Servidor de produção (gunicorn + UvicornWorker, ver gunicorn.conf.py)
+    SERVER_BIND: str = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0)) # 0 = um worker por núcleo de CPU
+    SERVER_PRELOAD_APP: bool = os.getenv("SERVER_PRELOAD_APP", "true").lower() == "true"
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30)) # Segundos para drenar requisições
+
+    # Observabilidade: middleware de métricas + endpoint /metrics (formato Prometheus)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Log de queries lentas (ver app/core/slow_query_log.py)
+    SLOW_QUERY_LOG_ENABLED: bool = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0)) # Fração das queries lentas capturadas (0.0 a 1.0)
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    SLOW_QUERY_EXPLAIN_TTL_SECONDS: int = int(os.getenv("SLOW_QUERY_EXPLAIN_TTL_SECONDS", 300)) # Reuso do plano de um mesmo SQL
+    SLOW_QUERY_BUFFER_SIZE: int = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 200))
+
+    # Profiling sob demanda (header X-Profile: 1, apenas administradores)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILE_BUFFER_SIZE: int = int(os.getenv("PROFILE_BUFFER_SIZE", 20)) # Perfis guardados por worker
+
+    # Particionamento mensal de appointments (PostgreSQL; ver app/db/partitioning.py)
+    APPOINTMENT_PARTITION_MONTHS_AHEAD: int = int(os.getenv("APPOINTMENT_PARTITION_MONTHS_AHEAD", 3)) # Partições futuras mantidas criadas
+    APPOINTMENT_ARCHIVE_AFTER_MONTHS: int = int(os.getenv("APPOINTMENT_ARCHIVE_AFTER_MONTHS", 12))
+    APPOINTMENT_ARCHIVE_MODE: str = os.getenv("APPOINTMENT_ARCHIVE_MODE", "detach") # "detach" ou "export"
+    APPOINTMENT_ARCHIVE_DIR: str = os.getenv("APPOINTMENT_ARCHIVE_DIR", "archive/appointments")
+
+    # Arquivo frio de agendamentos finalizados (JSON-lines gzip por estabelecimento e mês)
+    COLD_STORAGE_DIR: str = os.getenv("COLD_STORAGE_DIR", "archive/cold")
+    COLD_STORAGE_AFTER_DAYS: int = int(os.getenv("COLD_STORAGE_AFTER_DAYS", 365)) # Idade mínima para arquivar
+
+    # Eventos em tempo real (SSE em /establishments/{id}/events; ver app/core/realtime.py)
+    REALTIME_ENABLED: bool = os.getenv("REALTIME_ENABLED", "true").lower() == "true"
+    REALTIME_BACKEND: str = os.getenv("REALTIME_BACKEND", "redis") # "redis" (fan-out entre workers) ou "local" (um worker)
+    REALTIME_QUEUE_MAX_EVENTS: int = int(os.getenv("REALTIME_QUEUE_MAX_EVENTS", 100)) # Fila máxima por conexão
+    REALTIME_QUEUE_MAX_BYTES: int = int(os.getenv("REALTIME_QUEUE_MAX_BYTES", 256 * 1024))
+    REALTIME_HEARTBEAT_SECONDS: float = float(os.getenv("REALTIME_HEARTBEAT_SECONDS", 15))
+    REALTIME_REDIS_RETRY_SECONDS: float = float(os.getenv("REALTIME_REDIS_RETRY_SECONDS", 5)) # Pausa após falha de publish
+
+    # Fechamento automático de agendamentos que passaram do horário (política por estabelecimento)
+    PAST_APPOINTMENT_GRACE_MINUTES: int = int(os.getenv("PAST_APPOINTMENT_GRACE_MINUTES", 60)) # Folga após o fim do atendimento
+    PAST_APPOINTMENT_CHUNK_SIZE: int = int(os.getenv("PAST_APPOINTMENT_CHUNK_SIZE", 1000)) # Linhas por UPDATE (um commit por lote)
+    PAST_APPOINTMENT_MAX_EVENTS: int = int(os.getenv("PAST_APPOINTMENT_MAX_EVENTS", 50)) # Acima disso, um único "resync" por estabelecimento
+
+    # Lista de espera: horário liberado vira uma reserva (agendamento PENDING) para o próximo da fila
+    WAITLIST_HOLD_MINUTES: int = int(os.getenv("WAITLIST_HOLD_MINUTES", 30)) # Prazo para confirmar a reserva
+    WAITLIST_MAX_DAYS: int = int(os.getenv("WAITLIST_MAX_DAYS", 60)) # Tamanho máximo do período de uma espera
+
+    # Agendamentos recorrentes: a série vai no máximo até este número de dias após o início (sem
+    # fim ou com fim depois disso, é encerrada no limite), e todas as ocorrências são verificadas
+    SERIES_MAX_DAYS: int = int(os.getenv("SERIES_MAX_DAYS", 365))
+
+    # Administradores da plataforma (e-mails separados por vírgula): acesso aos endpoints /admin
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+
+    @property
+    def admin_emails(self) -> set:
+        return {email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()}
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
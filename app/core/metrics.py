@@ -0,0 +1,144 @@
+# app/core/metrics.py
+# Métricas Prometheus da API:
+#   - latência, status e requisições em andamento por rota (middleware ASGI);
+#   - número de statements SQL e tempo total de banco por requisição (eventos do SQLAlchemy).
+# Os labels usam o TEMPLATE da rota (ver request_context.route_template), nunca o path cru.
+#
+# Multi-worker: se PROMETHEUS_MULTIPROC_DIR estiver definido (antes de iniciar o gunicorn),
+# cada worker grava em arquivos nesse diretório e o /metrics agrega todos os processos.
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    REGISTRY,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.request_context import (
+    RequestContext,
+    get_current_request,
+    reset_current_request,
+    set_current_request,
+)
+
+METRICS_PATH = "/metrics"
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "orkestre_http_requests_total",
+    "Total de requisições HTTP por rota, método e status.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "orkestre_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "orkestre_http_requests_in_progress",
+    "Requisições HTTP em andamento.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "orkestre_db_statements_per_request",
+    "Quantidade de statements SQL executados por requisição.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "orkestre_db_time_per_request_seconds",
+    "Tempo total gasto no banco por requisição.",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+# --- Instrumentação do SQLAlchemy ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("orkestre_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["orkestre_query_start"].pop()
+    request = get_current_request()
+    if request is not None:
+        request.sql_statements += 1
+        request.sql_time_seconds += time.perf_counter() - started
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra os listeners de contagem/tempo de SQL no engine (idempotente)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Middleware ASGI ---
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware) que mede cada requisição HTTP.
+    O template da rota só é conhecido depois que o router processou o scope, por isso
+    os labels são lidos no final da requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        request = RequestContext(scope=scope)
+        token = set_current_request(request)
+        status_code = 500 # Se a aplicação quebrar antes de responder, conta como 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
+            route = request.route
+            HTTP_REQUESTS_TOTAL.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(elapsed)
+            DB_STATEMENTS_PER_REQUEST.labels(method, route).observe(request.sql_statements)
+            DB_TIME_PER_REQUEST.labels(method, route).observe(request.sql_time_seconds)
+            reset_current_request(token)
+
+
+# --- Exposição ---
+
+def render_metrics() -> tuple[bytes, str]:
+    """Gera o texto no formato Prometheus (agregando os workers em modo multiprocess)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_dead(pid: int) -> None:
+    """Limpa os arquivos de um worker encerrado (hook child_exit do gunicorn)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,265 @@
+# app/core/profiling.py
+# Profiling sob demanda de UMA requisição, disparado por um administrador com o header `X-Profile: 1`.
+#
+# Como funciona:
+#   - O middleware valida o token (o e-mail do JWT precisa estar em ADMIN_EMAILS, sem ir ao banco)
+#     e liga um cProfile na thread do event loop durante toda a requisição (handlers async,
+#     dependências async, serialização da resposta, middlewares).
+#   - Handlers síncronos rodam no threadpool, onde o cProfile do event loop não enxerga nada.
+#     Por isso instrument_routes() envolve o endpoint síncrono e a validação Pydantic da resposta
+#     (que o FastAPI também manda para o threadpool) com um cProfile próprio naquela thread.
+#     A sessão chega até lá por um ContextVar, que o anyio propaga para o threadpool.
+#   - Os perfis das threads são somados e guardados em um buffer; a resposta original volta
+#     intacta, com os headers X-Profile-Id e X-Profile-Url para baixar o resultado
+#     (JSON, HTML ou .pstats) em /api/v1/admin/profiles/{id}.
+#
+# Apenas uma requisição é perfilada por vez em cada worker (as demais seguem sem profiling e
+# recebem `X-Profile-Status: busy`), para que o profiling não vire um problema de carga.
+# Observação: o perfil do event loop pode incluir trechos de outras requisições concorrentes.
+import cProfile
+import functools
+import html
+import marshal
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from contextvars import ContextVar
+from fastapi.dependencies.utils import is_coroutine_callable
+from fastapi.routing import APIRoute
+
+from app.core import security
+from app.core.config import settings
+from app.core.request_context import route_template
+
+PROFILE_HEADER = b"x-profile"
+PROFILES_URL = "/api/v1/admin/profiles"
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar("orkestre_profile_session", default=None)
+_single_session_lock = threading.Lock()
+
+
+class ProfileSession:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.captured_at = datetime.now(timezone.utc)
+        self.duration_ms: float = 0.0
+        self.loop_thread = threading.get_ident()
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.threads = {self.loop_thread}
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self._profiles.append(profiler)
+            self.threads.add(threading.get_ident())
+
+    def stats(self) -> pstats.Stats:
+        stats = None
+        with self._lock:
+            for profiler in self._profiles:
+                if stats is None:
+                    stats = pstats.Stats(profiler)
+                else:
+                    stats.add(profiler)
+        return stats
+
+
+class ProfileStore:
+    """Últimos perfis capturados neste worker (os mais antigos são descartados)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, ProfileSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            return self._sessions.get(profile_id)
+
+    def list(self) -> List[ProfileSession]:
+        with self._lock:
+            return list(reversed(self._sessions.values()))
+
+
+profile_store = ProfileStore(max_entries=settings.PROFILE_BUFFER_SIZE)
+
+
+# --- Relatórios ---
+
+def summary(session: ProfileSession) -> dict:
+    return {
+        "id": session.id,
+        "captured_at": session.captured_at,
+        "method": session.method,
+        "path": session.path,
+        "route": session.route,
+        "status_code": session.status_code,
+        "duration_ms": round(session.duration_ms, 2),
+        "threads": len(session.threads),
+    }
+
+def top_functions(session: ProfileSession, limit: int = 50, sort_by: str = "cumulative") -> List[dict]:
+    """Funções mais caras (tempo acumulado ou próprio), já somando todas as threads."""
+    stats = session.stats()
+    if stats is None:
+        return []
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, total_time, cumulative_time, _) in stats.stats.items():
+        rows.append({
+            "function": function,
+            "file": filename,
+            "line": line,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "total_time_ms": round(total_time * 1000, 3),
+            "cumulative_time_ms": round(cumulative_time * 1000, 3),
+        })
+    key = "total_time_ms" if sort_by == "total" else "cumulative_time_ms"
+    rows.sort(key=lambda row: row[key], reverse=True)
+    return rows[:limit]
+
+def render_html(session: ProfileSession, limit: int = 100, sort_by: str = "cumulative") -> str:
+    info = summary(session)
+    header = " ".join(f"<b>{html.escape(str(key))}</b>: {html.escape(str(value))}" for key, value in info.items())
+    lines = [
+        "<html><head><meta charset='utf-8'><title>Profile {}</title></head><body>".format(html.escape(session.id)),
+        f"<p>{header}</p>",
+        "<table border='1' cellspacing='0' cellpadding='3'>",
+        "<tr><th>cumulative (ms)</th><th>total (ms)</th><th>calls</th><th>function</th><th>file:line</th></tr>",
+    ]
+    for row in top_functions(session, limit=limit, sort_by=sort_by):
+        lines.append(
+            "<tr><td>{cumulative_time_ms}</td><td>{total_time_ms}</td><td>{calls}</td><td>{function}</td><td>{location}</td></tr>".format(
+                cumulative_time_ms=row["cumulative_time_ms"],
+                total_time_ms=row["total_time_ms"],
+                calls=row["calls"],
+                function=html.escape(row["function"]),
+                location=html.escape(f"{row['file']}:{row['line']}"),
+            )
+        )
+    lines.append("</table></body></html>")
+    return "\n".join(lines)
+
+def dump_pstats(session: ProfileSession) -> bytes:
+    """Arquivo no formato do módulo pstats (abre com snakeviz, gprof2dot, etc.)."""
+    stats = session.stats()
+    if stats is None:
+        return b""
+    return marshal.dumps(stats.stats)
+
+
+# --- Profiling das threads do threadpool ---
+
+def _profile_in_worker_thread(func):
+    """Envolve uma função síncrona: se houver sessão ativa e estivermos fora do event loop, perfila a chamada."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _active_session.get()
+        if session is None or threading.get_ident() == session.loop_thread:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            session.add(profiler)
+    wrapper.__orkestre_profiled__ = True
+    return wrapper
+
+def instrument_routes(app) -> None:
+    """
+    Envolve os endpoints síncronos (e a validação da resposta deles) de todas as rotas do app.
+    Deve ser chamada depois que todos os routers foram incluídos. Sem sessão ativa, o custo
+    por chamada é só a leitura de um ContextVar.
+    """
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or getattr(route.dependant.call, "__orkestre_profiled__", False):
+            continue
+        if route.dependant.call is None or is_coroutine_callable(route.dependant.call):
+            continue
+        route.dependant.call = _profile_in_worker_thread(route.dependant.call)
+        if route.response_field is not None:
+            route.response_field.validate = _profile_in_worker_thread(route.response_field.validate)
+
+# --- Middleware ---
+
+def _admin_from_headers(headers: dict) -> bool:
+    """True se o Bearer token pertence a um administrador (ADMIN_EMAILS). Não consulta o banco."""
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        email = security.verify_token_and_get_subject(token=token, credentials_exception=ValueError())
+    except Exception:
+        return False
+    return email.lower() in settings.admin_emails
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER, b"").strip().lower() not in (b"1", b"true") or not _admin_from_headers(headers):
+            await self.app(scope, receive, send)
+            return
+
+        if not _single_session_lock.acquire(blocking=False):
+            await self.app(scope, receive, self._with_headers(send, [(b"x-profile-status", b"busy")]))
+            return
+
+        session = ProfileSession(method=scope["method"], path=scope["path"])
+        token = _active_session.set(session)
+        extra_headers = [
+            (b"x-profile-id", session.id.encode()),
+            (b"x-profile-url", f"{PROFILES_URL}/{session.id}".encode()),
+        ]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session.status_code = message["status"]
+            await self._with_headers(send, extra_headers)(message)
+
+        loop_profiler = cProfile.Profile()
+        started = time.perf_counter()
+        loop_profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            loop_profiler.disable()
+            session.duration_ms = (time.perf_counter() - started) * 1000
+            session.route = route_template(scope)
+            session.add(loop_profiler)
+            _active_session.reset(token)
+            _single_session_lock.release()
+            profile_store.add(session)
+
+    @staticmethod
+    def _with_headers(send, extra_headers):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + extra_headers
+            await send(message)
+        return wrapped
@@ -0,0 +1,271 @@
+# app/core/realtime.py
+# Eventos em tempo real por estabelecimento (consumidos pelo stream SSE em /establishments/{id}/events).
+#
+# Tipos de evento:
+#   - appointment.created          -> novo agendamento (dados mínimos; o painel busca o resto)
+#   - appointment.status_changed   -> mudança de status
+#   - availability.invalidated     -> horários livres mudaram (datas afetadas, ou "all": true)
+#   - resync                       -> a conexão perdeu eventos; o cliente deve recarregar a agenda
+#
+# Fan-out entre workers: com REALTIME_BACKEND="redis", `publish` grava no canal
+# "orkestre:events:{establishment_id}" e cada worker mantém UMA conexão de pub/sub, inscrita só
+# nos canais dos estabelecimentos com clientes conectados nele. Com "local" (um único worker,
+# desenvolvimento) os eventos são entregues direto, sem Redis. Se o Redis cair, o publish
+# entrega localmente e só tenta o Redis de novo depois de REALTIME_REDIS_RETRY_SECONDS. Se a
+# conexão de pub/sub cair, o listener reconecta com backoff e, quando volta a estar inscrito,
+# envia um único resync aos clientes (os eventos da queda se perderam).
+#
+# Backpressure: cada conexão tem uma fila limitada por eventos e por bytes
+# (REALTIME_QUEUE_MAX_EVENTS / REALTIME_QUEUE_MAX_BYTES). Um cliente lento que estoura o
+# orçamento perde a fila inteira e recebe um único evento `resync`; a memória por conexão nunca
+# passa do orçamento e o publish nunca espera por um cliente.
+#
+# `publish` é síncrono e pode ser chamado de qualquer thread (os services rodam no threadpool),
+# sempre DEPOIS do commit. Falhas são registradas no log e nunca quebram a requisição.
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger("orkestre.realtime")
+
+CHANNEL_PREFIX = "orkestre:events:"
+RESYNC_EVENT = "resync"
+
+
+def channel_for(establishment_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{establishment_id}"
+
+
+def encode_event(establishment_id: int, event_type: str, data: Dict[str, Any]) -> str:
+    return json.dumps({
+        "type": event_type,
+        "establishment_id": establishment_id,
+        "data": data,
+        "sent_at": datetime.now(timezone.utc).isoformat(),
+    }, ensure_ascii=False, default=str)
+
+
+def sse_frame(message: str) -> str:
+    """Evento (JSON de encode_event) no formato text/event-stream. Montado uma vez por evento, não por conexão."""
+    return f"event: {json.loads(message)['type']}\ndata: {message}\n\n"
+
+
+class Subscriber:
+    """Fila de uma conexão SSE (frames prontos), limitada por quantidade de eventos e por bytes."""
+
+    def __init__(self, establishment_id: int, *, max_events: int, max_bytes: int):
+        self.establishment_id = establishment_id
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.dropped = 0 # Eventos descartados por estouro (para o log ao desconectar)
+        self._queue: Deque[str] = deque()
+        self._bytes = 0
+        self._ready = asyncio.Event()
+
+    def push(self, frame: str) -> None:
+        """Enfileira sem bloquear (roda no loop). Estourou o orçamento: troca a fila por um resync."""
+        size = len(frame)
+        if len(self._queue) + 1 > self.max_events or self._bytes + size > self.max_bytes:
+            self.dropped += len(self._queue) + 1
+            resync = sse_frame(encode_event(self.establishment_id, RESYNC_EVENT, {"reason": "backlog_overflow"}))
+            self._queue.clear()
+            self._queue.append(resync)
+            self._bytes = len(resync)
+        else:
+            self._queue.append(frame)
+            self._bytes += size
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """Próximo frame SSE, ou None se nada chegar em `timeout` segundos."""
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        message = self._queue.popleft()
+        self._bytes -= len(message)
+        return message
+
+
+class EventHub:
+    """Assinantes deste worker, agrupados por estabelecimento, e o listener do Redis."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._sync_redis = None
+        self._sync_redis_lock = threading.Lock()
+        self._redis_down_until = 0.0
+        self._channels_changed = asyncio.Event() # Estabelecimentos com clientes mudaram: o listener reinscreve
+
+    # --- Assinaturas (chamadas no loop, pelo endpoint SSE) ---
+
+    def subscribe(self, establishment_id: int) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(
+            establishment_id,
+            max_events=settings.REALTIME_QUEUE_MAX_EVENTS,
+            max_bytes=settings.REALTIME_QUEUE_MAX_BYTES,
+        )
+        if establishment_id not in self._subscribers:
+            self._subscribers[establishment_id] = set()
+            self._channels_changed.set()
+        self._subscribers[establishment_id].add(subscriber)
+        if settings.REALTIME_BACKEND == "redis" and (self._listener is None or self._listener.done()):
+            self._listener = self._loop.create_task(self._listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.establishment_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.establishment_id]
+                self._channels_changed.set()
+        if subscriber.dropped:
+            logger.info("Conexão SSE do estabelecimento %s descartou %s eventos por backpressure",
+                        subscriber.establishment_id, subscriber.dropped)
+
+    def connection_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _dispatch(self, establishment_id: int, message: str) -> None:
+        subscribers = self._subscribers.get(establishment_id)
+        if not subscribers:
+            return
+        frame = sse_frame(message)
+        for subscriber in list(subscribers):
+            subscriber.push(frame)
+
+    # --- Publicação (qualquer thread) ---
+
+    def _deliver_locally(self, establishment_id: int, message: str) -> None:
+        loop = self._loop
+        if loop is None or establishment_id not in self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, establishment_id, message)
+        except RuntimeError: # Loop já encerrado (shutdown)
+            pass
+
+    def _redis_client(self):
+        with self._sync_redis_lock:
+            if self._sync_redis is None:
+                import redis
+                self._sync_redis = redis.Redis.from_url(
+                    settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5
+                )
+            return self._sync_redis
+
+    def publish(self, establishment_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        if not settings.REALTIME_ENABLED:
+            return
+        message = encode_event(establishment_id, event_type, data)
+        if settings.REALTIME_BACKEND == "redis" and time.monotonic() >= self._redis_down_until:
+            try:
+                self._redis_client().publish(channel_for(establishment_id), message)
+                return
+            except Exception:
+                self._redis_down_until = time.monotonic() + settings.REALTIME_REDIS_RETRY_SECONDS
+                logger.warning("Falha ao publicar evento no Redis; entregando só neste worker", exc_info=True)
+        self._deliver_locally(establishment_id, message)
+
+    # --- Listener do Redis (uma conexão pub/sub por worker) ---
+
+    async def _read(self, pubsub) -> None:
+        """Entrega as mensagens do pub/sub. Só termina com erro (conexão caiu) ou cancelado."""
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message and message["type"] == "message":
+                channel = message["channel"].decode()
+                payload = message["data"].decode()
+                self._dispatch(int(channel[len(CHANNEL_PREFIX):]), payload)
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        backoff = 0.5
+        lost = False # Conexão caiu e ainda não voltou: um resync para todos quando voltar
+        while self._subscribers:
+            client = aioredis.Redis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            reader: Optional[asyncio.Task] = None
+            subscribed: Set[int] = set()
+            try:
+                while self._subscribers:
+                    # As inscrições acompanham os estabelecimentos com clientes neste worker e são
+                    # feitas assim que mudam (subscribe/unsubscribe acordam este loop). O comando
+                    # só escreve na conexão; a leitura fica com o reader.
+                    self._channels_changed.clear()
+                    wanted = set(self._subscribers)
+                    if wanted - subscribed:
+                        await pubsub.subscribe(*(channel_for(i) for i in wanted - subscribed))
+                    if subscribed - wanted:
+                        await pubsub.unsubscribe(*(channel_for(i) for i in subscribed - wanted))
+                    subscribed = wanted
+                    backoff = 0.5
+                    if reader is None:
+                        reader = asyncio.create_task(self._read(pubsub))
+                    if lost:
+                        # Inscrito de novo: os eventos da queda se perderam e os clientes recarregam
+                        lost = False
+                        for establishment_id in list(self._subscribers):
+                            self._dispatch(establishment_id, encode_event(establishment_id, RESYNC_EVENT, {"reason": "redis_reconnect"}))
+                    changed = asyncio.create_task(self._channels_changed.wait())
+                    try:
+                        await asyncio.wait({reader, changed}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        changed.cancel()
+                    if reader.done():
+                        reader.result() # Levanta o erro da conexão
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if not lost:
+                    logger.warning("Conexão de pub/sub com o Redis caiu; reconectando", exc_info=True)
+                lost = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if reader is not None:
+                    reader.cancel()
+                    try:
+                        await reader
+                    except (asyncio.CancelledError, Exception):
+                        pass
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        """Shutdown do worker: encerra o listener e o cliente síncrono do Redis."""
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._listener = None
+        with self._sync_redis_lock:
+            if self._sync_redis is not None:
+                self._sync_redis.close()
+                self._sync_redis = None
+
+
+hub = EventHub()
+
+
+def publish(establishment_id: int, event_type: str, data: Dict[str, Any]) -> None:
+    hub.publish(establishment_id, event_type, data)
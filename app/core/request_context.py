@@ -0,0 +1,53 @@
+# app/core/request_context.py
+# Contexto por requisição compartilhado pela instrumentação (métricas, log de queries lentas, profiling).
+# O middleware cria um RequestContext e o coloca em um ContextVar; como o anyio copia o contexto
+# ao despachar endpoints/dependências síncronas para o threadpool, os listeners do SQLAlchemy
+# (que rodam nessas threads) enxergam o mesmo objeto e podem acumular estatísticas nele.
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestContext:
+    scope: dict
+    sql_statements: int = 0
+    sql_time_seconds: float = 0.0
+    extras: dict = field(default_factory=dict)
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+    @property
+    def route(self) -> str:
+        return route_template(self.scope)
+
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("orkestre_request_context", default=None)
+
+
+def route_template(scope: dict) -> str:
+    """
+    Retorna o template da rota (ex: '/api/v1/establishments/{establishment_id}/appointments/')
+    e nunca o path cru, para manter a cardinalidade dos labels baixa.
+    O FastAPI só preenche scope['route'] depois do roteamento; antes disso (ou para 404) devolve 'unmatched'.
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def get_current_request() -> Optional[RequestContext]:
+    """Contexto da requisição em andamento, ou None fora de uma requisição (scheduler, CLI)."""
+    return _current_request.get()
+
+
+def set_current_request(context: Optional[RequestContext]):
+    """Define o contexto corrente e devolve o token para restaurar com reset_current_request()."""
+    return _current_request.set(context)
+
+
+def reset_current_request(token) -> None:
+    _current_request.reset(token)
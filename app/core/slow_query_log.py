@@ -0,0 +1,213 @@
+# app/core/slow_query_log.py
+# Log de queries lentas com captura automática do plano (EXPLAIN).
+#
+# Todo statement que passar de SLOW_QUERY_THRESHOLD_MS vira um registro com:
+#   - o SQL, os parâmetros (com dados pessoais mascarados) e a rota que o disparou;
+#   - o plano de `EXPLAIN (ANALYZE off, FORMAT JSON)` (apenas PostgreSQL).
+# Os registros vão para um ring buffer em memória (exposto em /api/v1/admin/slow-queries)
+# e para o log estruturado (logger "orkestre.slow_query", uma linha JSON por ocorrência).
+#
+# Para a captura nunca virar um problema de carga:
+#   - só uma fração das queries lentas é capturada (SLOW_QUERY_SAMPLE_RATE);
+#   - o EXPLAIN de um mesmo SQL é reaproveitado por SLOW_QUERY_EXPLAIN_TTL_SECONDS;
+#   - ANALYZE fica desligado, então o EXPLAIN não executa a query de novo.
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.request_context import get_current_request
+
+logger = logging.getLogger("orkestre.slow_query")
+
+REDACTED = "***"
+# Nomes de parâmetro que carregam dados pessoais (SQLAlchemy gera nomes como 'customer_phone_1')
+_PII_PARAM_NAME = re.compile(r"(name|phone|email|password|notes|token|address)", re.IGNORECASE)
+# Valores com cara de e-mail ou telefone são mascarados mesmo sem nome (parâmetros posicionais)
+_PII_VALUE = re.compile(r"(^[^@\s]+@[^@\s]+$)|(^[\d\s()+\-.]{8,}$)")
+_EXPLAINABLE = re.compile(r"^\s*(select|with|update|delete|insert)\b", re.IGNORECASE)
+_MAX_STATEMENT_CHARS = 4000
+_MAX_CACHED_PLANS = 256
+
+
+def redact_value(value: Any) -> Any:
+    if isinstance(value, str) and _PII_VALUE.match(value.strip()):
+        return REDACTED
+    return value
+
+def redact_parameters(parameters: Any) -> Any:
+    """Mascara parâmetros com dados pessoais (por nome e por formato do valor)."""
+    if isinstance(parameters, dict):
+        return {
+            key: REDACTED if _PII_PARAM_NAME.search(str(key)) else redact_value(value)
+            for key, value in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(item) if isinstance(item, (dict, list, tuple)) else redact_value(item) for item in parameters]
+    return parameters
+
+def _redacted_originals(parameters: Any, redacted: Any) -> set:
+    """Valores originais que foram mascarados (para removê-los também do texto do plano)."""
+    if isinstance(parameters, dict):
+        pairs = [(parameters[key], redacted[key]) for key in parameters]
+    elif isinstance(parameters, (list, tuple)):
+        pairs = list(zip(parameters, redacted))
+    else:
+        return set()
+    secrets = set()
+    for original, masked in pairs:
+        if isinstance(original, (dict, list, tuple)):
+            secrets |= _redacted_originals(original, masked)
+        elif masked == REDACTED and original is not None and original != REDACTED:
+            secrets.add(str(original))
+    return secrets
+
+def scrub_plan(plan: Any, secrets: set) -> Any:
+    """O EXPLAIN embute os valores dos parâmetros (ex: Index Cond); mascara os mesmos dados pessoais."""
+    if not secrets:
+        return plan
+    if isinstance(plan, dict):
+        return {key: scrub_plan(value, secrets) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [scrub_plan(item, secrets) for item in plan]
+    if isinstance(plan, str):
+        for secret in secrets:
+            plan = plan.replace(secret, REDACTED)
+    return plan
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return str(value)
+
+
+class SlowQueryLog:
+    """Ring buffer thread-safe com os últimos registros de queries lentas."""
+
+    def __init__(self, max_entries: int):
+        self._entries = deque(maxlen=max_entries)
+        self._plans: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Registros do mais recente para o mais antigo."""
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit else items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def cached_plan(self, statement: str) -> Optional[Any]:
+        with self._lock:
+            cached = self._plans.get(statement)
+        if cached and time.monotonic() - cached[0] < settings.SLOW_QUERY_EXPLAIN_TTL_SECONDS:
+            return cached[1]
+        return None
+
+    def store_plan(self, statement: str, plan: Any) -> None:
+        with self._lock:
+            self._plans[statement] = (time.monotonic(), plan)
+            self._plans.move_to_end(statement)
+            while len(self._plans) > _MAX_CACHED_PLANS:
+                self._plans.popitem(last=False)
+
+
+slow_query_log = SlowQueryLog(max_entries=settings.SLOW_QUERY_BUFFER_SIZE)
+
+
+def _explain(cursor, statement: str, parameters: Any) -> Any:
+    """
+    Roda o EXPLAIN no cursor DBAPI (sem passar pelos eventos do SQLAlchemy), protegido por
+    um SAVEPOINT: se o EXPLAIN falhar, a transação da requisição continua utilizável.
+    """
+    try:
+        explain_cursor = cursor.connection.cursor()
+    except Exception as e:
+        return {"error": str(e)}
+    try:
+        explain_cursor.execute("SAVEPOINT orkestre_explain")
+        try:
+            explain_cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters)
+            plan = explain_cursor.fetchone()[0]
+            explain_cursor.execute("RELEASE SAVEPOINT orkestre_explain")
+            return plan
+        except Exception as e:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT orkestre_explain")
+            return {"error": str(e)}
+    except Exception as e:
+        # Ex: conexão em autocommit (sem transação para o SAVEPOINT). Nunca quebra a requisição.
+        return {"error": str(e)}
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("orkestre_slow_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["orkestre_slow_query_start"].pop()) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    redacted_parameters = redact_parameters(parameters)
+    plan = None
+    can_explain = (
+        settings.SLOW_QUERY_EXPLAIN
+        and not executemany
+        and conn.dialect.name == "postgresql"
+        and _EXPLAINABLE.match(statement)
+    )
+    if can_explain:
+        plan = slow_query_log.cached_plan(statement)
+        if plan is None:
+            plan = scrub_plan(_explain(cursor, statement, parameters), _redacted_originals(parameters, redacted_parameters))
+            slow_query_log.store_plan(statement, plan)
+
+    request = get_current_request()
+    entry = {
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(elapsed_ms, 2),
+        "statement": statement[:_MAX_STATEMENT_CHARS],
+        "parameters": _jsonable(redacted_parameters),
+        "method": request.method if request else None,
+        "route": request.route if request else None,
+        "plan": plan,
+    }
+    slow_query_log.append(entry)
+
+    log_fields = {key: value for key, value in entry.items() if key != "plan"}
+    if isinstance(plan, list) and plan:
+        top_node = plan[0].get("Plan", {})
+        log_fields["plan_node"] = top_node.get("Node Type")
+        log_fields["plan_total_cost"] = top_node.get("Total Cost")
+    logger.warning(json.dumps({"event": "slow_query", **log_fields}, default=str))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra o log de queries lentas no engine (idempotente)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
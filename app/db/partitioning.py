@@ -0,0 +1,262 @@
+# app/db/partitioning.py
+# Particionamento mensal (RANGE em start_time) da tabela `appointments` no PostgreSQL.
+#
+# As queries quentes (horários disponíveis, agenda, lembretes) filtram por start_time, então
+# com partições mensais o Postgres só toca as partições do período (partition pruning) e cada
+# partição tem índices pequenos. O ORM não muda: o modelo Appointment continua com `id` como
+# chave primária e a tabela pai `appointments` recebe INSERT/UPDATE/DELETE normalmente (o
+# Postgres roteia para a partição certa e move a linha se start_time mudar de mês).
+#
+# Fluxo:
+#   python manage.py partition-appointments     -> conversão única da tabela existente
+#   python manage.py maintain-partitions        -> cria partições futuras (também feito pelo scheduler)
+#   python manage.py maintain-partitions --archive --older-than-months 12 --mode export
+#
+# Diferenças em relação à tabela comum:
+#   - a PK física passa a ser (id, start_time), exigência do Postgres para tabelas particionadas;
+#     `id` continua único porque vem de uma única sequence;
+#   - nenhuma outra tabela pode ter FK para appointments.id (FK exigiria a PK composta).
+import gzip
+import os
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+from app.models.appointment_model import Appointment
+
+PARENT_TABLE = "appointments"
+LEGACY_TABLE = "appointments_unpartitioned"
+DEFAULT_PARTITION = "appointments_default"
+ARCHIVE_SCHEMA = "appointments_archive"
+SEQUENCE = "appointments_id_seq"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year}_{month.month:02d}"
+
+
+def _month_of_partition(name: str) -> Optional[date]:
+    if not name.startswith(f"{PARENT_TABLE}_p"):
+        return None
+    try:
+        year, month_number = name.rsplit("_p", 1)[1].split("_")
+        return date(int(year), int(month_number), 1)
+    except ValueError:
+        return None
+
+
+def _bound(month: date) -> str:
+    # Limites sempre em UTC, para que o mês da partição não dependa do TimeZone da sessão
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def is_supported(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if not is_supported(connection):
+        return False
+    relkind = connection.execute(
+        text("SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+             "WHERE c.relname = :name AND n.nspname = current_schema()"),
+        {"name": PARENT_TABLE},
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(connection: Connection) -> List[Dict]:
+    """Partições atuais com o mês coberto (None para a partição default) e a estimativa de linhas."""
+    rows = connection.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, c.reltuples::bigint AS estimated_rows "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = (:parent)::regclass ORDER BY c.relname"
+    ), {"parent": PARENT_TABLE}).all()
+    partitions = []
+    for name, bound, estimated_rows in rows:
+        partitions.append({"name": name, "month": _month_of_partition(name), "bound": bound, "estimated_rows": max(estimated_rows, 0)})
+    return partitions
+
+
+def _create_partition(connection: Connection, month: date) -> str:
+    """
+    Cria a partição do mês. Se a partição default já recebeu linhas desse mês (agendamentos
+    marcados além do horizonte), elas são movidas antes do ATTACH, que senão falharia.
+    """
+    name = partition_name(month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    has_default = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar()
+    stray_rows = 0
+    if has_default:
+        stray_rows = connection.execute(text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE start_time >= {lower} AND start_time < {upper}"
+        )).scalar()
+    if not stray_rows:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES FROM ({lower}) TO ({upper})"))
+        return name
+
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE start_time >= {lower} AND start_time < {upper} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"))
+    return name
+
+
+def ensure_partitions(connection: Connection, *, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Garante as partições do mês corrente até `months_ahead` meses à frente. Retorna as criadas."""
+    if not is_partitioned(connection):
+        return []
+    current = month_start(today or datetime.now(timezone.utc).date())
+    existing = {partition["month"] for partition in list_partitions(connection)}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            created.append(_create_partition(connection, month))
+    connection.commit()
+    return created
+
+
+def partition_appointments(connection: Connection, *, months_ahead: int, today: Optional[date] = None) -> Dict:
+    """
+    Converte a tabela `appointments` comum em particionada por mês, numa única transação
+    (a tabela fica bloqueada durante a cópia; rode em janela de manutenção).
+    Os índices e FKs são recriados a partir do modelo, depois da carga.
+    """
+    if not is_supported(connection):
+        raise ValueError("Particionamento só é suportado no PostgreSQL.")
+    if is_partitioned(connection):
+        raise ValueError("A tabela appointments já está particionada.")
+
+    table = Appointment.__table__
+    current = month_start(today or datetime.now(timezone.utc).date())
+
+    connection.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    oldest, newest = connection.execute(text(f"SELECT min(start_time), max(start_time) FROM {PARENT_TABLE}")).one()
+    first_month = month_start(oldest.astimezone(timezone.utc).date()) if oldest else current
+    last_month = max(add_months(current, months_ahead), month_start(newest.astimezone(timezone.utc).date()) if newest else current)
+
+    # A sequence é do id da tabela antiga: desvincula para não ser apagada junto com ela
+    connection.execute(text(f"ALTER SEQUENCE {SEQUENCE} OWNED BY NONE"))
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+    connection.execute(text(
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (start_time)"
+    ))
+
+    month = first_month
+    partitions = 0
+    while month <= last_month:
+        connection.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+        ))
+        partitions += 1
+        month = add_months(month, 1)
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    rows = connection.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {LEGACY_TABLE}")).rowcount
+    connection.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    connection.execute(text(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {PARENT_TABLE}.id"))
+
+    # Índices e restrições depois da carga (mais rápido do que manter durante o INSERT).
+    # Criados na tabela pai, o Postgres replica em cada partição.
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, start_time)"))
+    for foreign_key in table.foreign_keys:
+        target_table, target_column = foreign_key.target_fullname.split(".")
+        on_delete = f" ON DELETE {foreign_key.ondelete}" if foreign_key.ondelete else ""
+        connection.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY ({foreign_key.parent.name}) "
+            f"REFERENCES {target_table} ({target_column}){on_delete}"
+        ))
+    for index in table.indexes:
+        connection.execute(CreateIndex(index))
+    connection.execute(text(f"ANALYZE {PARENT_TABLE}"))
+    connection.commit()
+    return {"rows": rows, "partitions": partitions, "first_month": first_month, "last_month": last_month}
+
+
+def archive_partitions(
+    connection: Connection,
+    *,
+    older_than_months: int,
+    mode: str,
+    archive_dir: str,
+    today: Optional[date] = None,
+) -> List[Dict]:
+    """
+    Tira da tabela as partições de meses inteiramente anteriores a `older_than_months` meses atrás.
+      - mode="detach": DETACH + move para o schema appointments_archive (continua consultável via SQL);
+      - mode="export": DETACH + COPY para um CSV gzip em `archive_dir` + DROP (libera o espaço).
+    A partição default e os meses recentes nunca são arquivados.
+    """
+    if mode not in ("detach", "export"):
+        raise ValueError("Modo de arquivamento inválido (use 'detach' ou 'export').")
+    if older_than_months < 1:
+        raise ValueError("older_than_months precisa ser pelo menos 1.")
+    if not is_partitioned(connection):
+        return []
+
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -older_than_months)
+    archived = []
+    for partition in list_partitions(connection):
+        month = partition["month"]
+        if month is None or add_months(month, 1) > cutoff:
+            continue
+        name = partition["name"]
+        connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        result = {"name": name, "month": month, "mode": mode}
+        if mode == "detach":
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        else:
+            os.makedirs(archive_dir, exist_ok=True)
+            path = os.path.join(archive_dir, f"{name}.csv.gz")
+            cursor = connection.connection.cursor() # cursor DBAPI (psycopg2) da mesma transação
+            try:
+                with gzip.open(path, "wt", encoding="utf-8") as output:
+                    cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", output)
+                result["rows"] = cursor.rowcount
+            finally:
+                cursor.close()
+            connection.execute(text(f"DROP TABLE {name}"))
+            result["file"] = path
+        # Commit por partição: se uma falhar, as anteriores já ficam arquivadas
+        connection.commit()
+        archived.append(result)
+    return archived
+
+
+def detached_partitions(connection: Connection) -> List[Dict]:
+    """Partições arquivadas com mode="detach" (tabelas no schema appointments_archive), por mês."""
+    if not is_supported(connection):
+        return []
+    names = connection.execute(
+        text("SELECT tablename FROM pg_tables WHERE schemaname = :schema"), {"schema": ARCHIVE_SCHEMA}
+    ).scalars()
+    partitions = [{"name": name, "month": _month_of_partition(name)} for name in names]
+    return sorted((partition for partition in partitions if partition["month"]), key=lambda partition: partition["month"])
+
+
+def exported_months(archive_dir: str) -> List[date]:
+    """Meses arquivados com mode="export" (CSV gzip em `archive_dir`; as linhas saíram do banco)."""
+    try:
+        names = os.listdir(archive_dir)
+    except FileNotFoundError:
+        return []
+    suffix = ".csv.gz"
+    return sorted(filter(None, (_month_of_partition(name[: -len(suffix)]) for name in names if name.endswith(suffix))))
@@ -0,0 +1,53 @@
+# app/db/schema_sync.py
+# Atualização leve do schema para bancos já existentes (o projeto não usa Alembic).
+#
+# O create_all só cria tabelas que não existem; colunas e índices novos em tabelas antigas
+# ficariam de fora. Aqui comparamos o metadata com o banco e adicionamos o que falta:
+#   - colunas novas (precisam ser anuláveis ou ter server_default, senão o ALTER falharia com dados);
+#   - índices declarados no modelo que ainda não existem.
+# Nunca remove nem altera nada existente. Chamado pelo init_db (`python manage.py init-db`).
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, MetaData
+
+
+def _column_ddl(connection: Connection, column) -> str:
+    # Mesma especificação que o CREATE TABLE usaria (tipo, DEFAULT, NOT NULL), mais a FK inline
+    ddl = connection.dialect.ddl_compiler(connection.dialect, None).get_column_specification(column)
+    for foreign_key in column.foreign_keys:
+        target_table, target_column = foreign_key.target_fullname.split(".")
+        ddl += f" REFERENCES {target_table} ({target_column})"
+        if foreign_key.ondelete:
+            ddl += f" ON DELETE {foreign_key.ondelete}"
+    return ddl
+
+
+def sync_schema(connection: Connection, metadata: MetaData) -> List[str]:
+    """Adiciona colunas e índices que existem no metadata mas não no banco. Retorna o DDL executado."""
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    executed = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue # Tabelas novas ficam com o create_all
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise ValueError(
+                    f"Coluna {table.name}.{column.name} é NOT NULL sem server_default; adicione-a manualmente."
+                )
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(connection, column)}"
+            connection.exec_driver_sql(ddl)
+            executed.append(ddl)
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                statement = CreateIndex(index)
+                connection.execute(statement)
+                executed.append(str(statement.compile(dialect=connection.dialect)).strip())
+    return executed
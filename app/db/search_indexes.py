@@ -0,0 +1,56 @@
+# app/db/search_indexes.py
+# Índices trigrama (extensão pg_trgm) para a busca da recepção (GET /establishments/{id}/search).
+#
+# Índices GIN com gin_trgm_ops atendem ILIKE '%termo%' e o operador de similaridade por
+# palavra (<%), então a busca por pedaço de nome/telefone/e-mail não varre a tabela.
+# A busca é feita no diretório de clientes (customers), e não em appointments: um cliente
+# aparece uma vez, não uma vez por agendamento, e a tabela é ordens de grandeza menor.
+#
+# Criados pelo init_db. Sem pg_trgm (ou sem permissão para CREATE EXTENSION), e fora do
+# PostgreSQL, a busca continua funcionando só com ILIKE, sem ranking por similaridade.
+import logging
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger("orkestre.search")
+
+# (nome do índice, tabela, coluna)
+TRIGRAM_INDEXES = [
+    ("ix_customers_name_trgm", "customers", "name"),
+    ("ix_customers_phone_normalized_trgm", "customers", "phone_normalized"),
+    ("ix_customers_email_trgm", "customers", "email"),
+    ("ix_services_name_trgm", "services", "name"),
+    ("ix_professionals_name_trgm", "professionals", "name"),
+]
+
+
+def trigram_available(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar())
+
+
+def ensure_search_indexes(connection: Connection) -> List[str]:
+    """Instala a pg_trgm (se possível) e cria os índices que faltam. Retorna os índices criados."""
+    if connection.dialect.name != "postgresql":
+        return []
+    if not trigram_available(connection):
+        try:
+            with connection.begin_nested(): # SAVEPOINT: a falha não aborta a transação do init_db
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except DBAPIError as error:
+            logger.warning("pg_trgm indisponível; a busca usará apenas ILIKE: %s", error.orig)
+            return []
+
+    existing = {row[0] for row in connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+    ))}
+    created = []
+    for name, table, column in TRIGRAM_INDEXES:
+        if name not in existing:
+            connection.execute(text(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)"))
+            created.append(name)
+    return created
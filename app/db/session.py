@@ -2,10 +2,21 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+def _engine_kwargs() -> dict:
+    # Tamanho do pool por processo: com N workers o total de conexões é
+    # N * (DB_POOL_SIZE + DB_MAX_OVERFLOW), que precisa caber no max_connections do Postgres.
+    kwargs = {"pool_pre_ping": True}
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        kwargs["pool_size"] = settings.DB_POOL_SIZE
+        kwargs["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return kwargs
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_kwargs())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Função para criar tabelas (chamar isso no main.py para desenvolvimento)
+# Função para criar tabelas (chamada pelo `python manage.py init-db`)
 def init_db():
     from app.db.base_class import Base
     # Importar todos os modelos aqui para que sejam registrados no Base
@@ -15,5 +26,50 @@ def init_db():
     from app.models.appointment_model import Appointment
     from app.models.professional_model import Professional # NOVO
     from app.models.user_establishment_link import user_establishment_link # NOVO
+    from app.models.customer_model import Customer
+    from app.models.schedule_exception_model import ScheduleException
+    from app.models.appointment_series_model import AppointmentSeries, AppointmentSeriesException
+    from app.models.appointment_event_model import AppointmentEvent
+    from app.models.appointment_stats_model import AppointmentDailyStat
+    from app.models.archived_appointment_model import ArchivedAppointment
+    from app.models.waitlist_model import WaitlistEntry, WaitlistShape, WaitlistWindow
+    from app.db.schema_sync import sync_schema
+    from app.db.search_indexes import ensure_search_indexes
+
+    Base.metadata.create_all(bind=engine)
+    # Colunas e índices novos em tabelas que já existiam (create_all não altera tabelas)
+    with engine.begin() as connection:
+        sync_schema(connection, Base.metadata)
+        ensure_search_indexes(connection)
+
+# --- Ciclo de vida do pool (multi-worker) ---
+
+def reset_engine_after_fork():
+    """
+    Deve ser chamada no processo filho logo após o fork (ex: post_fork do gunicorn).
+    Descarta o pool herdado do processo pai SEM fechar as conexões dele (close=False),
+    para que o filho abra as suas próprias. O objeto `engine` continua o mesmo,
+    então SessionLocal e os listeners de eventos registrados nele seguem válidos.
+    """
+    engine.dispose(close=False)
+
+def warm_pool(connections: int) -> int:
+    """
+    Abre `connections` conexões ao mesmo tempo e as devolve ao pool, para que as
+    primeiras requisições do worker não paguem o custo do handshake com o banco.
+    Retorna quantas conexões foram efetivamente abertas.
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            connection.exec_driver_sql("SELECT 1")
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close() # Devolve ao pool (não fecha o socket)
+    return len(opened)
 
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+def dispose_engine():
+    """Fecha todas as conexões ociosas do pool (usado no shutdown do worker)."""
+    engine.dispose()
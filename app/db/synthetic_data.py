@@ -0,0 +1,376 @@
+# app/db/synthetic_data.py
+# Gerador de dados sintéticos para testes de escala (`python manage.py generate-data`).
+#
+# Produz tenants completos — usuários (dono + colaboradores), estabelecimentos com fusos e
+# working_hours_config variados, serviços, profissionais, vínculos user_establishment_link
+# e agendamentos com distribuição realista de status — e carrega tudo em lote:
+#   - PostgreSQL: COPY ... FROM STDIN (CSV), o caminho mais rápido;
+#   - qualquer banco: executemany via SQLAlchemy Core (INSERT em lote).
+# Nunca passa pelo ORM (db.add), que seria ordens de grandeza mais lento.
+#
+# A saída é determinística: mesma seed + mesma data âncora => mesmas linhas. Cada estabelecimento
+# usa um Random próprio derivado da seed, então o resultado não depende do tamanho do lote.
+import csv
+import itertools
+import io
+import json
+import random
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pytz
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.establishment_model import Establishment
+from app.models.professional_model import Professional
+from app.models.role_enum import Role
+from app.models.service_model import Service
+from app.models.user_establishment_link import user_establishment_link
+from app.models.user_model import User
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+SYNTHETIC_PASSWORD = "synthetic-password" # Senha de todos os usuários gerados
+EMAIL_DOMAIN = "synthetic.orkestre.dev"
+
+# Fusos com pesos aproximando a base atual (maioria no Brasil)
+TIMEZONES = [
+    ("America/Sao_Paulo", 60), ("America/Recife", 10), ("America/Manaus", 8), ("America/Cuiaba", 5),
+    ("America/Fortaleza", 7), ("Europe/Lisbon", 5), ("America/New_York", 5),
+]
+INTERVALS = [(10, 5), (15, 25), (20, 10), (30, 45), (60, 15)]
+SERVICE_CATALOG = [
+    ("Banho", 30), ("Banho e Tosa", 90), ("Tosa Higiênica", 45), ("Consulta Veterinária", 30),
+    ("Vacinação", 15), ("Corte de Cabelo", 45), ("Escova", 60), ("Manicure", 60),
+    ("Hidratação", 60), ("Coloração", 120), ("Barba", 30), ("Check-up", 60),
+]
+PAST_STATUSES = [
+    (AppointmentStatus.COMPLETED, 70), (AppointmentStatus.NO_SHOW, 8),
+    (AppointmentStatus.CANCELLED_BY_CLIENT, 12), (AppointmentStatus.CANCELLED_BY_ESTABLISHMENT, 5),
+    (AppointmentStatus.CONFIRMED, 3), (AppointmentStatus.PENDING, 2),
+]
+FUTURE_STATUSES = [
+    (AppointmentStatus.CONFIRMED, 55), (AppointmentStatus.PENDING, 35),
+    (AppointmentStatus.CANCELLED_BY_CLIENT, 7), (AppointmentStatus.CANCELLED_BY_ESTABLISHMENT, 2),
+    (AppointmentStatus.RESCHEDULED, 1),
+]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Felipe", "Gabriela", "Hugo", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vanessa", "Yuri"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira", "Almeida", "Ribeiro"]
+
+# Ordem de carga respeitando as chaves estrangeiras
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "users": ["id", "email", "hashed_password", "is_active", "is_email_verified"],
+    "establishments": ["id", "name", "phone_number", "timezone", "working_hours_config"],
+    "user_establishment_link": ["user_id", "establishment_id", "role"],
+    "services": ["id", "name", "description", "price", "duration_minutes", "is_active", "establishment_id"],
+    "professionals": ["id", "name", "establishment_id"],
+    "appointments": ["id", "start_time", "end_time", "customer_name", "customer_phone", "customer_email",
+                     "status", "establishment_id", "service_id"],
+}
+TABLES = {
+    "users": User.__table__,
+    "establishments": Establishment.__table__,
+    "user_establishment_link": user_establishment_link,
+    "services": Service.__table__,
+    "professionals": Professional.__table__,
+    "appointments": Appointment.__table__,
+}
+JSON_COLUMNS = {("establishments", "working_hours_config")}
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def _weighted_sampler(choices):
+    """Versão pré-computada de _weighted para os laços quentes (pesos acumulados calculados uma vez)."""
+    values, weights = zip(*choices)
+    cumulative = list(itertools.accumulate(weights))
+    return lambda rng: rng.choices(values, cum_weights=cumulative, k=1)[0]
+
+
+_past_status = _weighted_sampler(PAST_STATUSES)
+_future_status = _weighted_sampler(FUTURE_STATUSES)
+
+
+def synthetic_email(seed: int, index: int, member: int = 0) -> str:
+    """E-mail do membro `member` (0 = dono) do estabelecimento `index` gerado com `seed`."""
+    prefix = "owner" if member == 0 else f"collab{member}"
+    return f"{prefix}.{seed}.{index}@{EMAIL_DOMAIN}"
+
+
+def random_working_hours(rng: random.Random) -> dict:
+    """Um template semanal plausível: seg-sex com ou sem almoço, sábado meio período, domingo quase sempre fechado."""
+    opening = rng.choice(["07:00", "08:00", "08:30", "09:00", "10:00"])
+    closing = rng.choice(["17:00", "18:00", "19:00", "20:00"])
+    has_lunch = rng.random() < 0.6
+    weekday = {"is_active": True, "start_time": opening, "end_time": closing}
+    if has_lunch:
+        weekday.update({"lunch_break_start_time": "12:00", "lunch_break_end_time": "13:00"})
+    config = {name: dict(weekday) for name in DAYS[:5]}
+    config["saturday"] = (
+        {"is_active": True, "start_time": opening, "end_time": "13:00"} if rng.random() < 0.75 else {"is_active": False}
+    )
+    config["sunday"] = (
+        {"is_active": True, "start_time": "09:00", "end_time": "13:00"} if rng.random() < 0.1 else {"is_active": False}
+    )
+    config["appointment_interval_minutes"] = _weighted(rng, INTERVALS)
+    return config
+
+
+class SyntheticDataGenerator:
+    """Gera as linhas (tuplas na ordem de TABLE_COLUMNS) de cada tabela, estabelecimento por estabelecimento."""
+
+    def __init__(
+        self,
+        *,
+        seed: int,
+        anchor_date: date,
+        appointments_per_establishment: int,
+        history_days: int = 365,
+        future_days: int = 60,
+        first_ids: Optional[Dict[str, int]] = None,
+        hashed_password: str = "",
+    ):
+        self.seed = seed
+        self.anchor_date = anchor_date
+        self.appointments_per_establishment = appointments_per_establishment
+        self.history_days = history_days
+        self.future_days = future_days
+        self.next_id = dict(first_ids or {})
+        self.hashed_password = hashed_password
+        self._utc_offsets: Dict[tuple, timedelta] = {}
+        self.anchor_utc = pytz.utc.localize(datetime.combine(anchor_date, time.min))
+
+    def _new_id(self, table: str) -> int:
+        value = self.next_id.get(table, 1)
+        self.next_id[table] = value + 1
+        return value
+
+    def _utc_offset(self, tz_name: str, day: date) -> timedelta:
+        # Offset do fuso no meio do dia (cacheado): evita um localize() por agendamento.
+        key = (tz_name, day)
+        offset = self._utc_offsets.get(key)
+        if offset is None:
+            offset = pytz.timezone(tz_name).localize(datetime.combine(day, time(12))).utcoffset()
+            self._utc_offsets[key] = offset
+        return offset
+
+    def establishment_rows(self, index: int) -> Iterable[tuple]:
+        """Todas as linhas de um tenant. Retorna pares (tabela, tupla)."""
+        rng = random.Random(f"{self.seed}:{index}")
+
+        establishment_id = self._new_id("establishments")
+        tz_name = _weighted(rng, TIMEZONES)
+        working_hours = random_working_hours(rng)
+        yield "establishments", (
+            establishment_id,
+            f"Estabelecimento Sintético {index}",
+            f"11{rng.randint(30000000, 39999999)}",
+            tz_name,
+            working_hours,
+        )
+
+        for member in range(1 + rng.choice([0, 0, 1, 1, 2, 3])):
+            user_id = self._new_id("users")
+            yield "users", (user_id, synthetic_email(self.seed, index, member), self.hashed_password, True, True)
+            yield "user_establishment_link", (user_id, establishment_id, (Role.OWNER if member == 0 else Role.COLLABORATOR).name)
+
+        services = []
+        for name, duration in rng.sample(SERVICE_CATALOG, rng.randint(3, len(SERVICE_CATALOG))):
+            service_id = self._new_id("services")
+            services.append((service_id, duration))
+            yield "services", (service_id, name, None, round(rng.uniform(30, 250), 2), duration, rng.random() > 0.05, establishment_id)
+
+        for _ in range(rng.randint(1, 6)):
+            yield "professionals", (self._new_id("professionals"), f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", establishment_id)
+
+        yield from self._appointment_rows(rng, establishment_id, tz_name, working_hours, services)
+
+    def _appointment_rows(self, rng, establishment_id, tz_name, working_hours, services) -> Iterable[tuple]:
+        interval = working_hours["appointment_interval_minutes"]
+        # Pré-calcula, por dia aberto, a abertura em UTC e a duração do expediente: o laço abaixo
+        # roda milhões de vezes e não deve fazer strptime/localize por agendamento.
+        open_days = []
+        for offset in range(-self.history_days, self.future_days + 1):
+            day = self.anchor_date + timedelta(days=offset)
+            config = working_hours[DAYS[day.weekday()]]
+            if config.get("is_active"):
+                opening = datetime.combine(day, datetime.strptime(config["start_time"], "%H:%M").time())
+                closing = datetime.combine(day, datetime.strptime(config["end_time"], "%H:%M").time())
+                opening_utc = pytz.utc.localize(opening - self._utc_offset(tz_name, day))
+                open_days.append((opening_utc, int((closing - opening).total_seconds() // 60)))
+        if not open_days:
+            return
+
+        # Base de clientes do tenant: clientes recorrentes voltam várias vezes
+        customers = [
+            (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"119{rng.randint(10000000, 99999999)}")
+            for _ in range(max(10, self.appointments_per_establishment // 4))
+        ]
+
+        for _ in range(self.appointments_per_establishment):
+            opening_utc, open_minutes = rng.choice(open_days)
+            service_id, duration = rng.choice(services)
+            last_start = open_minutes - duration
+            if last_start < 0:
+                continue
+            start_utc = opening_utc + timedelta(minutes=rng.randint(0, last_start // interval) * interval)
+            status = _past_status(rng) if start_utc < self.anchor_utc else _future_status(rng)
+            customer_name, customer_phone = rng.choice(customers)
+            email = f"{customer_phone}@cliente.{EMAIL_DOMAIN}" if rng.random() < 0.4 else None
+            yield "appointments", (
+                self._new_id("appointments"),
+                start_utc,
+                start_utc + timedelta(minutes=duration),
+                customer_name,
+                customer_phone,
+                email,
+                status.name,
+                establishment_id,
+                service_id,
+            )
+
+
+class BulkLoader:
+    """
+    Acumula linhas por tabela e descarrega em lote (COPY no PostgreSQL, executemany nos demais).
+    Ao descarregar, todas as tabelas são enviadas na ordem das FKs, então um agendamento
+    nunca chega antes do seu estabelecimento.
+    """
+
+    def __init__(self, connection: Connection, *, method: str, batch_size: int):
+        if method == "copy" and connection.dialect.name != "postgresql":
+            raise ValueError("O método 'copy' só está disponível no PostgreSQL; use 'executemany'.")
+        self.connection = connection
+        self.method = method
+        self.batch_size = batch_size
+        self.buffers: Dict[str, List[tuple]] = {table: [] for table in TABLE_COLUMNS}
+        self.rows_loaded: Dict[str, int] = {table: 0 for table in TABLE_COLUMNS}
+        self.seconds: Dict[str, float] = {table: 0.0 for table in TABLE_COLUMNS}
+
+    def add(self, table: str, row: tuple) -> None:
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for table, rows in self.buffers.items():
+            if not rows:
+                continue
+            started = time_module.perf_counter()
+            if self.method == "copy":
+                self._copy(table, rows)
+            else:
+                self._executemany(table, rows)
+            self.seconds[table] += time_module.perf_counter() - started
+            self.rows_loaded[table] += len(rows)
+            self.buffers[table] = []
+        self.connection.commit()
+
+    def _copy(self, table: str, rows: List[tuple]) -> None:
+        columns = TABLE_COLUMNS[table]
+        json_positions = [position for position, column in enumerate(columns) if (table, column) in JSON_COLUMNS]
+        stream = io.StringIO()
+        writer = csv.writer(stream)
+        for row in rows:
+            if json_positions:
+                row = list(row)
+                for position in json_positions:
+                    row[position] = json.dumps(row[position])
+            writer.writerow(row)
+        stream.seek(0)
+        cursor = self.connection.connection.cursor() # cursor DBAPI (psycopg2) da mesma transação
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream)
+        finally:
+            cursor.close()
+
+    def _executemany(self, table: str, rows: List[tuple]) -> None:
+        columns = TABLE_COLUMNS[table]
+        self.connection.execute(TABLES[table].insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def next_ids(connection: Connection) -> Dict[str, int]:
+    """Primeiro id livre de cada tabela (os ids são atribuídos aqui para o COPY conseguir ligar as FKs)."""
+    ids = {}
+    for table_name, table in TABLES.items():
+        if "id" in table.c:
+            ids[table_name] = (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+    return ids
+
+
+def reset_sequences(connection: Connection) -> None:
+    """No PostgreSQL, avança as sequences para depois dos ids inseridos explicitamente."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table_name, table in TABLES.items():
+        if "id" in table.c:
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table_name}), 1))"
+            ))
+    connection.commit()
+
+
+def generate(
+    connection: Connection,
+    *,
+    establishments: int,
+    appointments_per_establishment: int,
+    seed: int,
+    anchor_date: date,
+    method: str,
+    batch_size: int = 50_000,
+    history_days: int = 365,
+    future_days: int = 60,
+    hashed_password: str = "",
+    progress=None,
+) -> dict:
+    """Gera e carrega os tenants. Retorna linhas, segundos e linhas/s por tabela."""
+    already_loaded = connection.execute(
+        select(User.__table__.c.id).where(User.__table__.c.email == synthetic_email(seed, 0))
+    ).first()
+    if already_loaded:
+        raise ValueError(f"Os dados da seed {seed} já foram carregados neste banco; use outra seed para adicionar tenants.")
+
+    generator = SyntheticDataGenerator(
+        seed=seed,
+        anchor_date=anchor_date,
+        appointments_per_establishment=appointments_per_establishment,
+        history_days=history_days,
+        future_days=future_days,
+        first_ids=next_ids(connection),
+        hashed_password=hashed_password,
+    )
+    loader = BulkLoader(connection, method=method, batch_size=batch_size)
+
+    started = time_module.perf_counter()
+    for index in range(establishments):
+        for table, row in generator.establishment_rows(index):
+            loader.add(table, row)
+        if progress and (index + 1) % 100 == 0:
+            progress(index + 1, sum(loader.rows_loaded.values()))
+    loader.flush()
+    reset_sequences(connection)
+    elapsed = time_module.perf_counter() - started
+
+    total_rows = sum(loader.rows_loaded.values())
+    return {
+        "tables": {
+            table: {
+                "rows": loader.rows_loaded[table],
+                "load_seconds": round(loader.seconds[table], 3),
+                "rows_per_second": round(loader.rows_loaded[table] / loader.seconds[table]) if loader.seconds[table] else None,
+            }
+            for table in TABLE_COLUMNS
+        },
+        "total_rows": total_rows,
+        "total_seconds": round(elapsed, 3), # geração + carga
+        "rows_per_second": round(total_rows / elapsed) if elapsed else None,
+    }
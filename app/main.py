@@ -1,18 +1,41 @@
 # main.py
 # Este arquivo é o ponto de entrada da aplicação FastAPI.
-# Ele configura a aplicação, inicializa o banco de dados e inclui os routers da API.
-from fastapi import FastAPI
-from app.db.session import init_db # Importe a função
+# Ele configura a aplicação e inclui os routers da API.
+# IMPORTANTE: importar este módulo NÃO acessa o banco de dados. A criação das tabelas
+# é feita explicitamente com `python manage.py init-db` (ou, em desenvolvimento,
+# com AUTO_CREATE_TABLES=true, que roda init_db() no startup e não no import).
+import sys
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core import metrics, profiling, realtime, slow_query_log
+from app.db import session as db_session
 from app.api.v1.api import api_router as api_v1_router
 from fastapi.middleware.cors import CORSMiddleware
 
 
-# Chame init_db() aqui para criar as tabelas ao iniciar a aplicação
-# Em um ambiente de produção, você usaria migrações (Alembic)
-# Mas para o MVP e desenvolvimento local, isso é suficiente.
-init_db() 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: só toca no banco se o modo de criação automática estiver ligado
+    if settings.AUTO_CREATE_TABLES:
+        await run_in_threadpool(db_session.init_db)
+    # Aquece o pool deste worker para que as primeiras requisições não paguem o handshake
+    if settings.DB_POOL_WARM_CONNECTIONS > 0:
+        await run_in_threadpool(db_session.warm_pool, settings.DB_POOL_WARM_CONNECTIONS)
+
+    yield
+
+    # Shutdown: o servidor já drenou as requisições em andamento antes de chegar aqui
+    # (graceful_timeout no gunicorn). Fechamos o pool e os clientes externos.
+    await realtime.hub.close()
+    await run_in_threadpool(db_session.dispose_engine)
+    if "app.tasks" in sys.modules:
+        sys.modules["app.tasks"].reset_twilio_client()
+
 
-app = FastAPI(title="Orkestre Agenda API")
+app = FastAPI(title="Orkestre Agenda API", lifespan=lifespan)
 
 # Lista de origens permitidas (seu frontend em desenvolvimento)
 origins = [
@@ -30,18 +53,28 @@ app.add_middleware(
     allow_headers=["*"], # Esta linha com wildcard para headers geralmente funciona bem
 )
 
-# Chame init_db() aqui se não chamou antes, ou mantenha onde estava
-# A ordem entre init_db() e app.add_middleware não deve ser crítica,
-# mas geralmente middlewares vêm logo após a instância do app.
-# Se init_db() faz chamadas ao banco na inicialização, certifique-se que o DB está pronto.
-# Por segurança, vamos manter init_db() ANTES de adicionar o router, se ele já estava lá.
-if not hasattr(app, 'db_initialized'): # Para garantir que init_db() seja chamado apenas uma vez
-    init_db()
-    app.db_initialized = True
+# Instrumentação (latência por rota, statements SQL e tempo de banco por requisição)
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(db_session.engine)
+    app.add_middleware(metrics.PrometheusMiddleware)
+
+    @app.get(metrics.METRICS_PATH, include_in_schema=False)
+    def prometheus_metrics():
+        body, content_type = metrics.render_metrics()
+        return Response(content=body, media_type=content_type)
+
+# Log de queries lentas com EXPLAIN (consultado em /api/v1/admin/slow-queries)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.instrument_engine(db_session.engine)
 
 @app.get("/")
 async def root():
     return {"message": "Bem-vindo à API Orkestre Agenda!"}
 
 # Aqui adicionaremos os routers da API v1
-app.include_router(api_v1_router, prefix="/api/v1")
\ No newline at end of file
+app.include_router(api_v1_router, prefix="/api/v1")
+
+# Profiling sob demanda (X-Profile: 1). Precisa vir depois do include_router: envolve as rotas já registradas.
+if settings.PROFILING_ENABLED:
+    profiling.instrument_routes(app)
+    app.add_middleware(profiling.ProfilingMiddleware)
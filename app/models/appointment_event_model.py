@@ -0,0 +1,34 @@
+# app/models/appointment_event_model.py
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index, Enum as SAEnum
+
+from app.db.base_class import Base
+from app.models.appointment_model import AppointmentStatus
+
+class AppointmentEvent(Base):
+    # Log de auditoria append-only dos agendamentos: criação e cada mudança de status, com quem
+    # mudou (actor_user_id), de onde veio (source) e quando. Nunca é atualizado nem apagado pela
+    # aplicação. Gravado na mesma transação da mudança (ver app/services/audit_service.py).
+    # Sem FK para appointments.id: a tabela de agendamentos pode estar particionada (PK composta)
+    # e o agendamento pode ir para o arquivo frio; o log continua.
+    __tablename__ = "appointment_events"
+    __table_args__ = (
+        Index("ix_appointment_events_appointment_id_id", "appointment_id", "id"), # Linha do tempo do agendamento
+        Index("ix_appointment_events_establishment_id_id", "establishment_id", "id"), # Linha do tempo do estabelecimento
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True) # Ordem de gravação; cursor das leituras incrementais
+    appointment_id = Column(Integer, nullable=False)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+
+    event_type = Column(String(20), nullable=False) # "created" ou "status_changed"
+    from_status = Column(SAEnum(AppointmentStatus), nullable=True) # NULL na criação
+    to_status = Column(SAEnum(AppointmentStatus), nullable=False)
+    actor_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True) # NULL: cliente final ou sistema
+    source = Column(String(20), nullable=False) # api, bulk, series, scheduler
+
+    # Cópia dos dados do agendamento no momento do evento (linha do tempo e analytics sem join)
+    service_id = Column(Integer, nullable=True)
+    professional_id = Column(Integer, nullable=True)
+    appointment_start_time = Column(DateTime(timezone=True), nullable=False)
+
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SAEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text, Enum as SAEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum # Para o Enum do status
 
 from app.db.base_class import Base # Importe a classe Base
+from app.models.customer_model import Customer # Registra a tabela customers (FK customer_id)
+from app.models.professional_model import Professional # Registra a tabela professionals (FK professional_id)
 
 # Enum para o status do agendamento
 class AppointmentStatus(str, enum.Enum):
@@ -18,6 +20,15 @@ class AppointmentStatus(str, enum.Enum):
 
 class Appointment(Base):
     # __tablename__ será 'appointments'
+    __table_args__ = (
+        # Histórico do cliente (mais recentes primeiro) sem varrer a tabela
+        Index("ix_appointments_customer_id_start_time", "customer_id", "start_time"),
+        # Agenda do profissional por período
+        Index("ix_appointments_professional_id_start_time", "professional_id", "start_time"),
+        # Próximos agendamentos de cada estabelecimento (painel do dono)
+        Index("ix_appointments_establishment_id_start_time", "establishment_id", "start_time"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     start_time = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -42,6 +53,15 @@ class Appointment(Base):
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     service = relationship("Service") # Relacionamento simples
 
+    # Cliente do diretório (customers). Anulável: preenchido no agendamento e pelo backfill-customers
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    customer = relationship("Customer")
+
+    # Profissional que atende. Anulável: estabelecimentos sem profissionais, agendamentos antigos
+    # e profissionais excluídos (o agendamento fica no histórico, sem profissional)
+    professional_id = Column(Integer, ForeignKey("professionals.id", ondelete="SET NULL"), nullable=True)
+    professional = relationship("Professional")
+
     # Timestamps padrão
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
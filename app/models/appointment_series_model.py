@@ -0,0 +1,58 @@
+# app/models/appointment_series_model.py
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, ForeignKey, Index, Text, UniqueConstraint, Enum as SAEnum
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+from app.models.appointment_model import AppointmentStatus
+
+class AppointmentSeries(Base):
+    # Agendamento recorrente (banho toda semana, consulta todo mês) guardado uma única vez.
+    # As ocorrências não viram linhas em `appointments`: são expandidas sob demanda no período
+    # consultado (ver app/services/recurrence_service.py). Só as ocorrências alteradas
+    # (remarcadas ou com status próprio) são materializadas como agendamentos comuns.
+    __tablename__ = "appointment_series"
+    __table_args__ = (
+        Index("ix_appointment_series_establishment_id_start_date", "establishment_id", "start_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    professional_id = Column(Integer, ForeignKey("professionals.id", ondelete="SET NULL"), nullable=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+
+    customer_name = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False)
+    customer_email = Column(String, nullable=True)
+    notes_by_customer = Column(Text, nullable=True)
+
+    # Regra (subconjunto do RRULE da RFC 5545) e primeira ocorrência, no horário local do estabelecimento
+    rrule = Column(String(255), nullable=False)
+    start_date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    duration_minutes = Column(Integer, nullable=False) # Duração do serviço na criação da série
+    # Data da última ocorrência (UNTIL, COUNT ou série encerrada); NULL = sem fim
+    until_date = Column(Date, nullable=True)
+    status = Column(SAEnum(AppointmentStatus), nullable=False, default=AppointmentStatus.CONFIRMED) # Status das ocorrências
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    exceptions = relationship("AppointmentSeriesException", cascade="all, delete-orphan", passive_deletes=True)
+
+class AppointmentSeriesException(Base):
+    # Exceção de uma ocorrência da série: pulada (appointment_id NULL) ou materializada como o
+    # agendamento `appointment_id` (remarcada ou com status próprio). Sem FK para appointments.id:
+    # a tabela de agendamentos pode estar particionada (PK composta).
+    __tablename__ = "appointment_series_exceptions"
+    __table_args__ = (
+        UniqueConstraint("series_id", "occurrence_date", name="uq_appointment_series_exceptions_series_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    series_id = Column(Integer, ForeignKey("appointment_series.id", ondelete="CASCADE"), nullable=False)
+    occurrence_date = Column(Date, nullable=False) # Data local original da ocorrência
+    appointment_id = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
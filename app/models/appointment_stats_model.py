@@ -0,0 +1,30 @@
+# app/models/appointment_stats_model.py
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, UniqueConstraint, Enum as SAEnum
+
+from app.db.base_class import Base
+from app.models.appointment_model import AppointmentStatus
+
+class AppointmentDailyStat(Base):
+    # Rollup dos agendamentos: quantos estão em cada status, por profissional, serviço e dia local
+    # do estabelecimento. Mantido de forma incremental na mesma transação de cada criação e mudança
+    # de status (ver app/services/stats_service.py); as estatísticas leem O(dias) linhas em vez de
+    # agregar os agendamentos. O faturamento não é guardado: é a contagem vezes o preço do serviço.
+    # Agendamentos arquivados continuam contados aqui.
+    __tablename__ = "appointment_daily_stats"
+    __table_args__ = (
+        # Chave do upsert; também atende as leituras do estabelecimento por período
+        UniqueConstraint(
+            "establishment_id", "day", "professional_id", "service_id", "status",
+            name="uq_appointment_daily_stats_key"
+        ),
+        Index("ix_appointment_daily_stats_professional_id_day", "professional_id", "day"), # Estatísticas do profissional
+    )
+
+    id = Column(Integer, primary_key=True)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+    # 0 = sem profissional (NULL não entra na chave única). Sem FK: o histórico fica se o profissional sair
+    professional_id = Column(Integer, nullable=False, server_default="0")
+    service_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False) # Data local do início do agendamento
+    status = Column(SAEnum(AppointmentStatus), nullable=False)
+    count = Column(Integer, nullable=False, server_default="0")
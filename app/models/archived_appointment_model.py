@@ -0,0 +1,14 @@
+# app/models/archived_appointment_model.py
+from sqlalchemy import Column, Integer, Date, ForeignKey
+
+from app.db.base_class import Base
+
+class ArchivedAppointment(Base):
+    # Índice do arquivo frio: em que arquivo (estabelecimento e mês) está cada agendamento que saiu
+    # da tabela. Gravado na mesma transação que apaga o agendamento (appointment_archive_service);
+    # a busca por id lê um só arquivo, sem percorrer o arquivo frio.
+    __tablename__ = "archived_appointments"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) # Id do agendamento
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False) # Primeiro dia do mês (UTC) do início do agendamento
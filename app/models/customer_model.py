@@ -0,0 +1,31 @@
+# app/models/customer_model.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class Customer(Base):
+    # __tablename__ será 'customers'
+    # Um cliente é identificado por estabelecimento pelo telefone normalizado (só dígitos, sem DDI 55):
+    # o mesmo telefone em dois estabelecimentos são dois clientes diferentes.
+    __table_args__ = (
+        UniqueConstraint("establishment_id", "phone_normalized", name="uq_customers_establishment_phone"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False, index=True)
+    phone_normalized = Column(String(20), nullable=False)
+
+    # Dados mais recentes informados pelo cliente ao agendar
+    name = Column(String, nullable=False)
+    phone = Column(String, nullable=False)
+    email = Column(String, nullable=True)
+
+    # Contadores mantidos incrementalmente (no agendamento e na conclusão), sem varrer appointments
+    appointment_count = Column(Integer, nullable=False, default=0, server_default="0") # Agendamentos feitos
+    visit_count = Column(Integer, nullable=False, default=0, server_default="0") # Agendamentos concluídos (COMPLETED)
+    last_booking_at = Column(DateTime(timezone=True), nullable=True) # Início do agendamento mais recente
+    last_visit_at = Column(DateTime(timezone=True), nullable=True) # Início da visita concluída mais recente
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
@@ -2,10 +2,19 @@
 from sqlalchemy import Column, Integer, String, DateTime, JSON, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import enum
 
 from app.db.base_class import Base
 from app.models.user_establishment_link import user_establishment_link
 
+# O que fazer com agendamentos que passaram do horário sem ninguém atualizar o status
+# (aplicado periodicamente pelo scheduler; ver app/services/past_appointment_service.py)
+class PastAppointmentPolicy(str, enum.Enum):
+    MANUAL = "manual" # Nada automático: a equipe atualiza cada agendamento
+    COMPLETED = "completed" # Todos viram concluídos
+    NO_SHOW = "no_show" # Todos viram não-comparecimento
+    CONFIRMED_COMPLETED = "confirmed_completed" # Confirmados viram concluídos; pendentes, não-comparecimento
+
 class Establishment(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -18,6 +27,8 @@ class Establishment(Base):
     about_text = Column(Text, nullable=True)
     social_links = Column(JSON, nullable=True)
     working_hours_config = Column(JSON, nullable=True)
+    # Valor de PastAppointmentPolicy (string, para o sync_schema conseguir adicionar a coluna)
+    past_appointment_policy = Column(String(30), nullable=False, default=PastAppointmentPolicy.MANUAL.value, server_default=PastAppointmentPolicy.MANUAL.value)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
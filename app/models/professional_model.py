@@ -1,11 +1,32 @@
 # app/models/professional_model.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Text, JSON
+from sqlalchemy.sql import func, true
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
+from app.models.professional_service_link import professional_service_link
 
 class Professional(Base):
+    __table_args__ = (
+        # E-mail único por estabelecimento (NULL não conflita: profissionais antigos não têm e-mail)
+        Index("ix_professionals_establishment_email", "establishment_id", "email", unique=True),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    establishment_id = Column(Integer, ForeignKey("establishments.id"), nullable=False)
+    establishment_id = Column(Integer, ForeignKey("establishments.id"), nullable=False, index=True)
+
+    email = Column(String, nullable=True)
+    phone = Column(String, nullable=True)
+    specialty = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true()) # Inativo não recebe agendamentos
+
+    # Mesmo formato de Establishment.working_hours_config (WorkingHoursConfig).
+    # NULL = segue o horário do estabelecimento.
+    working_hours_config = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
-    establishment = relationship("Establishment")
\ No newline at end of file
+    establishment = relationship("Establishment")
+    services = relationship("Service", secondary=professional_service_link, order_by="Service.id")
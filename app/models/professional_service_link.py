@@ -0,0 +1,11 @@
+# app/models/professional_service_link.py
+from sqlalchemy import Column, ForeignKey, Table
+from app.db.base_class import Base
+
+# Serviços que cada profissional realiza (muitos-para-muitos)
+professional_service_link = Table(
+    'professional_service_link',
+    Base.metadata,
+    Column('professional_id', ForeignKey('professionals.id', ondelete="CASCADE"), primary_key=True),
+    Column('service_id', ForeignKey('services.id', ondelete="CASCADE"), primary_key=True, index=True)
+)
@@ -0,0 +1,33 @@
+# app/models/schedule_exception_model.py
+from sqlalchemy import Column, Integer, String, Boolean, Date, Time, DateTime, ForeignKey, Index, Enum as SAEnum
+from sqlalchemy.sql import func, false
+import enum
+
+from app.db.base_class import Base
+
+class ScheduleExceptionKind(str, enum.Enum):
+    CLOSED = "closed"                 # Dia inteiro fechado (feriado, folga)
+    BLOCKED = "blocked"               # Faixa bloqueada dentro do expediente
+    SPECIAL_HOURS = "special_hours"   # Expediente diferente do semanal nesse dia
+
+class ScheduleException(Base):
+    # __tablename__ será 'schedule_exceptions'
+    # Exceções ao horário semanal numa data específica, do estabelecimento inteiro
+    # (professional_id NULL) ou de um profissional.
+    __table_args__ = (
+        Index("ix_schedule_exceptions_establishment_id_date", "establishment_id", "date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+    professional_id = Column(Integer, ForeignKey("professionals.id", ondelete="CASCADE"), nullable=True)
+
+    date = Column(Date, nullable=False)
+    kind = Column(SAEnum(ScheduleExceptionKind), nullable=False)
+    start_time = Column(Time, nullable=True) # Horário local; obrigatório em BLOCKED e SPECIAL_HOURS
+    end_time = Column(Time, nullable=True)
+    # Repete todo ano no mesmo dia e mês (ex: Natal); o ano de `date` é ignorado
+    recurring_yearly = Column(Boolean, nullable=False, default=False, server_default=false())
+    description = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
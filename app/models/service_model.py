@@ -13,6 +13,7 @@ class Service(Base):
     price = Column(Float, nullable=False) # Preço do serviço. Decidimos que seria informativo, mas precisa ser guardado.
     duration_minutes = Column(Integer, nullable=False) # Duração do serviço em minutos
     is_active = Column(Boolean(), default=True) # Para o profissional poder ativar/desativar um serviço
+    capacity = Column(Integer, nullable=True) # Atendimentos simultâneos deste serviço; NULL = capacidade do horário
 
     establishment_id = Column(Integer, ForeignKey("establishments.id"), nullable=False)
 
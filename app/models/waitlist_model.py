@@ -0,0 +1,94 @@
+# app/models/waitlist_model.py
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, ForeignKey, Index, Text, UniqueConstraint, Enum as SAEnum
+from sqlalchemy.sql import func
+import enum
+
+from app.db.base_class import Base
+
+class WaitlistStatus(str, enum.Enum):
+    WAITING = "waiting"     # Aguardando um horário liberado
+    OFFERED = "offered"     # Recebeu um horário reservado (agendamento PENDING em appointment_id)
+    BOOKED = "booked"       # Reserva confirmada pelo estabelecimento
+    DECLINED = "declined"   # Reserva cancelada antes de ser confirmada
+    EXPIRED = "expired"     # Reserva não confirmada a tempo, ou período da espera já passou
+    CANCELLED = "cancelled" # Retirado da lista pelo estabelecimento
+
+class WaitlistEntry(Base):
+    # Cliente aguardando um horário de um serviço entre start_date e end_date (datas locais do
+    # estabelecimento), opcionalmente só numa faixa do dia e com um profissional específico.
+    # Ao ser atendido, recebe uma reserva: um agendamento PENDING comum (appointment_id, sem FK:
+    # a tabela de agendamentos pode estar particionada) que vale até offer_expires_at.
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        Index("ix_waitlist_entries_establishment_id_status", "establishment_id", "status"),
+        # Fechamento das reservas e expiração das esperas pelo scheduler
+        Index("ix_waitlist_entries_status_end_date", "status", "end_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    establishment_id = Column(Integer, ForeignKey("establishments.id", ondelete="CASCADE"), nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    professional_id = Column(Integer, ForeignKey("professionals.id", ondelete="CASCADE"), nullable=True) # NULL = qualquer um
+
+    customer_name = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False)
+    customer_email = Column(String, nullable=True)
+    notes_by_customer = Column(Text, nullable=True)
+
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    earliest_time = Column(Time, nullable=True) # Horário local; NULL = desde o início do dia
+    latest_time = Column(Time, nullable=True) # Fim do atendimento até este horário; NULL = até o fim do dia
+
+    status = Column(SAEnum(WaitlistStatus), nullable=False, default=WaitlistStatus.WAITING, server_default=WaitlistStatus.WAITING.name)
+    appointment_id = Column(Integer, nullable=True)
+    offer_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+class WaitlistWindow(Base):
+    # Janela de espera de uma entrada em um dia local: [window_start, window_end] em UTC. Só
+    # existem enquanto a entrada está WAITING. As janelas de mesmo início e fim no mesmo dia
+    # (mesma "forma", ver WaitlistShape) formam uma fila ordenada por entry_id neste índice: o
+    # primeiro da fila de uma forma é uma leitura do índice, custo logarítmico no tamanho da lista.
+    __tablename__ = "waitlist_windows"
+    __table_args__ = (
+        Index(
+            "ix_waitlist_windows_shape",
+            "establishment_id", "service_id", "day", "professional_id", "window_start", "window_end", "entry_id",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    entry_id = Column(Integer, ForeignKey("waitlist_entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    establishment_id = Column(Integer, nullable=False)
+    service_id = Column(Integer, nullable=False)
+    professional_id = Column(Integer, nullable=False, server_default="0") # Da entrada; 0 = qualquer um
+    day = Column(Date, nullable=False)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+
+class WaitlistShape(Base):
+    # Formas de janela (início, fim) com alguém na fila em cada dia, por estabelecimento, serviço
+    # e profissional. Uma vaga liberada lê só as formas do dia que a contêm e, para cada uma, o
+    # primeiro da fila no índice de waitlist_windows; vence o menor entry_id. Os horários da
+    # espera ficam na grade de WAITLIST_TIME_STEP_MINUTES, então um dia tem um número limitado
+    # de formas, que não cresce com o número de clientes: a busca é O(formas do dia x log n).
+    # Inseridas junto com as janelas (sem duplicar) e apagadas com a última janela da forma ou
+    # quando o dia passa.
+    __tablename__ = "waitlist_shapes"
+    __table_args__ = (
+        UniqueConstraint(
+            "establishment_id", "service_id", "day", "professional_id", "window_start", "window_end",
+            name="uq_waitlist_shapes_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    establishment_id = Column(Integer, nullable=False)
+    service_id = Column(Integer, nullable=False)
+    professional_id = Column(Integer, nullable=False, server_default="0")
+    day = Column(Date, nullable=False, index=True)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
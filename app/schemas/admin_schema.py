@@ -0,0 +1,37 @@
+# app/schemas/admin_schema.py
+from pydantic import BaseModel
+from typing import Any, List, Optional
+from datetime import datetime
+
+# Um registro do log de queries lentas (ver app/core/slow_query_log.py)
+class SlowQueryEntry(BaseModel):
+    captured_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any = None # Já com dados pessoais mascarados
+    method: Optional[str] = None
+    route: Optional[str] = None # Template da rota; None para queries fora de requisições (scheduler, CLI)
+    plan: Any = None # Saída do EXPLAIN (FORMAT JSON), ou {"error": ...}
+
+# Resumo de um perfil capturado com o header X-Profile (ver app/core/profiling.py)
+class ProfileSummary(BaseModel):
+    id: str
+    captured_at: datetime
+    method: str
+    path: str
+    route: Optional[str] = None
+    status_code: Optional[int] = None
+    duration_ms: float
+    threads: int # Threads que participaram da requisição (event loop + threadpool)
+
+class ProfileFunctionStats(BaseModel):
+    function: str
+    file: str
+    line: int
+    calls: int
+    primitive_calls: int
+    total_time_ms: float
+    cumulative_time_ms: float
+
+class ProfileDetail(ProfileSummary):
+    functions: List[ProfileFunctionStats] = []
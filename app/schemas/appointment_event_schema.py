@@ -0,0 +1,22 @@
+# app/schemas/appointment_event_schema.py
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+
+from app.models.appointment_model import AppointmentStatus
+from .base_schema import BaseSchema
+
+# Entrada do log de auditoria (somente leitura)
+class AppointmentEvent(BaseSchema):
+    id: int
+    appointment_id: int
+    establishment_id: int
+    event_type: str = Field(..., examples=["created", "status_changed"])
+    from_status: Optional[AppointmentStatus] = None
+    to_status: AppointmentStatus
+    actor_user_id: Optional[int] = None
+    source: str = Field(..., examples=["api", "bulk", "series", "scheduler"])
+    service_id: Optional[int] = None
+    professional_id: Optional[int] = None
+    appointment_start_time: datetime
+    occurred_at: datetime
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 from app.models.appointment_model import AppointmentStatus # Importa o Enum do status
 from .base_schema import BaseSchema # Nossa BaseSchema com from_attributes = True
@@ -20,7 +20,8 @@ class AppointmentBase(BaseModel):
 # end_time será calculado no backend com base no start_time e na duração do serviço
 # status terá um default no backend (ex: PENDING)
 class AppointmentCreate(AppointmentBase):
-    pass # Herda tudo de AppointmentBase, o que é suficiente para a criação pelo cliente
+    # Profissional escolhido pelo cliente; sem ele, o sistema atribui um profissional livre
+    professional_id: Optional[int] = None
 
 # Schema para atualizar um agendamento (o que o profissional pode mudar)
 class AppointmentUpdate(BaseModel): # Não herda de BaseSchema se for só para entrada
@@ -32,7 +33,7 @@ class AppointmentUpdate(BaseModel): # Não herda de BaseSchema se for só para e
 
 # Schema para retornar um agendamento pela API (o que a API envia de volta)
 class Appointment(BaseSchema): # Herda de BaseSchema para ter from_attributes = True
-    id: int
+    id: Optional[int] = None # None em ocorrências de agendamento recorrente ainda não materializadas
     start_time: datetime
     end_time: datetime # Importante ter no retorno
     customer_name: str
@@ -44,10 +45,16 @@ class Appointment(BaseSchema): # Herda de BaseSchema para ter from_attributes =
 
     establishment_id: int
     service_id: int
+    customer_id: Optional[int] = None
+    professional_id: Optional[int] = None
 
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+    # Ocorrência de agendamento recorrente (identificada pela série e pela data local original)
+    series_id: Optional[int] = None
+    occurrence_date: Optional[date] = None
+
     # Opcional: Incluir detalhes do serviço ou estabelecimento se necessário no retorno
     # service: Optional[ServiceSchema] # Se tivermos um ServiceSchema definido
     # establishment: Optional[EstablishmentSchema] # Se tivermos um EstablishmentSchema
@@ -56,6 +63,44 @@ class Appointment(BaseSchema): # Herda de BaseSchema para ter from_attributes =
 class AppointmentStatusUpdate(BaseModel):
     status: AppointmentStatus
 
+# --- Operações em lote (importação de agendamentos, fechamento do dia) ---
+MAX_BULK_ITEMS = 500
+
+class AppointmentBulkCreate(BaseModel):
+    items: List[AppointmentCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+class AppointmentStatusBulkItem(BaseModel):
+    appointment_id: int
+    status: AppointmentStatus
+
+class AppointmentStatusBulkUpdate(BaseModel):
+    items: List[AppointmentStatusBulkItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+# Resultado de cada item, na ordem do pedido; os que falham não impedem os demais
+class BulkItemResult(BaseModel):
+    index: int
+    success: bool
+    appointment_id: Optional[int] = None
+    status: Optional[AppointmentStatus] = None
+    error: Optional[str] = None
+
+class BulkOperationResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+# Próximos status permitidos de um agendamento (máquina de estados do status_validation_service)
+class AllowedStatuses(BaseModel):
+    appointment_id: int
+    status: AppointmentStatus
+    allowed_statuses: List[AppointmentStatus]
+
+# Horário livre encontrado pela busca do próximo horário disponível
+class NextAvailableSlot(BaseModel):
+    start_time: datetime # Com o fuso do estabelecimento
+    service_id: int
+    professional_id: Optional[int] = None # Profissional que seria atribuído
+
 """
 Explicação dos Schemas:
 
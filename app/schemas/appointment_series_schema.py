@@ -0,0 +1,54 @@
+# app/schemas/appointment_series_schema.py
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Optional
+from datetime import date, datetime, time
+
+from app.models.appointment_model import AppointmentStatus
+from .base_schema import BaseSchema
+
+class AppointmentSeriesCreate(BaseModel):
+    service_id: int
+    professional_id: Optional[int] = None # Sem profissional: atribuído na criação e mantido na série
+    customer_name: str = Field(..., min_length=1, max_length=100)
+    customer_phone: str = Field(..., min_length=10, max_length=20)
+    customer_email: Optional[EmailStr] = None
+    notes_by_customer: Optional[str] = None
+    start_time: datetime # Primeira ocorrência; as demais repetem o mesmo horário local
+    rrule: str = Field(..., max_length=255, examples=["FREQ=WEEKLY;BYDAY=TU", "FREQ=MONTHLY;COUNT=6"])
+    status: AppointmentStatus = AppointmentStatus.CONFIRMED # Status das ocorrências
+
+    @field_validator('status')
+    @classmethod
+    def check_status(cls, value: AppointmentStatus) -> AppointmentStatus:
+        if value not in (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED):
+            raise ValueError('Uma série começa como pendente ou confirmada.')
+        return value
+
+class AppointmentSeries(BaseSchema):
+    id: int
+    establishment_id: int
+    service_id: int
+    professional_id: Optional[int] = None
+    customer_id: Optional[int] = None
+    customer_name: str
+    customer_phone: str
+    customer_email: Optional[EmailStr] = None
+    notes_by_customer: Optional[str] = None
+    rrule: str
+    start_date: date
+    start_time: time # Horário local do estabelecimento
+    duration_minutes: int
+    until_date: Optional[date] = None
+    status: AppointmentStatus
+    created_at: Optional[datetime] = None
+
+# Alteração de uma ocorrência: vira um agendamento comum (remarcado e/ou com status próprio)
+class OccurrenceUpdate(BaseModel):
+    start_time: Optional[datetime] = None
+    status: Optional[AppointmentStatus] = None
+
+    @model_validator(mode='after')
+    def check_changes(self) -> 'OccurrenceUpdate':
+        if self.start_time is None and self.status is None:
+            raise ValueError('Informe o novo horário e/ou o novo status da ocorrência.')
+        return self
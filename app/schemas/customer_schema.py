@@ -0,0 +1,18 @@
+# app/schemas/customer_schema.py
+from typing import Optional
+from datetime import datetime
+
+from .base_schema import BaseSchema
+
+# Schema de resposta do diretório de clientes
+class Customer(BaseSchema):
+    id: int
+    establishment_id: int
+    name: str
+    phone: str
+    email: Optional[str] = None
+    appointment_count: int
+    visit_count: int
+    last_booking_at: Optional[datetime] = None
+    last_visit_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
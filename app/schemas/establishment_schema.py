@@ -4,6 +4,7 @@ from typing import Optional, List
 
 from .base_schema import BaseSchema
 from app.models.role_enum import Role
+from app.models.establishment_model import PastAppointmentPolicy
 
 # --- Schema para representar um membro na resposta da API ---
 class MemberSchema(BaseSchema):
@@ -33,6 +34,10 @@ class EstablishmentUpdate(EstablishmentBase):
     # name: Optional[str] = None
     # etc...
 
+class PastAppointmentPolicyUpdate(BaseModel):
+    """Corpo do PUT que define o que acontece com agendamentos que passaram do horário."""
+    policy: PastAppointmentPolicy
+
 class CollaboratorCreate(BaseModel):
     """Schema para o corpo da requisição ao adicionar um novo colaborador."""
     email: EmailStr
@@ -45,5 +50,6 @@ class Establishment(BaseSchema):
     timezone: str
     display_address: Optional[str] = None
     about_text: Optional[str] = None
+    past_appointment_policy: PastAppointmentPolicy = PastAppointmentPolicy.MANUAL
 
     users: List[MemberSchema] = [] # A lista de membros com seus papéis
\ No newline at end of file
@@ -1,19 +1,50 @@
 # app/schemas/professional_schema.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
+from datetime import datetime
 
 from .base_schema import BaseSchema
+from .working_hours_schema import WorkingHoursConfig
 
 class ProfessionalBase(BaseModel):
     name: str
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    specialty: Optional[str] = None
+    description: Optional[str] = None
+    is_active: bool = True
 
 class ProfessionalCreate(ProfessionalBase):
-    pass
+    service_ids: List[int] = [] # Serviços que o profissional realiza
+    working_hours: Optional[WorkingHoursConfig] = None # Sem horário próprio, segue o do estabelecimento
 
 class ProfessionalUpdate(ProfessionalBase):
     name: Optional[str] = None
+    is_active: Optional[bool] = None
+    service_ids: Optional[List[int]] = None
+    working_hours: Optional[WorkingHoursConfig] = None
+
+class ProfessionalServicesUpdate(BaseModel):
+    service_ids: List[int]
+
+class ProfessionalService(BaseSchema):
+    # Resumo do serviço na resposta do profissional
+    id: int
+    name: str
+    price: float
+    duration_minutes: int
 
 class Professional(BaseSchema):
     id: int
     name: str
-    establishment_id: int
\ No newline at end of file
+    establishment_id: int
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    specialty: Optional[str] = None
+    description: Optional[str] = None
+    is_active: bool = True
+    services: List[ProfessionalService] = []
+    # Lido de working_hours_config; None = segue o horário do estabelecimento
+    working_hours: Optional[WorkingHoursConfig] = Field(default=None, validation_alias="working_hours_config")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,40 @@
+# app/schemas/schedule_exception_schema.py
+from pydantic import BaseModel, model_validator
+from typing import Optional
+from datetime import date, time, datetime
+
+from app.models.schedule_exception_model import ScheduleExceptionKind
+from .base_schema import BaseSchema
+
+class ScheduleExceptionCreate(BaseModel):
+    date: date
+    kind: ScheduleExceptionKind
+    start_time: Optional[time] = None # HH:MM, horário local do estabelecimento
+    end_time: Optional[time] = None
+    professional_id: Optional[int] = None # Sem profissional: vale para o estabelecimento inteiro
+    recurring_yearly: bool = False
+    description: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_times(self) -> 'ScheduleExceptionCreate':
+        if self.kind == ScheduleExceptionKind.CLOSED:
+            if self.start_time or self.end_time:
+                raise ValueError('Fechamento do dia inteiro não tem horário de início e fim.')
+        else:
+            if not self.start_time or not self.end_time:
+                raise ValueError('Informe o horário de início e de fim.')
+            if self.end_time <= self.start_time:
+                raise ValueError('O horário de fim deve ser após o de início.')
+        return self
+
+class ScheduleException(BaseSchema):
+    id: int
+    establishment_id: int
+    professional_id: Optional[int] = None
+    date: date
+    kind: ScheduleExceptionKind
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    recurring_yearly: bool
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,13 @@
+# app/schemas/search_schema.py
+from pydantic import BaseModel
+from typing import List
+
+from .customer_schema import Customer
+from .professional_schema import Professional
+from .service_schema import Service
+
+class SearchResults(BaseModel):
+    # Cada lista vem ordenada pela relevância (melhor resultado primeiro)
+    customers: List[Customer] = []
+    services: List[Service] = []
+    professionals: List[Professional] = []
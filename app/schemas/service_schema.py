@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -11,6 +11,7 @@ class ServiceBase(BaseModel): # Não precisa herdar de BaseSchema se for só par
     price: float
     duration_minutes: int
     is_active: Optional[bool] = True # Default True na criação se não fornecido
+    capacity: Optional[int] = Field(default=None, ge=1) # Atendimentos simultâneos; None = capacidade do horário
 
 # Schema para criar um novo serviço (o que o frontend envia)
 # establishment_id será fornecido no path do endpoint ou pego do usuário logado,
@@ -25,6 +26,7 @@ class ServiceUpdate(BaseModel): # Não precisa herdar de BaseSchema, pois é par
     price: Optional[float] = None
     duration_minutes: Optional[int] = None
     is_active: Optional[bool] = None
+    capacity: Optional[int] = Field(default=None, ge=1)
 
 # Schema para retornar um serviço pela API (o que a API envia de volta)
 class Service(BaseSchema): # Herda de BaseSchema para ter from_attributes = True
@@ -34,6 +36,7 @@ class Service(BaseSchema): # Herda de BaseSchema para ter from_attributes = True
     price: float
     duration_minutes: int
     is_active: bool
+    capacity: Optional[int] = None
     establishment_id: int # Para sabermos a qual estabelecimento ele pertence
     created_at: datetime
     updated_at: Optional[datetime] = None # Consistente com nossos modelos
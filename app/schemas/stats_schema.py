@@ -0,0 +1,65 @@
+# app/schemas/stats_schema.py
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date, datetime
+
+from app.models.appointment_model import AppointmentStatus
+
+class StatsSummary(BaseModel):
+    appointments: int # Sem os cancelados
+    revenue: float # Soma dos preços dos serviços concluídos
+    by_status: Dict[AppointmentStatus, int] = {}
+
+class DailyStats(StatsSummary):
+    date: date
+
+class EstablishmentStats(BaseModel):
+    establishment_id: int
+    professional_id: Optional[int] = None
+    start_date: date
+    end_date: date
+    total: StatsSummary
+    days: List[DailyStats]
+
+class RecentAppointment(BaseModel):
+    id: int
+    client_name: str
+    service_name: str
+    date: datetime
+    status: AppointmentStatus
+
+# Formato do docs/PROFESSIONALS_BACKEND_SPEC.md (GET .../professionals/{id}/stats)
+class ProfessionalStats(BaseModel):
+    total_appointments: int
+    monthly_appointments: int
+    total_revenue: float
+    monthly_revenue: float
+    rating: Optional[float] = None
+    recent_appointments: List[RecentAppointment] = []
+
+# --- Painel do dono (GET /users/me/dashboard) ---
+class PeriodStats(StatsSummary):
+    start_date: date
+    end_date: date
+
+class NextAppointment(BaseModel):
+    id: int
+    start_time: datetime
+    customer_name: str
+    status: AppointmentStatus
+    service_id: int
+    service_name: str
+    professional_id: Optional[int] = None
+
+class EstablishmentDashboard(BaseModel):
+    establishment_id: int
+    name: str
+    timezone: Optional[str] = None
+    today: PeriodStats # "Hoje" e "esta semana" no fuso de cada unidade
+    week: PeriodStats
+    next_appointments: List[NextAppointment] = []
+
+class OwnerDashboard(BaseModel):
+    establishments: List[EstablishmentDashboard] = []
+    today: StatsSummary # Soma de todas as unidades
+    week: StatsSummary
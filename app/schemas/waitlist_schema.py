@@ -0,0 +1,52 @@
+# app/schemas/waitlist_schema.py
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Optional
+from datetime import date, time, datetime
+
+from app.models.waitlist_model import WaitlistStatus
+from .base_schema import BaseSchema
+
+# Grade dos horários da faixa do dia: limita as formas de janela distintas por dia (ver waitlist_service)
+WAITLIST_TIME_STEP_MINUTES = 15
+
+class WaitlistEntryCreate(BaseModel):
+    customer_name: str = Field(..., min_length=1, max_length=100)
+    customer_phone: str = Field(..., min_length=10, max_length=20)
+    customer_email: Optional[EmailStr] = None
+    notes_by_customer: Optional[str] = None
+    service_id: int
+    professional_id: Optional[int] = None # Sem profissional: qualquer um que atenda o serviço
+    start_date: date # Período aceito (datas locais do estabelecimento)
+    end_date: date
+    earliest_time: Optional[time] = None # Faixa do dia aceita (horário local), ex: só à tarde
+    latest_time: Optional[time] = None
+
+    @model_validator(mode='after')
+    def check_range(self) -> 'WaitlistEntryCreate':
+        if self.end_date < self.start_date:
+            raise ValueError('end_date precisa ser igual ou posterior a start_date.')
+        if self.earliest_time and self.latest_time and self.latest_time <= self.earliest_time:
+            raise ValueError('O horário final deve ser após o inicial.')
+        for value in (self.earliest_time, self.latest_time):
+            if value and (value.minute % WAITLIST_TIME_STEP_MINUTES or value.second or value.microsecond):
+                raise ValueError(f'Use horários em múltiplos de {WAITLIST_TIME_STEP_MINUTES} minutos (ex: 09:00, 14:30).')
+        return self
+
+class WaitlistEntry(BaseSchema):
+    id: int
+    establishment_id: int
+    service_id: int
+    professional_id: Optional[int] = None
+    customer_name: str
+    customer_phone: str
+    customer_email: Optional[EmailStr] = None
+    notes_by_customer: Optional[str] = None
+    start_date: date
+    end_date: date
+    earliest_time: Optional[time] = None
+    latest_time: Optional[time] = None
+    status: WaitlistStatus
+    appointment_id: Optional[int] = None # Reserva oferecida (agendamento PENDING)
+    offer_expires_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
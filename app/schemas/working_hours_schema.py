@@ -63,6 +63,7 @@ class WorkingHoursConfig(BaseModel):
     saturday: DayWorkingHours = Field(default_factory=DayWorkingHours)
     sunday: DayWorkingHours = Field(default_factory=DayWorkingHours)
     appointment_interval_minutes: Optional[int] = Field(default=30, gt=0) # Default 30 min, e deve ser > 0
+    capacity: int = Field(default=1, ge=1) # Atendimentos simultâneos no mesmo horário (ex: mesas de banho)
 
     class Config:
         validate_assignment = True # Garante que validações rodem ao reatribuir valores aos campos
@@ -0,0 +1,260 @@
+# app/services/appointment_archive_service.py
+# Arquivo frio (cold storage) de agendamentos históricos.
+#
+# Agendamentos em status final (concluído, cancelado, não compareceu) mais antigos que
+# COLD_STORAGE_AFTER_DAYS saem da tabela e vão para arquivos JSON-lines comprimidos, um por
+# estabelecimento e mês:
+#     {COLD_STORAGE_DIR}/establishment_{id}/{AAAA-MM}.jsonl.gz
+#
+# A leitura é transparente: a listagem de agendamentos e a exportação consultam os arquivos
+# quando o período pedido alcança meses arquivados. Cada execução do job anexa um novo membro
+# gzip ao arquivo do mês (gzip.open lê membros concatenados), e a leitura descarta ids
+# repetidos; assim uma execução interrompida e repetida não duplica resultados. A tabela
+# archived_appointments diz em que arquivo está cada id (busca de um agendamento arquivado).
+import gzip
+import heapq
+import json
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import partitioning
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.archived_appointment_model import ArchivedAppointment
+
+ARCHIVABLE_STATUSES = (
+    AppointmentStatus.COMPLETED,
+    AppointmentStatus.CANCELLED_BY_CLIENT,
+    AppointmentStatus.CANCELLED_BY_ESTABLISHMENT,
+    AppointmentStatus.NO_SHOW,
+)
+DATETIME_COLUMNS = {"start_time", "end_time", "reminder_sent_at", "created_at", "updated_at"}
+COLUMNS = [column.name for column in Appointment.__table__.columns]
+
+
+def _as_aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _month_of(value: datetime) -> date:
+    value = value.astimezone(timezone.utc) if value.tzinfo else value
+    return date(value.year, value.month, 1)
+
+
+def _month_path(establishment_id: int, month: date) -> str:
+    return os.path.join(settings.COLD_STORAGE_DIR, f"establishment_{establishment_id}", f"{month:%Y-%m}.jsonl.gz")
+
+
+def _to_record(appointment: Appointment) -> dict:
+    record = {}
+    for column in COLUMNS:
+        value = getattr(appointment, column)
+        if column in DATETIME_COLUMNS and value is not None:
+            value = _as_aware(value).isoformat()
+        elif column == "status":
+            value = value.value
+        record[column] = value
+    return record
+
+
+def _from_record(record: dict) -> Appointment:
+    """Recria um Appointment transiente (fora da sessão) a partir de uma linha do arquivo."""
+    values = {}
+    for column in COLUMNS:
+        value = record.get(column)
+        if column in DATETIME_COLUMNS and value is not None:
+            value = datetime.fromisoformat(value)
+        elif column == "status":
+            value = AppointmentStatus(value)
+        values[column] = value
+    return Appointment(**values)
+
+
+# --- Escrita (job de arquivamento) ---
+
+def archive_old_appointments(
+    db: Session,
+    *,
+    older_than_days: Optional[int] = None,
+    batch_size: int = 5000,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Move para o arquivo frio (settings.COLD_STORAGE_DIR, o mesmo diretório que a leitura usa) os
+    agendamentos em status final com início anterior ao corte.
+    Processa em lotes: cada lote é gravado nos arquivos e só então apagado da tabela, junto com o
+    registro de onde ficou cada id (um commit por lote).
+    Retorna a quantidade de agendamentos arquivados e de arquivos mensais tocados.
+    """
+    older_than_days = older_than_days if older_than_days is not None else settings.COLD_STORAGE_AFTER_DAYS
+    if older_than_days < 1:
+        raise ValueError("older_than_days precisa ser pelo menos 1.")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    query = db.query(Appointment).filter(
+        Appointment.status.in_(ARCHIVABLE_STATUSES),
+        Appointment.start_time < cutoff,
+    )
+    if dry_run:
+        return {"archived": query.count(), "files": 0}
+
+    archived = 0
+    files = set()
+    last_id = 0
+    while True:
+        # Paginação por id (keyset): lotes estáveis mesmo com as linhas sendo apagadas
+        batch = query.filter(Appointment.id > last_id).order_by(Appointment.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        groups: Dict[Tuple[int, date], List[dict]] = {}
+        for appointment in batch:
+            key = (appointment.establishment_id, _month_of(appointment.start_time))
+            groups.setdefault(key, []).append(_to_record(appointment))
+
+        for (establishment_id, month), records in groups.items():
+            path = _month_path(establishment_id, month)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as output:
+                for record in records:
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                os.fsync(output.fileno())
+            files.add(path)
+
+        db.execute(insert(ArchivedAppointment.__table__), [
+            {"id": appointment.id, "establishment_id": appointment.establishment_id, "month": _month_of(appointment.start_time)}
+            for appointment in batch
+        ])
+        db.query(Appointment).filter(
+            Appointment.id.in_([appointment.id for appointment in batch])
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.expunge_all()
+        archived += len(batch)
+
+    return {"archived": archived, "files": len(files)}
+
+
+# --- Leitura (read-through) ---
+
+def archived_months(establishment_id: int) -> List[date]:
+    """Meses arquivados do estabelecimento, em ordem crescente (lista o diretório; sem acesso ao banco)."""
+    directory = os.path.join(settings.COLD_STORAGE_DIR, f"establishment_{establishment_id}")
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    months = []
+    for name in names:
+        if name.endswith(".jsonl.gz"):
+            year, month = name[: -len(".jsonl.gz")].split("-")
+            months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def _months_in_range(establishment_id: int, start: Optional[datetime], end: Optional[datetime]) -> List[date]:
+    months = archived_months(establishment_id)
+    if start is not None:
+        months = [month for month in months if month >= _month_of(start)]
+    if end is not None:
+        months = [month for month in months if month <= _month_of(end)]
+    return months
+
+
+def iter_archived_appointments(
+    establishment_id: int,
+    *,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[AppointmentStatus] = None,
+    descending: bool = False,
+) -> Iterator[Appointment]:
+    """
+    Agendamentos arquivados com start <= start_time < end, ordenados por start_time.
+    Lê só os arquivos dos meses do intervalo, um mês por vez (quem consome pode parar cedo).
+    """
+    months = _months_in_range(establishment_id, start, end)
+    for month in reversed(months) if descending else months:
+        path = _month_path(establishment_id, month)
+        by_id: Dict[int, dict] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as source:
+            for line in source:
+                record = json.loads(line)
+                by_id[record["id"]] = record # Repetições (execução interrompida) ficam com a última cópia
+        appointments = [_from_record(record) for record in by_id.values()]
+        appointments.sort(key=lambda appointment: appointment.start_time, reverse=descending)
+        for appointment in appointments:
+            if start is not None and appointment.start_time < start:
+                continue
+            if end is not None and appointment.start_time >= end:
+                continue
+            if status is not None and appointment.status != status:
+                continue
+            yield appointment
+
+
+def find_archived_appointment(db: Session, *, appointment_id: int) -> Optional[Appointment]:
+    """
+    Agendamento que saiu da tabela: procura nas partições desanexadas (schema appointments_archive,
+    pela chave primária de cada uma) e, pelo índice archived_appointments, no único arquivo frio
+    que pode contê-lo. Um id inexistente não lê nenhum arquivo.
+    """
+    partitions = partitioning.detached_partitions(db.connection())
+    if partitions:
+        # Colunas de cada tabela desanexada: as adicionadas ao modelo depois do arquivamento não existem nela
+        existing: Dict[str, set] = {}
+        for table_name, column_name in db.execute(
+            text("SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = :schema"),
+            {"schema": partitioning.ARCHIVE_SCHEMA},
+        ):
+            existing.setdefault(table_name, set()).add(column_name)
+        table = Appointment.__table__
+        for partition in partitions:
+            columns = [column for column in table.c if column.name in existing.get(partition["name"], ())]
+            row = db.execute(
+                text(
+                    f"SELECT {', '.join(column.name for column in columns)} "
+                    f"FROM {partitioning.ARCHIVE_SCHEMA}.{partition['name']} WHERE id = :id"
+                ).columns(*columns),
+                {"id": appointment_id},
+            ).first()
+            if row is not None:
+                return Appointment(**row._mapping)
+    location = db.query(ArchivedAppointment).filter(ArchivedAppointment.id == appointment_id).first()
+    if location is None:
+        return None
+    month_start = datetime.combine(location.month, time.min, tzinfo=timezone.utc)
+    month_end = datetime.combine(partitioning.add_months(location.month, 1), time.min, tzinfo=timezone.utc)
+    for appointment in iter_archived_appointments(location.establishment_id, start=month_start, end=month_end):
+        if appointment.id == appointment_id:
+            return appointment
+    return None
+
+
+def has_archive_in_range(establishment_id: int, *, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    return bool(_months_in_range(establishment_id, start, end))
+
+
+def date_range_bounds(start_date: Optional[date], end_date: Optional[date]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Converte o filtro por datas (end_date inclusivo) em [início, fim) em UTC."""
+    start = datetime.combine(start_date, time.min, tzinfo=timezone.utc) if start_date else None
+    end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc) if end_date else None
+    return start, end
+
+
+def merge_by_start_time(hot: Iterable[Appointment], cold: Iterable[Appointment], *, descending: bool = False) -> Iterator[Appointment]:
+    """Intercala dois fluxos já ordenados por start_time, descartando ids repetidos (linha ainda quente e já arquivada)."""
+    seen = set()
+    key = lambda appointment: _as_aware(appointment.start_time)
+    for appointment in heapq.merge(hot, cold, key=key, reverse=descending):
+        if appointment.id in seen:
+            continue
+        seen.add(appointment.id)
+        yield appointment
+
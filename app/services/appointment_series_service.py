@@ -0,0 +1,232 @@
+# app/services/appointment_series_service.py
+# Agendamentos recorrentes: criação da série, encerramento e exceções por ocorrência.
+#
+# A série é uma linha só; as ocorrências são expandidas sob demanda (recurrence_service). Uma
+# ocorrência pode ser pulada (exceção sem agendamento) ou alterada: remarcada e/ou com status
+# próprio, ela é materializada como um agendamento comum e, daí em diante, segue o fluxo normal.
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+import pytz
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.appointment_series_model import AppointmentSeries, AppointmentSeriesException
+from app.models.establishment_model import Establishment
+from app.models.service_model import Service
+from app.schemas.appointment_series_schema import AppointmentSeriesCreate, OccurrenceUpdate
+from app.services import audit_service, availability_service, customer_service, event_service, recurrence_service, status_validation_service
+
+MAX_CONFLICTS_REPORTED = 5
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=pytz.utc) if value.tzinfo is None else value.astimezone(pytz.utc)
+
+
+def _locked_establishment(db: Session, establishment_id: int):
+    # Mesma trava do create_appointment: serializa as escritas na agenda do estabelecimento
+    establishment = db.query(Establishment).filter(Establishment.id == establishment_id).with_for_update().first()
+    tz = availability_service.establishment_timezone(establishment) if establishment else None
+    if tz is None:
+        raise ValueError("Fuso horário do estabelecimento inválido.")
+    return establishment, tz
+
+
+def create_series(db: Session, *, series_in: AppointmentSeriesCreate, establishment_id: int) -> AppointmentSeries:
+    """
+    Cria a série depois de verificar todas as ocorrências contra os agendamentos e as outras
+    séries (um carregamento da agenda do período). A série termina em até settings.SERIES_MAX_DAYS
+    dias: sem fim, ou com fim depois disso, until_date fica no limite. Sem profissional escolhido, o profissional livre na primeira ocorrência fica com a série toda.
+    """
+    service = db.query(Service).filter(Service.id == series_in.service_id).first()
+    if not service or service.establishment_id != establishment_id or not service.is_active:
+        raise ValueError("Serviço inválido ou não pertence a este estabelecimento.")
+    rule = recurrence_service.parse_rrule(series_in.rrule)
+
+    establishment, tz = _locked_establishment(db, establishment_id)
+    start_local = _as_utc(series_in.start_time).astimezone(tz)
+    start_date, local_time = start_local.date(), start_local.time().replace(tzinfo=None)
+    if recurrence_service.first_occurrence(rule, start_date) != start_date:
+        raise ValueError("O início da série precisa ser uma ocorrência da regra (confira BYDAY/BYMONTHDAY).")
+    # Ocorrências virtuais não passam pela verificação de novos agendamentos: a série só pode ir
+    # até onde as ocorrências são verificadas aqui
+    until_date = recurrence_service.last_occurrence(rule, start_date)
+    horizon = start_date + timedelta(days=settings.SERIES_MAX_DAYS - 1)
+    if until_date is None or until_date > horizon:
+        until_date = horizon
+    context = availability_service.load_context(
+        db, establishment=establishment, service=service,
+        start_date=start_date, end_date=until_date, professional_id=series_in.professional_id
+    )
+    resource = availability_service.pick_resource(context, start_local) if context else None
+    if resource is None:
+        raise ValueError("Horário indisponível para este serviço.")
+
+    conflicts = []
+    for day in recurrence_service.occurrences(rule, start_date, start_date + timedelta(days=1), until_date, until=until_date):
+        occurrence_local = tz.normalize(tz.localize(datetime.combine(day, local_time)))
+        if not any(free is resource for free in context.free_resources(occurrence_local)):
+            conflicts.append(day)
+    if conflicts:
+        dates = ", ".join(day.strftime("%d/%m/%Y") for day in conflicts[:MAX_CONFLICTS_REPORTED])
+        more = f" e mais {len(conflicts) - MAX_CONFLICTS_REPORTED}" if len(conflicts) > MAX_CONFLICTS_REPORTED else ""
+        raise ValueError(f"Horário indisponível nas datas: {dates}{more}.")
+
+    customer_id = customer_service.upsert_customer_for_booking(
+        db,
+        establishment_id=establishment_id,
+        name=series_in.customer_name,
+        phone=series_in.customer_phone,
+        email=series_in.customer_email,
+        start_time=start_local.astimezone(pytz.utc)
+    )
+    db_series = AppointmentSeries(
+        establishment_id=establishment_id,
+        service_id=service.id,
+        professional_id=resource.professional_id,
+        customer_id=customer_id,
+        customer_name=series_in.customer_name,
+        customer_phone=series_in.customer_phone,
+        customer_email=series_in.customer_email,
+        notes_by_customer=series_in.notes_by_customer,
+        rrule=series_in.rrule.strip(),
+        start_date=start_date,
+        start_time=local_time,
+        duration_minutes=service.duration_minutes,
+        until_date=until_date,
+        status=series_in.status,
+    )
+    db.add(db_series)
+    db.commit()
+    db.refresh(db_series)
+    event_service.availability_changed(establishment_id)
+    return db_series
+
+
+def get_series(db: Session, *, establishment_id: int, series_id: int) -> Optional[AppointmentSeries]:
+    return db.query(AppointmentSeries).filter(
+        AppointmentSeries.id == series_id, AppointmentSeries.establishment_id == establishment_id
+    ).first()
+
+
+def get_series_by_establishment(db: Session, *, establishment_id: int, skip: int = 0, limit: int = 100) -> List[AppointmentSeries]:
+    return db.query(AppointmentSeries).filter(
+        AppointmentSeries.establishment_id == establishment_id
+    ).order_by(desc(AppointmentSeries.id)).offset(skip).limit(limit).all()
+
+
+def end_series(db: Session, *, series_db_obj: AppointmentSeries, from_date: date) -> None:
+    """
+    Encerra a série a partir de `from_date` (inclusive): as ocorrências anteriores continuam no
+    histórico. Encerrada antes de começar, a série é apagada.
+    """
+    establishment_id = series_db_obj.establishment_id
+    if from_date <= series_db_obj.start_date:
+        db.delete(series_db_obj)
+    else:
+        last_day = from_date - timedelta(days=1)
+        series_db_obj.until_date = min(series_db_obj.until_date or last_day, last_day)
+        db.add(series_db_obj)
+    db.commit()
+    event_service.availability_changed(establishment_id)
+
+
+def _ensure_open_occurrence(db: Session, *, series: AppointmentSeries, occurrence_date: date) -> None:
+    if not recurrence_service.is_occurrence(series, occurrence_date):
+        raise ValueError("A série não tem ocorrência nesta data.")
+    already_changed = db.query(AppointmentSeriesException.id).filter(
+        AppointmentSeriesException.series_id == series.id,
+        AppointmentSeriesException.occurrence_date == occurrence_date,
+    ).first()
+    if already_changed:
+        raise ValueError("Esta ocorrência já foi pulada ou alterada; altere o agendamento correspondente.")
+
+
+def skip_occurrence(db: Session, *, series_db_obj: AppointmentSeries, occurrence_date: date) -> None:
+    """Pula uma ocorrência (ex: feriado, viagem do cliente); o horário fica livre."""
+    _ensure_open_occurrence(db, series=series_db_obj, occurrence_date=occurrence_date)
+    db.add(AppointmentSeriesException(series_id=series_db_obj.id, occurrence_date=occurrence_date))
+    db.commit()
+    event_service.availability_changed(series_db_obj.establishment_id, [occurrence_date])
+
+
+def update_occurrence(
+    db: Session, *, series_db_obj: AppointmentSeries, occurrence_date: date, occurrence_in: OccurrenceUpdate,
+    actor_user_id: Optional[int] = None
+) -> Appointment:
+    """
+    Remarca e/ou muda o status de uma ocorrência, materializando-a como agendamento comum.
+    A mudança de status segue as mesmas regras de validação dos agendamentos.
+    """
+    series = series_db_obj
+    _ensure_open_occurrence(db, series=series, occurrence_date=occurrence_date)
+    establishment, tz = _locked_establishment(db, series.establishment_id)
+    try:
+        # A exceção entra antes da verificação de disponibilidade: a ocorrência original deixa
+        # de ocupar a agenda e não conflita com o novo horário
+        exception = AppointmentSeriesException(series_id=series.id, occurrence_date=occurrence_date)
+        db.add(exception)
+        db.flush()
+
+        start_time, _ = recurrence_service.occurrence_bounds(series, tz, occurrence_date)
+        professional_id = series.professional_id
+        if occurrence_in.start_time is not None:
+            start_time = _as_utc(occurrence_in.start_time)
+            start_local = start_time.astimezone(tz)
+            service = db.query(Service).filter(Service.id == series.service_id).first()
+            context = availability_service.load_context(
+                db, establishment=establishment, service=service,
+                start_date=start_local.date(), end_date=start_local.date(), professional_id=series.professional_id
+            )
+            resource = availability_service.pick_resource(context, start_local) if context else None
+            if resource is None:
+                raise ValueError("Horário indisponível para este serviço.")
+            professional_id = resource.professional_id
+
+        appointment = Appointment(
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=series.duration_minutes),
+            customer_name=series.customer_name,
+            customer_phone=series.customer_phone,
+            customer_email=series.customer_email,
+            notes_by_customer=series.notes_by_customer,
+            status=series.status,
+            establishment_id=series.establishment_id,
+            service_id=series.service_id,
+            customer_id=series.customer_id,
+            professional_id=professional_id,
+        )
+        if occurrence_in.status is not None and occurrence_in.status != series.status:
+            status_validation_service.validate_status_transition(appointment=appointment, new_status=occurrence_in.status)
+            if occurrence_in.status == AppointmentStatus.COMPLETED and series.customer_id:
+                customer_service.register_completed_visit(db, customer_id=series.customer_id, visit_time=start_time)
+            appointment.status = occurrence_in.status
+        db.add(appointment)
+        db.flush()
+        exception.appointment_id = appointment.id
+        # No log, a ocorrência nasce com o status da série; a mudança pedida vem em seguida
+        events = [audit_service.appointment_event(
+            appointment, to_status=series.status, actor_user_id=actor_user_id, source=audit_service.SOURCE_SERIES
+        )]
+        if appointment.status != series.status:
+            events.append(audit_service.appointment_event(
+                appointment, from_status=series.status, to_status=appointment.status,
+                actor_user_id=actor_user_id, source=audit_service.SOURCE_SERIES,
+            ))
+        audit_service.record(db, events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(appointment)
+
+    dates = {occurrence_date, start_time.astimezone(tz).date()}
+    event_service.availability_changed(series.establishment_id, dates)
+    if appointment.status != series.status:
+        event_service.appointment_status_changed(
+            appointment, previous_status=series.status, timezone_name=establishment.timezone
+        )
+    return appointment
@@ -1,106 +1,84 @@
 # app/services/appointment_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
-from typing import List, Optional
+from sqlalchemy import and_, bindparam, desc, func, update
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import date, time, datetime, timedelta
+from itertools import islice
+import heapq
+import csv
+import io
 import pytz
 
 from app.models.appointment_model import Appointment, AppointmentStatus
 from app.models.establishment_model import Establishment
 from app.models.service_model import Service
-from app.schemas.appointment_schema import AppointmentCreate, AppointmentStatusUpdate
+from app.schemas.appointment_schema import AppointmentCreate, AppointmentStatusBulkItem, AppointmentStatusUpdate
 from app.schemas.working_hours_schema import WorkingHoursConfig, DayWorkingHours
+from app.services import appointment_archive_service, audit_service, availability_service, customer_service, event_service, recurrence_service, status_validation_service, waitlist_service
 
 # --- FUNÇÕES DE LÓGICA DE AGENDAMENTO ---
 
+def _as_utc(value: datetime) -> datetime:
+    """Garante um datetime aware. O PostgreSQL devolve aware; o SQLite (benchmarks) devolve naive, já em UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=pytz.utc)
+    return value
+
 def get_available_slots(
-    db: Session, *, establishment_id: int, service_id: int, appointment_date: date
+    db: Session, *, establishment_id: int, service_id: int, appointment_date: date, professional_id: Optional[int] = None
 ) -> List[time]:
     """
-    Calcula e retorna os horários de início disponíveis, considerando o fuso horário
-    específico do estabelecimento e convertendo tudo para UTC para comparações.
+    Calcula e retorna os horários de início disponíveis (horário local do estabelecimento).
+    Com profissionais cadastrados, um horário está disponível se algum profissional apto ao
+    serviço estiver livre nele (ou o profissional pedido, se `professional_id` for informado).
+    O cálculo fica em availability_service.
     """
-    # 1. Busca os dados essenciais
     establishment = db.query(Establishment).filter(Establishment.id == establishment_id).first()
     service = db.query(Service).filter(Service.id == service_id).first()
-    
-    if not establishment or not service or not establishment.working_hours_config:
+    if not establishment or not service:
         return []
 
-    # 2. Define o fuso horário do estabelecimento
-    try:
-        establishment_tz = pytz.timezone(establishment.timezone)
-    except pytz.UnknownTimeZoneError:
-        return [] # Retorna vazio se o timezone no banco for inválido
-
-    # 3. Parseia a configuração de horários e obtém a do dia correto
-    working_hours = WorkingHoursConfig.parse_obj(establishment.working_hours_config)
-    day_of_week_int = appointment_date.weekday()
-    days_map = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    day_config = getattr(working_hours, days_map[day_of_week_int])
-
-    if not day_config.is_active or not day_config.start_time or not day_config.end_time:
+    context = availability_service.load_context(
+        db, establishment=establishment, service=service,
+        start_date=appointment_date, end_date=appointment_date, professional_id=professional_id
+    )
+    if context is None:
         return []
+    return [slot.time() for slot in availability_service.available_starts(context, appointment_date)]
 
-    # 4. Converte os horários de funcionamento para datetimes AWARE no fuso do estabelecimento
-    day_start_naive = datetime.combine(appointment_date, datetime.strptime(day_config.start_time, "%H:%M").time())
-    day_end_naive = datetime.combine(appointment_date, datetime.strptime(day_config.end_time, "%H:%M").time())
-    
-    day_start_local = establishment_tz.localize(day_start_naive)
-    day_end_local = establishment_tz.localize(day_end_naive)
+def find_next_available_slots(
+    db: Session,
+    *,
+    establishment_id: int,
+    service_ids: List[int],
+    after: Optional[datetime] = None,
+    limit: int = 5,
+    horizon_days: int = availability_service.DEFAULT_SEARCH_HORIZON_DAYS,
+    professional_ids: Optional[List[int]] = None
+) -> List[dict]:
+    """
+    Primeiros horários livres a partir de `after` (padrão: agora) para um ou mais serviços,
+    opcionalmente restritos a alguns profissionais.
+    """
+    establishment = db.query(Establishment).filter(Establishment.id == establishment_id).first()
+    if not establishment:
+        raise ValueError("Estabelecimento não encontrado.")
+    services = db.query(Service).filter(
+        Service.id.in_(set(service_ids)), Service.establishment_id == establishment_id, Service.is_active.is_(True)
+    ).order_by(Service.id).all()
+    if len(services) != len(set(service_ids)):
+        raise ValueError("Serviço inválido ou não pertence a este estabelecimento.")
 
-    # 5. Gera todos os possíveis slots de início no horário local
-    interval = working_hours.appointment_interval_minutes
-    duration = service.duration_minutes
-    
-    possible_slots_local = []
-    current_slot_local = day_start_local
-    while (current_slot_local + timedelta(minutes=duration)) <= day_end_local:
-        possible_slots_local.append(current_slot_local)
-        current_slot_local += timedelta(minutes=interval)
-
-    # 6. Remove slots que caem na pausa para almoço (ainda em horário local)
-    available_slots_local = []
-    if day_config.lunch_break_start_time and day_config.lunch_break_end_time:
-        lunch_start_naive = datetime.combine(appointment_date, datetime.strptime(day_config.lunch_break_start_time, "%H:%M").time())
-        lunch_end_naive = datetime.combine(appointment_date, datetime.strptime(day_config.lunch_break_end_time, "%H:%M").time())
-        lunch_start_local = establishment_tz.localize(lunch_start_naive)
-        lunch_end_local = establishment_tz.localize(lunch_end_naive)
-        
-        for slot in possible_slots_local:
-            slot_end_time = slot + timedelta(minutes=duration)
-            if not (slot < lunch_end_local and slot_end_time > lunch_start_local):
-                available_slots_local.append(slot)
-    else:
-        available_slots_local = possible_slots_local
-
-    # 7. Busca agendamentos existentes (o banco armazena em UTC) para o dia inteiro (considerando UTC)
-    utc_tz = pytz.utc
-    day_start_utc = day_start_local.astimezone(utc_tz)
-    day_end_of_day_utc = (day_start_utc + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-
-    existing_appointments = db.query(Appointment).filter(
-        Appointment.establishment_id == establishment_id,
-        Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED]),
-        Appointment.start_time >= day_start_utc,
-        Appointment.start_time < day_end_of_day_utc
-    ).all()
-
-    # 8. Filtra os slots que conflitam com agendamentos existentes, COMPARANDO TUDO EM UTC
-    final_available_slots = []
-    for slot_local in available_slots_local:
-        slot_utc_start = slot_local.astimezone(utc_tz)
-        slot_utc_end = (slot_local + timedelta(minutes=duration)).astimezone(utc_tz)
-        
-        is_occupied = False
-        for existing_appt in existing_appointments:
-            if slot_utc_start < existing_appt.end_time and slot_utc_end > existing_appt.start_time:
-                is_occupied = True
-                break
-        if not is_occupied:
-            final_available_slots.append(slot_local.time())
-
-    return final_available_slots
+    now = datetime.now(pytz.utc)
+    after = max(_as_utc(after), now) if after else now # Nunca sugere horários no passado
+    slots = availability_service.find_next_available(
+        db, establishment=establishment, services=services, after=after,
+        limit=limit, horizon_days=horizon_days, professional_ids=professional_ids
+    )
+    return [
+        {"start_time": slot.start, "service_id": slot.service_id, "professional_id": slot.professional_id}
+        for slot in slots
+    ]
 
 # --- FUNÇÕES CRUD PARA AGENDAMENTOS ---
 
@@ -108,22 +86,45 @@ def create_appointment(
     db: Session, *, appointment_in: AppointmentCreate, establishment_id: int
 ) -> Appointment:
     """
-    Cria um novo agendamento após verificar a disponibilidade.
-    A verificação de disponibilidade agora está contida em get_available_slots.
-    Esta função deve ser chamada depois que o cliente seleciona um slot válido.
+    Cria um novo agendamento após verificar a disponibilidade do horário.
+    Sem profissional escolhido, atribui o profissional livre com menos agendamentos no dia.
     """
     service = db.query(Service).filter(Service.id == appointment_in.service_id).first()
     if not service or service.establishment_id != establishment_id or not service.is_active:
         raise ValueError("Serviço inválido ou não pertence a este estabelecimento.")
-    
+
+    # Bloqueia a linha do estabelecimento até o commit: dois agendamentos simultâneos no mesmo
+    # estabelecimento não conseguem escolher o mesmo horário/profissional (no-op no SQLite)
+    establishment = db.query(Establishment).filter(Establishment.id == establishment_id).with_for_update().first()
+
     # Recalcula o end_time para garantir consistência
-    end_time = appointment_in.start_time + timedelta(minutes=service.duration_minutes)
+    start_time = _as_utc(appointment_in.start_time)
+    end_time = start_time + timedelta(minutes=service.duration_minutes)
+
+    try:
+        start_local = start_time.astimezone(pytz.timezone(establishment.timezone))
+    except pytz.UnknownTimeZoneError:
+        raise ValueError("Fuso horário do estabelecimento inválido.")
+    context = availability_service.load_context(
+        db, establishment=establishment, service=service,
+        start_date=start_local.date(), end_date=start_local.date(), professional_id=appointment_in.professional_id
+    )
+    resource = availability_service.pick_resource(context, start_local) if context else None
+    if resource is None:
+        raise ValueError("Horário indisponível para este serviço.")
+
+    # Diretório de clientes: cria/atualiza o cliente na mesma transação do agendamento
+    customer_id = customer_service.upsert_customer_for_booking(
+        db,
+        establishment_id=establishment_id,
+        name=appointment_in.customer_name,
+        phone=appointment_in.customer_phone,
+        email=appointment_in.customer_email,
+        start_time=start_time
+    )
 
-    # Aqui, poderíamos re-validar a disponibilidade do slot exato como uma dupla checagem, mas
-    # vamos confiar que o frontend só está enviando slots que foram retornados por get_available_slots.
-    
     db_appointment = Appointment(
-        start_time=appointment_in.start_time,
+        start_time=start_time,
         end_time=end_time,
         customer_name=appointment_in.customer_name,
         customer_phone=appointment_in.customer_phone,
@@ -131,13 +132,127 @@ def create_appointment(
         notes_by_customer=appointment_in.notes_by_customer,
         status=AppointmentStatus.PENDING,
         establishment_id=establishment_id,
-        service_id=appointment_in.service_id
+        service_id=appointment_in.service_id,
+        customer_id=customer_id,
+        professional_id=resource.professional_id
     )
     db.add(db_appointment)
+    db.flush()
+    audit_service.record(db, [audit_service.appointment_event(db_appointment, to_status=db_appointment.status)])
     db.commit()
     db.refresh(db_appointment)
+    event_service.appointment_created(db_appointment, timezone_name=establishment.timezone)
     return db_appointment
 
+def _bulk_result(index: int, *, appointment: Optional[Appointment] = None, error: Optional[str] = None) -> dict:
+    if appointment is None:
+        return {"index": index, "success": False, "error": error}
+    return {"index": index, "success": True, "appointment_id": appointment.id, "status": appointment.status}
+
+def create_appointments_bulk(
+    db: Session, *, items: List[AppointmentCreate], establishment_id: int, actor_user_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Cria vários agendamentos (importação de outra ferramenta, encaixes do dia) em uma transação.
+
+    Cada item passa pelas mesmas regras do create_appointment, mas tudo é validado em memória: a
+    agenda do período coberto pelo lote é carregada uma vez (load_period) e cada item aceito vira
+    uma reserva pendente no recurso escolhido, para que os seguintes o enxerguem. Os itens são
+    processados na ordem do pedido; os que falham são informados sem impedir os demais. Os aceitos
+    são gravados com um único INSERT ... RETURNING e os clientes com um único upsert.
+    Retorna um resultado por item (index, success, appointment_id/status ou error).
+    """
+    # Mesma trava do create_appointment, uma vez para o lote inteiro
+    establishment = db.query(Establishment).filter(Establishment.id == establishment_id).with_for_update().first()
+    tz = availability_service.establishment_timezone(establishment) if establishment else None
+    if tz is None:
+        raise ValueError("Fuso horário do estabelecimento inválido.")
+
+    services = {
+        service.id: service for service in db.query(Service).filter(
+            Service.id.in_({item.service_id for item in items}),
+            Service.establishment_id == establishment_id,
+            Service.is_active.is_(True),
+        )
+    }
+    starts = [_as_utc(item.start_time) for item in items]
+    local_starts = [start.astimezone(tz) for start in starts]
+    days = [start.date() for start in local_starts]
+    period = availability_service.load_period(db, establishment=establishment, tz=tz, start_date=min(days), end_date=max(days))
+
+    # Um contexto por (serviço, profissional pedido), todos sobre os mesmos dados do período. As
+    # reservas pendentes são compartilhadas por profissional entre os contextos
+    contexts: Dict[Tuple[int, Optional[int]], Optional[availability_service.AvailabilityContext]] = {}
+    reserved: Dict[Optional[int], List[Tuple[datetime, datetime]]] = {}
+    results: List[Optional[dict]] = [None] * len(items)
+    accepted: List[Tuple[int, Appointment]] = []
+    for index, item in enumerate(items):
+        service = services.get(item.service_id)
+        if service is None:
+            results[index] = _bulk_result(index, error="Serviço inválido ou não pertence a este estabelecimento.")
+            continue
+        key = (service.id, item.professional_id)
+        if key not in contexts:
+            context = availability_service.load_context(
+                db, establishment=establishment, service=service, start_date=min(days), end_date=max(days),
+                professional_id=item.professional_id, period=period,
+            )
+            for resource in (context.resources if context else ()):
+                resource.pending = reserved.setdefault(resource.professional_id, [])
+            contexts[key] = context
+        context = contexts[key]
+        resource = availability_service.pick_resource(context, local_starts[index]) if context else None
+        if resource is None:
+            results[index] = _bulk_result(index, error="Horário indisponível para este serviço.")
+            continue
+
+        start_time = starts[index]
+        end_time = start_time + timedelta(minutes=service.duration_minutes)
+        resource.pending.append((start_time, end_time))
+        accepted.append((index, Appointment(
+            start_time=start_time,
+            end_time=end_time,
+            customer_name=item.customer_name,
+            customer_phone=item.customer_phone,
+            customer_email=item.customer_email,
+            notes_by_customer=item.notes_by_customer,
+            status=AppointmentStatus.PENDING,
+            establishment_id=establishment_id,
+            service_id=service.id,
+            professional_id=resource.professional_id,
+        )))
+
+    if accepted:
+        customer_ids = customer_service.upsert_customers_for_bookings(
+            db,
+            establishment_id=establishment_id,
+            bookings=[
+                {"name": appointment.customer_name, "phone": appointment.customer_phone,
+                 "email": appointment.customer_email, "start_time": appointment.start_time}
+                for _, appointment in accepted
+            ],
+        )
+        for _, appointment in accepted:
+            appointment.customer_id = customer_ids.get(customer_service.normalize_phone(appointment.customer_phone))
+        # Objetos do mesmo formato: o flush grava todos com um INSERT ... RETURNING id (insertmanyvalues)
+        db.add_all([appointment for _, appointment in accepted])
+        db.flush()
+        audit_service.record(db, [
+            audit_service.appointment_event(
+                appointment, to_status=appointment.status, actor_user_id=actor_user_id, source=audit_service.SOURCE_BULK
+            )
+            for _, appointment in accepted
+        ])
+        for index, appointment in accepted:
+            results[index] = _bulk_result(index, appointment=appointment)
+        events = [event_service.appointment_data(appointment) for _, appointment in accepted]
+        affected_days = {days[index] for index, _ in accepted}
+        db.commit()
+        event_service.publish_batch(establishment_id, event_service.APPOINTMENT_CREATED, events, affected_days)
+    else:
+        db.rollback() # Libera a trava do estabelecimento
+    return results
+
 def get_appointment(db: Session, *, appointment_id: int) -> Optional[Appointment]:
     """
     Obtém um agendamento específico pelo seu ID.
@@ -170,21 +285,246 @@ def get_appointments_by_establishment(
 
     if status:
         query = query.filter(Appointment.status == status)
-        
-    return query.order_by(desc(Appointment.start_time)).offset(skip).limit(limit).all()
+
+    # Read-through: se o período alcança meses já movidos para o arquivo frio, intercala os
+    # agendamentos arquivados com os da tabela. Ocorrências de agendamentos recorrentes entram
+    # do mesmo jeito. Sem arquivo nem séries no período, é só a query de sempre.
+    range_start, range_end = appointment_archive_service.date_range_bounds(start_date, end_date)
+    has_archive = appointment_archive_service.has_archive_in_range(establishment_id, start=range_start, end=range_end)
+    recurring = _recurring_appointments(
+        db, establishment_id=establishment_id, start_date=start_date, end_date=end_date, status=status
+    )
+    if not has_archive and not recurring:
+        return query.order_by(desc(Appointment.start_time)).offset(skip).limit(limit).all()
+
+    merged = query.order_by(desc(Appointment.start_time)).limit(skip + limit).all()
+    if has_archive:
+        cold = appointment_archive_service.iter_archived_appointments(
+            establishment_id, start=range_start, end=range_end, status=status, descending=True
+        )
+        merged = appointment_archive_service.merge_by_start_time(merged, cold, descending=True)
+    if recurring:
+        merged = heapq.merge(merged, recurring, key=lambda appointment: _as_utc(appointment.start_time), reverse=True)
+    return list(islice(merged, skip, skip + limit))
+
+def _recurring_appointments(
+    db: Session, *, establishment_id: int, start_date: Optional[date], end_date: Optional[date], status: Optional[AppointmentStatus]
+) -> List[Appointment]:
+    """
+    Ocorrências virtuais das séries no período da listagem (mais recentes primeiro), com o mesmo
+    corte por data da query. Sem período completo, a janela vai de hoje (ou de end_date para trás)
+    até LIST_HORIZON_DAYS dias: a expansão nunca percorre a série inteira.
+    """
+    establishment = db.get(Establishment, establishment_id)
+    tz = availability_service.establishment_timezone(establishment) if establishment else None
+    if tz is None:
+        return []
+    horizon = timedelta(days=recurrence_service.LIST_HORIZON_DAYS)
+    first_day = start_date or (end_date - horizon if end_date else datetime.now(tz).date())
+    last_day = end_date or first_day + horizon
+    range_start, range_end = appointment_archive_service.date_range_bounds(first_day, last_day)
+    # Datas locais com um dia de folga para cada lado: o corte da listagem é por dia em UTC
+    occurrences = recurrence_service.expand_occurrences(
+        db, establishment_id=establishment_id, tz=tz,
+        start_date=first_day - timedelta(days=1), end_date=last_day + timedelta(days=1)
+    )
+    appointments = [
+        recurrence_service.as_appointment(occurrence) for occurrence in occurrences
+        if range_start <= occurrence.start_time < range_end and (status is None or occurrence.series.status == status)
+    ]
+    appointments.sort(key=lambda appointment: appointment.start_time, reverse=True)
+    return appointments
+
+EXPORT_COLUMNS = [
+    "id", "start_time", "end_time", "status", "service_id", "customer_name", "customer_phone",
+    "customer_email", "notes_by_customer", "notes_by_establishment", "created_at",
+]
+
+def export_appointments_csv(
+    db: Session,
+    *,
+    establishment_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[AppointmentStatus] = None,
+    chunk_rows: int = 1000
+) -> Iterator[str]:
+    """
+    Gera o CSV dos agendamentos do estabelecimento em ordem cronológica, em pedaços de `chunk_rows` linhas.
+    Inclui os agendamentos do arquivo frio do período e lê a tabela em streaming (yield_per).
+    """
+    range_start, range_end = appointment_archive_service.date_range_bounds(start_date, end_date)
+    query = db.query(Appointment).filter(Appointment.establishment_id == establishment_id)
+    if range_start:
+        query = query.filter(Appointment.start_time >= range_start)
+    if range_end:
+        query = query.filter(Appointment.start_time < range_end)
+    if status:
+        query = query.filter(Appointment.status == status)
+
+    hot = query.order_by(Appointment.start_time).yield_per(chunk_rows)
+    cold = appointment_archive_service.iter_archived_appointments(
+        establishment_id, start=range_start, end=range_end, status=status
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, appointment in enumerate(appointment_archive_service.merge_by_start_time(hot, cold), start=1):
+        writer.writerow([
+            _as_utc(value).isoformat() if isinstance(value, datetime) else getattr(value, "value", value)
+            for value in (getattr(appointment, column) for column in EXPORT_COLUMNS)
+        ])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
 
 def update_appointment_status(
-    db: Session, *, appointment_db_obj: Appointment, status_in: AppointmentStatus
+    db: Session, *, appointment_db_obj: Appointment, status_in: AppointmentStatus, actor_user_id: Optional[int] = None
 ) -> Appointment:
     """
-    Atualiza o status de um agendamento existente.
+    Atualiza o status de um agendamento existente e registra a mudança no log de auditoria.
+    Um cancelamento oferece o horário liberado ao primeiro da lista de espera (waitlist_service).
+    Levanta StatusTransitionError se a transição não é permitida a partir do status atual.
     """
+    # Trava a linha e relê o status: a transição é validada, e o status anterior do log e do
+    # rollup de estatísticas é lido, a partir do banco, mesmo com outra mudança concorrente
+    db.refresh(appointment_db_obj, with_for_update=True)
+    error = status_validation_service.transition_error(
+        appointment_db_obj.status, status_in, start_time=_as_utc(appointment_db_obj.start_time), now=datetime.now(pytz.utc)
+    )
+    if error is not None:
+        db.rollback()
+        raise status_validation_service.StatusTransitionError(error)
+    if (
+        status_in == AppointmentStatus.COMPLETED
+        and appointment_db_obj.status != AppointmentStatus.COMPLETED
+        and appointment_db_obj.customer_id
+    ):
+        customer_service.register_completed_visit(
+            db, customer_id=appointment_db_obj.customer_id, visit_time=appointment_db_obj.start_time
+        )
+    previous_status = appointment_db_obj.status
+    if previous_status != status_in:
+        audit_service.record(db, [audit_service.appointment_event(
+            appointment_db_obj, from_status=previous_status, to_status=status_in, actor_user_id=actor_user_id
+        )])
     appointment_db_obj.status = status_in
     db.add(appointment_db_obj)
     db.commit()
     db.refresh(appointment_db_obj)
+    if previous_status != status_in:
+        timezone_name = appointment_db_obj.establishment.timezone
+        event_service.appointment_status_changed(
+            appointment_db_obj, previous_status=previous_status, timezone_name=timezone_name
+        )
+        if waitlist_service.frees_slot(previous_status, status_in):
+            waitlist_service.offer_freed_slot(db, **waitlist_service.freed_slot(appointment_db_obj, timezone_name=timezone_name))
     return appointment_db_obj
 
+def update_appointment_statuses_bulk(
+    db: Session, *, items: List[AppointmentStatusBulkItem], establishment_id: int, actor_user_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Muda o status de vários agendamentos do estabelecimento (ex: fechamento do dia) em uma transação.
+
+    Os agendamentos são carregados com uma query e cada mudança passa pelo
+    status_validation_service em memória (matriz compilada); as que falham são informadas sem impedir as demais. As
+    aceitas são gravadas com um único UPDATE executado com executemany (id + start_time no WHERE,
+    para o partition pruning), e as visitas concluídas entram no diretório de clientes em lote.
+    """
+    now = datetime.now(pytz.utc) # Mesmo instante para todo o lote
+    ids = {item.appointment_id for item in items}
+    appointments = {
+        appointment.id: appointment for appointment in db.query(Appointment).filter(
+            Appointment.id.in_(ids), Appointment.establishment_id == establishment_id
+        ).order_by(Appointment.id).with_for_update() # Status lido é o que o UPDATE substitui (log e rollup)
+    }
+    results: List[dict] = []
+    changes: List[Tuple[Appointment, AppointmentStatus]] = []
+    seen = set()
+    for index, item in enumerate(items):
+        appointment = appointments.get(item.appointment_id)
+        if appointment is None:
+            results.append(_bulk_result(index, error="Agendamento não encontrado"))
+            continue
+        if item.appointment_id in seen:
+            results.append(_bulk_result(index, error="Agendamento repetido no lote."))
+            continue
+        seen.add(item.appointment_id)
+        error = status_validation_service.transition_error(
+            appointment.status, item.status, start_time=appointment.start_time, now=now
+        )
+        if error is not None:
+            results.append(_bulk_result(index, error=error))
+            continue
+        changes.append((appointment, item.status))
+        results.append({"index": index, "success": True, "appointment_id": appointment.id, "status": item.status})
+
+    if not changes:
+        return results
+
+    table = Appointment.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("appointment_id"), table.c.start_time == bindparam("appointment_start"))
+        .values(status=bindparam("new_status"), updated_at=func.now()),
+        [
+            {"appointment_id": appointment.id, "appointment_start": appointment.start_time, "new_status": new_status}
+            for appointment, new_status in changes
+        ],
+    )
+    audit_service.record(db, [
+        audit_service.appointment_event(
+            appointment, from_status=appointment.status, to_status=new_status,
+            actor_user_id=actor_user_id, source=audit_service.SOURCE_BULK, occurred_at=now,
+        )
+        for appointment, new_status in changes
+    ])
+    customer_service.register_completed_visits(db, [
+        (appointment.customer_id, appointment.start_time) for appointment, new_status in changes
+        if new_status == AppointmentStatus.COMPLETED and appointment.customer_id
+    ])
+
+    # Dados dos eventos montados antes do commit (que expira os objetos carregados)
+    timezone_name = changes[0][0].establishment.timezone
+    events, affected_days, freed_slots = [], set(), []
+    for appointment, new_status in changes:
+        data = event_service.appointment_data(appointment, previous_status=appointment.status)
+        data["status"] = new_status.value
+        events.append(data)
+        if event_service.changes_availability(appointment.status, new_status):
+            affected_days.add(event_service.local_date(appointment.start_time, timezone_name))
+        if waitlist_service.frees_slot(appointment.status, new_status):
+            freed_slots.append(waitlist_service.freed_slot(appointment, timezone_name=timezone_name))
+    db.commit()
+    event_service.publish_batch(establishment_id, event_service.APPOINTMENT_STATUS_CHANGED, events, affected_days)
+    for slot in freed_slots:
+        waitlist_service.offer_freed_slot(db, **slot)
+    return results
+
+def get_allowed_statuses(db: Session, *, establishment_id: int, appointment_ids: List[int]) -> List[dict]:
+    """
+    Próximos status permitidos agora para cada agendamento do estabelecimento (uma query; ids de
+    outros estabelecimentos ou inexistentes ficam de fora), na ordem dos ids pedidos.
+    """
+    now = datetime.now(pytz.utc)
+    rows = {
+        row.id: row for row in db.query(Appointment.id, Appointment.status, Appointment.start_time).filter(
+            Appointment.id.in_(set(appointment_ids)), Appointment.establishment_id == establishment_id
+        )
+    }
+    return [
+        {
+            "appointment_id": appointment_id,
+            "status": rows[appointment_id].status,
+            "allowed_statuses": status_validation_service.allowed_next_statuses(rows[appointment_id], now=now),
+        }
+        for appointment_id in dict.fromkeys(appointment_ids) if appointment_id in rows
+    ]
+
 """
 Explicação Detalhada da Função create_appointment e suas Auxiliares:
 
@@ -0,0 +1,85 @@
+# app/services/audit_service.py
+# Log de auditoria dos agendamentos (tabela appointment_events).
+#
+# Os eventos são gravados na mesma transação da mudança, com um único INSERT por operação
+# (executemany nas operações em lote e no fechamento automático): nada é perdido se o processo
+# cair e nada fica gravado se a mudança for desfeita. O log é append-only; leituras incrementais
+# usam o id como cursor (events_after). Os mesmos eventos atualizam o rollup de estatísticas
+# (stats_service.apply_events), também na transação da mudança.
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import desc, insert
+from sqlalchemy.orm import Session
+
+from app.models.appointment_event_model import AppointmentEvent
+from app.models.appointment_model import AppointmentStatus
+from app.services import stats_service
+
+CREATED = "created"
+STATUS_CHANGED = "status_changed"
+
+# Origem da mudança
+SOURCE_API = "api" # Endpoints individuais (painel ou cliente final)
+SOURCE_BULK = "bulk" # Endpoints em lote
+SOURCE_SERIES = "series" # Ocorrência de agendamento recorrente materializada
+SOURCE_SCHEDULER = "scheduler" # Fechamento automático de agendamentos passados
+
+
+def appointment_event(
+    appointment,
+    *,
+    to_status: AppointmentStatus,
+    from_status: Optional[AppointmentStatus] = None,
+    actor_user_id: Optional[int] = None,
+    source: str = SOURCE_API,
+    occurred_at: Optional[datetime] = None,
+) -> dict:
+    """Linha do log para o agendamento (objeto do ORM ou linha com os mesmos atributos). Sem from_status, é a criação."""
+    return {
+        "appointment_id": appointment.id,
+        "establishment_id": appointment.establishment_id,
+        "event_type": STATUS_CHANGED if from_status is not None else CREATED,
+        "from_status": from_status,
+        "to_status": to_status,
+        "actor_user_id": actor_user_id,
+        "source": source,
+        "service_id": appointment.service_id,
+        "professional_id": appointment.professional_id,
+        "appointment_start_time": appointment.start_time,
+        "occurred_at": occurred_at or datetime.now(timezone.utc),
+    }
+
+
+def record(db: Session, events: Sequence[dict]) -> None:
+    """
+    Grava os eventos com um único INSERT (executemany) e atualiza o rollup de estatísticas.
+    Não faz commit: roda na transação da mudança.
+    """
+    if events:
+        db.execute(insert(AppointmentEvent.__table__), list(events))
+        stats_service.apply_events(db, events)
+
+
+def get_appointment_timeline(db: Session, *, appointment_id: int) -> List[AppointmentEvent]:
+    """Eventos do agendamento, do mais antigo ao mais recente (índice appointment_id + id)."""
+    return db.query(AppointmentEvent).filter(
+        AppointmentEvent.appointment_id == appointment_id
+    ).order_by(AppointmentEvent.id).all()
+
+
+def get_establishment_timeline(
+    db: Session, *, establishment_id: int, before_id: Optional[int] = None, limit: int = 100
+) -> List[AppointmentEvent]:
+    """Eventos do estabelecimento, mais recentes primeiro; `before_id` pagina para trás (índice establishment_id + id)."""
+    query = db.query(AppointmentEvent).filter(AppointmentEvent.establishment_id == establishment_id)
+    if before_id is not None:
+        query = query.filter(AppointmentEvent.id < before_id)
+    return query.order_by(desc(AppointmentEvent.id)).limit(limit).all()
+
+
+def events_after(db: Session, *, after_id: int, limit: int = 5000) -> List[AppointmentEvent]:
+    """Próximos eventos depois do cursor `after_id`, em ordem de gravação (consumo incremental)."""
+    return db.query(AppointmentEvent).filter(
+        AppointmentEvent.id > after_id
+    ).order_by(AppointmentEvent.id).limit(limit).all()
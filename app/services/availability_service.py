@@ -0,0 +1,522 @@
+# app/services/availability_service.py
+# Motor de disponibilidade com vários recursos (profissionais) em paralelo.
+#
+# Cada profissional ativo apto ao serviço é um recurso, com o próprio horário semanal (ou o
+# do estabelecimento, se não tiver um) e a própria agenda. Um horário está disponível quando
+# pelo menos um recurso está livre nele; no agendamento sem profissional escolhido, o motor
+# atribui um. Estabelecimentos sem profissionais cadastrados continuam com um único recurso,
+# o próprio estabelecimento, exatamente como antes.
+#
+# Feriados, bloqueios e horários especiais (schedule_exceptions) são aplicados sobre o horário
+# semanal compilado, uma vez por recurso e dia. Agendamentos recorrentes ocupam a agenda pelas
+# ocorrências do período, expandidas sob demanda (recurrence_service).
+#
+# Consultas ao banco não dependem do número de profissionais nem de dias: uma para os
+# profissionais, uma para os vínculos com o serviço, uma para as exceções, uma para os
+# agendamentos do período e até duas para as séries recorrentes.
+# O horário semanal é compilado uma vez por configuração (cache) e a ocupação de cada recurso
+# vira uma função em degraus (linha de varredura), consultada por busca binária; cada recurso
+# aceita até `capacity` agendamentos simultâneos (mesas de banho, cadeiras de salão).
+import bisect
+import heapq
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import pytz
+from sqlalchemy.orm import Session
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.establishment_model import Establishment
+from app.models.professional_model import Professional
+from app.models.professional_service_link import professional_service_link
+from app.models.schedule_exception_model import ScheduleException, ScheduleExceptionKind
+from app.models.service_model import Service
+from app.schemas.working_hours_schema import WorkingHoursConfig
+from app.services import recurrence_service, schedule_exception_service
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+BLOCKING_STATUSES = (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED) # Status que ocupam o horário
+MAX_APPOINTMENT_SPAN = timedelta(days=1) # Agendamentos que começam antes do período ainda podem invadi-lo
+
+
+def _as_utc(value: datetime) -> datetime:
+    # O PostgreSQL devolve datetimes aware; o SQLite (benchmarks) devolve naive, já em UTC
+    return value if value.tzinfo else value.replace(tzinfo=pytz.utc)
+
+
+# --- Horário semanal compilado ---
+
+class DayTemplate(NamedTuple):
+    start: time
+    end: time
+    breaks: Tuple[Tuple[time, time], ...] # Pausas (almoço)
+
+
+class WeeklySchedule(NamedTuple):
+    days: Tuple[Optional[DayTemplate], ...] # Indexado por weekday(); None = fechado
+    interval_minutes: int
+    capacity: int # Atendimentos simultâneos
+
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value, "%H:%M").time()
+
+
+@lru_cache(maxsize=1024)
+def _compile(config_json: str) -> WeeklySchedule:
+    config = WorkingHoursConfig.model_validate(json.loads(config_json))
+    days = []
+    for name in DAYS:
+        day = getattr(config, name)
+        if not day.is_active or not day.start_time or not day.end_time:
+            days.append(None)
+            continue
+        breaks = ()
+        if day.lunch_break_start_time and day.lunch_break_end_time:
+            breaks = ((_parse_time(day.lunch_break_start_time), _parse_time(day.lunch_break_end_time)),)
+        days.append(DayTemplate(_parse_time(day.start_time), _parse_time(day.end_time), breaks))
+    return WeeklySchedule(tuple(days), config.appointment_interval_minutes, config.capacity)
+
+
+def compile_working_hours(config: dict) -> WeeklySchedule:
+    """Valida e compila o JSON de horários (WorkingHoursConfig); o resultado fica em cache por configuração."""
+    return _compile(json.dumps(config, sort_keys=True))
+
+
+class DayPlan(NamedTuple):
+    """Expediente de um recurso em uma data, em datetimes aware no fuso do estabelecimento."""
+    start: datetime
+    end: datetime
+    breaks: Tuple[Tuple[datetime, datetime], ...]
+
+    def fits(self, start: datetime, end: datetime) -> bool:
+        if start < self.start or end > self.end:
+            return False
+        return not any(start < break_end and end > break_start for break_start, break_end in self.breaks)
+
+
+def day_plan(schedule: WeeklySchedule, tz, day: date) -> Optional[DayPlan]:
+    template = schedule.days[day.weekday()]
+    if template is None:
+        return None
+    localize = lambda value: tz.localize(datetime.combine(day, value))
+    return DayPlan(
+        localize(template.start),
+        localize(template.end),
+        tuple((localize(start), localize(end)) for start, end in template.breaks),
+    )
+
+
+def apply_exceptions(
+    plan: Optional[DayPlan],
+    exceptions: Sequence[ScheduleException],
+    *,
+    tz,
+    day: date,
+    professional_id: Optional[int],
+    own_hours: bool,
+) -> Optional[DayPlan]:
+    """
+    Aplica as exceções da data ao expediente do recurso. Valem as do estabelecimento inteiro e as
+    do próprio profissional:
+      - CLOSED fecha o dia;
+      - SPECIAL_HOURS substitui o expediente (sem pausas; bloqueios entram como BLOCKED). O horário
+        especial do estabelecimento só limita quem tem horário próprio;
+      - BLOCKED vira mais uma pausa.
+    """
+    relevant = [
+        exception for exception in exceptions
+        if exception.professional_id is None or (professional_id is not None and exception.professional_id == professional_id)
+    ]
+    if not relevant:
+        return plan
+    if any(exception.kind == ScheduleExceptionKind.CLOSED for exception in relevant):
+        return None
+
+    localize = lambda value: tz.localize(datetime.combine(day, value))
+    # As do estabelecimento primeiro, para que as do profissional prevaleçam
+    for exception in sorted(relevant, key=lambda exception: exception.professional_id is not None):
+        if exception.kind != ScheduleExceptionKind.SPECIAL_HOURS:
+            continue
+        start, end = localize(exception.start_time), localize(exception.end_time)
+        if exception.professional_id is not None or not own_hours:
+            plan = DayPlan(start, end, ())
+        elif plan is not None:
+            start, end = max(plan.start, start), min(plan.end, end)
+            plan = DayPlan(start, end, plan.breaks) if start < end else None
+    if plan is None:
+        return None
+
+    blocked = tuple(
+        (localize(exception.start_time), localize(exception.end_time))
+        for exception in relevant if exception.kind == ScheduleExceptionKind.BLOCKED
+    )
+    return plan._replace(breaks=plan.breaks + blocked) if blocked else plan
+
+
+# --- Ocupação (linha de varredura) ---
+
+class Occupancy:
+    """
+    Quantos agendamentos estão em andamento ao longo do tempo, como função em degraus.
+
+    Os extremos dos intervalos são ordenados uma vez e percorridos (sweep-line): cada início
+    soma 1, cada fim subtrai 1 (fins antes de inícios no mesmo instante, pois [início, fim) não
+    se sobrepõem quando um termina exatamente onde o outro começa). O pico em [start, end) é o
+    máximo dos degraus que o intervalo cruza, respondido por uma sparse table em O(1) após
+    localizar os degraus com busca binária: O(n log n) para montar e O(log n) por consulta.
+    """
+
+    def __init__(self, intervals: Sequence[Tuple[datetime, datetime]] = ()):
+        self.count = len(intervals)
+        events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+        self.times: List[datetime] = [] # levels[i] vale de times[i] até times[i + 1]
+        levels: List[int] = []
+        level = 0
+        for instant, delta in events:
+            level += delta
+            if self.times and self.times[-1] == instant:
+                levels[-1] = level
+            else:
+                self.times.append(instant)
+                levels.append(level)
+        # sparse[k][i] = máximo de levels[i : i + 2**k]
+        self.sparse = [levels]
+        width = 1
+        while width * 2 <= len(levels):
+            previous = self.sparse[-1]
+            self.sparse.append([max(previous[i], previous[i + width]) for i in range(len(previous) - width)])
+            width *= 2
+
+    def __len__(self) -> int:
+        return self.count
+
+    def peak(self, start: datetime, end: datetime) -> int:
+        """Maior número de agendamentos simultâneos em algum instante de [start, end)."""
+        last = bisect.bisect_left(self.times, end) - 1 # último degrau que começa antes do fim
+        if last < 0:
+            return 0
+        first = max(bisect.bisect_right(self.times, start) - 1, 0) # degrau em vigor no início
+        if first > last:
+            return 0
+        k = (last - first + 1).bit_length() - 1
+        return max(self.sparse[k][first], self.sparse[k][last - (1 << k) + 1])
+
+
+# --- Contexto de disponibilidade ---
+
+@dataclass
+class Resource:
+    professional_id: Optional[int] # None = o próprio estabelecimento (sem profissionais)
+    schedule: WeeklySchedule
+    own_hours: bool = False # Horário próprio (profissional) em vez do horário do estabelecimento
+    capacity: int = 1 # Agendamentos simultâneos que o recurso atende
+    booked: Occupancy = field(default_factory=Occupancy)
+    # Reservas ainda não gravadas (criação em lote); compartilhadas entre contextos do mesmo profissional
+    pending: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    exceptions: Dict[date, List[ScheduleException]] = field(default_factory=dict) # Compartilhado entre os recursos
+    _plans: Dict[date, Optional[DayPlan]] = field(default_factory=dict)
+
+    def plan(self, tz, day: date) -> Optional[DayPlan]:
+        """Expediente do dia: horário semanal compilado + exceções da data (calculado uma vez por dia)."""
+        if day not in self._plans:
+            plan = day_plan(self.schedule, tz, day)
+            day_exceptions = self.exceptions.get(day)
+            if day_exceptions:
+                plan = apply_exceptions(
+                    plan, day_exceptions, tz=tz, day=day, professional_id=self.professional_id, own_hours=self.own_hours
+                )
+            self._plans[day] = plan
+        return self._plans[day]
+
+    @property
+    def load(self) -> int:
+        return len(self.booked) + len(self.pending)
+
+    def peak(self, start: datetime, end: datetime) -> int:
+        """
+        Pico de ocupação em [start, end) contando as reservas pendentes. Entre dois extremos
+        consecutivos das reservas que cruzam o intervalo o número delas é constante, então basta
+        somá-lo ao pico gravado de cada trecho.
+        """
+        overlapping = [(s, e) for s, e in self.pending if s < end and e > start]
+        if not overlapping:
+            return self.booked.peak(start, end)
+        cuts = sorted({start, end} | {t for interval in overlapping for t in interval if start < t < end})
+        return max(
+            self.booked.peak(left, right) + sum(1 for s, e in overlapping if s <= left and e >= right)
+            for left, right in zip(cuts, cuts[1:])
+        )
+
+
+@dataclass
+class AvailabilityContext:
+    establishment: Establishment
+    service: Service
+    tz: object
+    interval_minutes: int
+    resources: List[Resource]
+    unassigned: Occupancy # Agendamentos sem profissional num estabelecimento com profissionais
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(minutes=self.service.duration_minutes)
+
+    def free_resources(self, start_local: datetime) -> List[Resource]:
+        """Recursos com expediente e com vaga (ocupação abaixo da capacidade) em todo [start, start + duração)."""
+        end_local = start_local + self.duration
+        start_utc, end_utc = start_local.astimezone(pytz.utc), end_local.astimezone(pytz.utc)
+        day = start_local.date()
+        free = []
+        spare = 0
+        for resource in self.resources:
+            plan = resource.plan(self.tz, day)
+            if plan is None or not plan.fits(start_local, end_local):
+                continue
+            vacancies = resource.capacity - resource.peak(start_utc, end_utc)
+            if vacancies > 0:
+                free.append(resource)
+                spare += vacancies
+        # Agendamentos antigos sem profissional ocupam vagas de quem estiver livre
+        if free and len(self.unassigned) and spare <= self.unassigned.peak(start_utc, end_utc):
+            return []
+        return free
+
+    def candidate_starts(self, day: date) -> List[datetime]:
+        """Inícios possíveis no dia (grade a partir do início do expediente de cada recurso), em ordem."""
+        candidates: Dict[datetime, datetime] = {}
+        step = timedelta(minutes=self.interval_minutes)
+        for resource in self.resources:
+            plan = resource.plan(self.tz, day)
+            if plan is None:
+                continue
+            current = plan.start
+            while current + self.duration <= plan.end:
+                if plan.fits(current, current + self.duration):
+                    candidates.setdefault(current.astimezone(pytz.utc), current)
+                current += step
+        return [candidates[key] for key in sorted(candidates)]
+
+
+def _eligible_professionals(db: Session, *, establishment_id: int, service_id: int) -> Optional[List[Professional]]:
+    """
+    None quando o estabelecimento não tem profissionais ativos (modo de recurso único).
+    Senão, os ativos vinculados ao serviço; serviço sem nenhum vínculo vale para todos.
+    """
+    professionals = db.query(Professional).filter(
+        Professional.establishment_id == establishment_id, Professional.is_active.is_(True)
+    ).order_by(Professional.id).all()
+    if not professionals:
+        return None
+    assigned = {
+        row.professional_id for row in db.query(professional_service_link.c.professional_id).filter(
+            professional_service_link.c.service_id == service_id
+        )
+    }
+    if not assigned:
+        return professionals
+    return [professional for professional in professionals if professional.id in assigned]
+
+
+class PeriodData(NamedTuple):
+    """Agendamentos (por profissional) e exceções de um período; compartilhável entre serviços."""
+    bookings: Dict[Optional[int], List[Tuple[datetime, datetime]]]
+    exceptions: Dict[date, List[ScheduleException]]
+
+
+def load_period(db: Session, *, establishment: Establishment, tz, start_date: date, end_date: date) -> PeriodData:
+    """
+    Uma query para os agendamentos que ocupam [start_date, end_date], uma para as exceções e
+    até duas para as séries recorrentes do período.
+    """
+    range_start = tz.localize(datetime.combine(start_date, time.min)).astimezone(pytz.utc)
+    range_end = tz.localize(datetime.combine(end_date + timedelta(days=1), time.min)).astimezone(pytz.utc)
+    rows = db.query(Appointment.professional_id, Appointment.start_time, Appointment.end_time).filter(
+        Appointment.establishment_id == establishment.id,
+        Appointment.status.in_(BLOCKING_STATUSES),
+        Appointment.start_time >= range_start - MAX_APPOINTMENT_SPAN,
+        Appointment.start_time < range_end,
+        Appointment.end_time > range_start,
+    ).all()
+    bookings: Dict[Optional[int], List[Tuple[datetime, datetime]]] = {}
+    for row in rows:
+        bookings.setdefault(row.professional_id, []).append((_as_utc(row.start_time), _as_utc(row.end_time)))
+
+    # Ocorrências de agendamentos recorrentes, expandidas só para o período (incluindo o dia
+    # anterior, cuja ocorrência pode avançar sobre o início do período)
+    for occurrence in recurrence_service.expand_occurrences(
+        db, establishment_id=establishment.id, tz=tz, start_date=start_date - MAX_APPOINTMENT_SPAN, end_date=end_date
+    ):
+        if occurrence.series.status in BLOCKING_STATUSES and occurrence.start_time < range_end and occurrence.end_time > range_start:
+            bookings.setdefault(occurrence.series.professional_id, []).append((occurrence.start_time, occurrence.end_time))
+
+    # Exceções (feriados, bloqueios, horários especiais): consulta por data em O(1)
+    exceptions = schedule_exception_service.get_exceptions_by_date(
+        db, establishment_id=establishment.id, start_date=start_date, end_date=end_date
+    )
+    return PeriodData(bookings, exceptions)
+
+
+def establishment_timezone(establishment: Establishment):
+    try:
+        return pytz.timezone(establishment.timezone)
+    except pytz.UnknownTimeZoneError:
+        return None
+
+
+def load_context(
+    db: Session,
+    *,
+    establishment: Establishment,
+    service: Service,
+    start_date: date,
+    end_date: date,
+    professional_id: Optional[int] = None,
+    professional_ids: Optional[Sequence[int]] = None,
+    period: Optional[PeriodData] = None,
+) -> Optional[AvailabilityContext]:
+    """
+    Carrega recursos e agendamentos de [start_date, end_date] (datas locais do estabelecimento),
+    opcionalmente só dos profissionais pedidos. `period` reaproveita dados já carregados do período.
+    Retorna None se o estabelecimento não tem horário configurado ou tem fuso inválido.
+    """
+    tz = establishment_timezone(establishment)
+    if not establishment.working_hours_config or tz is None:
+        return None
+    establishment_schedule = compile_working_hours(establishment.working_hours_config)
+    wanted = set(professional_ids or ()) | ({professional_id} if professional_id is not None else set())
+
+    professionals = _eligible_professionals(db, establishment_id=establishment.id, service_id=service.id)
+    if professionals is None:
+        if wanted:
+            return None
+        resources = [Resource(None, establishment_schedule)]
+    else:
+        if wanted:
+            professionals = [professional for professional in professionals if professional.id in wanted]
+        resources = [
+            Resource(
+                professional.id,
+                compile_working_hours(professional.working_hours_config) if professional.working_hours_config else establishment_schedule,
+                own_hours=bool(professional.working_hours_config),
+            )
+            for professional in professionals
+        ]
+
+    if period is None:
+        period = load_period(db, establishment=establishment, tz=tz, start_date=start_date, end_date=end_date)
+
+    unassigned = Occupancy()
+    if professionals is None:
+        # Recurso único: qualquer agendamento ocupa o estabelecimento
+        resources[0].booked = Occupancy([interval for intervals in period.bookings.values() for interval in intervals])
+    else:
+        for resource in resources:
+            resource.booked = Occupancy(period.bookings.get(resource.professional_id, []))
+        unassigned = Occupancy(period.bookings.get(None, []))
+    for resource in resources:
+        resource.exceptions = period.exceptions
+        # Capacidade do serviço, se definida; senão a do horário do recurso (profissional ou estabelecimento)
+        resource.capacity = service.capacity or resource.schedule.capacity
+
+    return AvailabilityContext(
+        establishment=establishment,
+        service=service,
+        tz=tz,
+        interval_minutes=establishment_schedule.interval_minutes,
+        resources=resources,
+        unassigned=unassigned,
+    )
+
+
+def available_starts(context: AvailabilityContext, day: date) -> List[datetime]:
+    """Inícios (aware, fuso do estabelecimento) com pelo menos um recurso livre."""
+    return [start for start in context.candidate_starts(day) if context.free_resources(start)]
+
+
+def pick_resource(context: AvailabilityContext, start_local: datetime) -> Optional[Resource]:
+    """Escolhe o recurso livre com menos agendamentos no período (desempate pelo menor id)."""
+    free = context.free_resources(start_local)
+    if not free:
+        return None
+    return min(free, key=lambda resource: (resource.load, resource.professional_id or 0))
+
+
+# --- Busca do próximo horário livre ---
+
+DEFAULT_SEARCH_HORIZON_DAYS = 60
+MAX_SEARCH_HORIZON_DAYS = 366
+
+
+class FoundSlot(NamedTuple):
+    start: datetime # Aware, no fuso do estabelecimento
+    service_id: int
+    professional_id: Optional[int] # Quem seria atribuído (None sem profissionais)
+
+
+def _iter_free_slots(context: AvailabilityContext, day: date, after_utc: datetime) -> Iterator[FoundSlot]:
+    for start in context.candidate_starts(day):
+        if start < after_utc:
+            continue
+        resource = pick_resource(context, start)
+        if resource is not None:
+            yield FoundSlot(start, context.service.id, resource.professional_id)
+
+
+def find_next_available(
+    db: Session,
+    *,
+    establishment: Establishment,
+    services: Sequence[Service],
+    after: datetime,
+    limit: int = 5,
+    horizon_days: int = DEFAULT_SEARCH_HORIZON_DAYS,
+    professional_ids: Optional[Sequence[int]] = None,
+) -> List[FoundSlot]:
+    """
+    Os `limit` primeiros horários livres a partir de `after`, em ordem, somando todos os serviços
+    (e profissionais) pedidos, sem passar de `horizon_days` dias.
+
+    Percorre os dias em blocos de tamanho crescente (1, 2, 4, 8... dias), carregando cada bloco com
+    as mesmas queries fixas do cálculo de um dia, e para assim que encontra `limit` horários:
+    quando há vaga logo, custa o mesmo que consultar um dia; a janela toda só é lida se a agenda
+    estiver cheia.
+    """
+    tz = establishment_timezone(establishment)
+    if tz is None or not establishment.working_hours_config or not services or limit < 1:
+        return []
+    after_utc = _as_utc(after).astimezone(pytz.utc)
+    first_day = after_utc.astimezone(tz).date()
+    last_day = first_day + timedelta(days=max(horizon_days, 1) - 1)
+
+    found: List[FoundSlot] = []
+    chunk_start, chunk_days = first_day, 1
+    while chunk_start <= last_day and len(found) < limit:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last_day)
+        period = load_period(db, establishment=establishment, tz=tz, start_date=chunk_start, end_date=chunk_end)
+        contexts = [
+            context for context in (
+                load_context(
+                    db, establishment=establishment, service=service, start_date=chunk_start, end_date=chunk_end,
+                    professional_ids=professional_ids, period=period,
+                )
+                for service in services
+            ) if context is not None and context.resources
+        ]
+        if not contexts:
+            break
+
+        day = chunk_start
+        while day <= chunk_end and len(found) < limit:
+            # Intercala os serviços em ordem de início, parando no limite
+            slots = heapq.merge(*(_iter_free_slots(context, day, after_utc) for context in contexts), key=lambda slot: slot.start)
+            found.extend(islice(slots, limit - len(found)))
+            day += timedelta(days=1)
+
+        chunk_start = chunk_end + timedelta(days=1)
+        chunk_days *= 2
+    return found
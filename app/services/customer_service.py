@@ -0,0 +1,247 @@
+# app/services/customer_service.py
+# Diretório de clientes por estabelecimento (tabela customers), chaveado pelo telefone normalizado.
+#
+# Os contadores (agendamentos, visitas, último agendamento/visita) são mantidos de forma
+# incremental: no agendamento (upsert_customer_for_booking) e na conclusão
+# (register_completed_visit). O backfill-customers preenche o diretório a partir dos
+# agendamentos antigos em lotes, e é idempotente (só processa agendamentos sem customer_id).
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, desc, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.customer_model import Customer
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Só os dígitos, sem DDI do Brasil e sem zero de tronco:
+    "+55 (11) 99999-8888", "011999998888" e "11999998888" viram "11999998888".
+    """
+    digits = _NON_DIGITS.sub("", phone or "")
+    if len(digits) in (12, 13) and digits.startswith("55"):
+        digits = digits[2:]
+    if len(digits) in (11, 12) and digits.startswith("0"):
+        digits = digits[1:]
+    return digits
+
+
+def _insert(db: Session):
+    """INSERT ... ON CONFLICT do dialeto em uso (PostgreSQL em produção, SQLite nos benchmarks)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Customer)
+
+
+def _latest(current, incoming):
+    # GREATEST portátil que ignora NULL (no SQLite, max(NULL, x) é NULL)
+    return case((current.is_(None), incoming), (incoming > current, incoming), else_=current)
+
+
+UPSERT_CHUNK_ROWS = 1000 # 9 parâmetros por linha: bem abaixo do limite de 65535 do PostgreSQL
+
+
+def _upsert(db: Session, rows: List[dict]) -> Dict[Tuple[int, str], int]:
+    """
+    Insere ou acumula clientes (uma instrução a cada UPSERT_CHUNK_ROWS linhas). Os contadores de
+    `rows` são somados aos existentes e as datas ficam com a mais recente.
+    Retorna {(establishment_id, phone_normalized): id}.
+    """
+    ids = {}
+    for offset in range(0, len(rows), UPSERT_CHUNK_ROWS):
+        statement = _insert(db).values(rows[offset:offset + UPSERT_CHUNK_ROWS])
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[Customer.establishment_id, Customer.phone_normalized],
+            set_={
+                "name": excluded.name,
+                "phone": excluded.phone,
+                "email": case((excluded.email.is_(None), Customer.email), else_=excluded.email),
+                "appointment_count": Customer.appointment_count + excluded.appointment_count,
+                "visit_count": Customer.visit_count + excluded.visit_count,
+                "last_booking_at": _latest(Customer.last_booking_at, excluded.last_booking_at),
+                "last_visit_at": _latest(Customer.last_visit_at, excluded.last_visit_at),
+            },
+        ).returning(Customer.id, Customer.establishment_id, Customer.phone_normalized)
+        ids.update({(establishment_id, phone): id for id, establishment_id, phone in db.execute(statement)})
+    return ids
+
+
+def upsert_customer_for_booking(
+    db: Session, *, establishment_id: int, name: str, phone: str, email: Optional[str], start_time: datetime
+) -> int:
+    """
+    Registra o agendamento no diretório: cria o cliente ou atualiza nome/e-mail e contadores.
+    Não faz commit; roda na mesma transação do agendamento. Retorna o id do cliente.
+    """
+    phone_normalized = normalize_phone(phone)
+    ids = _upsert(db, [{
+        "establishment_id": establishment_id,
+        "phone_normalized": phone_normalized,
+        "name": name,
+        "phone": phone,
+        "email": email,
+        "appointment_count": 1,
+        "visit_count": 0,
+        "last_booking_at": start_time,
+        "last_visit_at": None,
+    }])
+    return ids[(establishment_id, phone_normalized)]
+
+
+def upsert_customers_for_bookings(db: Session, *, establishment_id: int, bookings: List[dict]) -> Dict[str, int]:
+    """
+    Versão em lote do upsert_customer_for_booking: `bookings` traz name, phone, email e start_time
+    de cada agendamento. Agrega por telefone e grava com um único upsert. Não faz commit.
+    Retorna {phone_normalized: id}; telefones sem dígitos ficam de fora.
+    """
+    aggregates: Dict[str, dict] = {}
+    for booking in bookings:
+        phone_normalized = normalize_phone(booking["phone"])
+        if not phone_normalized:
+            continue
+        entry = aggregates.get(phone_normalized)
+        if entry is None:
+            entry = aggregates[phone_normalized] = {
+                "establishment_id": establishment_id, "phone_normalized": phone_normalized,
+                "name": booking["name"], "phone": booking["phone"], "email": booking["email"],
+                "appointment_count": 0, "visit_count": 0, "last_booking_at": None, "last_visit_at": None,
+            }
+        entry["appointment_count"] += 1
+        if entry["last_booking_at"] is None or booking["start_time"] >= entry["last_booking_at"]:
+            entry["last_booking_at"] = booking["start_time"]
+            entry["name"], entry["phone"] = booking["name"], booking["phone"]
+            entry["email"] = booking["email"] or entry["email"]
+    if not aggregates:
+        return {}
+    ids = _upsert(db, list(aggregates.values()))
+    return {phone: id for (_, phone), id in ids.items()}
+
+
+def register_completed_visit(db: Session, *, customer_id: int, visit_time: datetime) -> None:
+    """Conta uma visita concluída (status COMPLETED). Não faz commit."""
+    db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id)
+        .values(
+            visit_count=Customer.visit_count + 1,
+            last_visit_at=_latest(Customer.last_visit_at, visit_time),
+        )
+    )
+
+
+def register_completed_visits(db: Session, visits: List[Tuple[int, datetime]]) -> None:
+    """Versão em lote do register_completed_visit: (customer_id, visit_time) por visita. Não faz commit."""
+    totals: Dict[int, Tuple[int, datetime]] = {}
+    for customer_id, visit_time in visits:
+        count, latest = totals.get(customer_id, (0, visit_time))
+        totals[customer_id] = (count + 1, max(latest, visit_time))
+    if not totals:
+        return
+    customers = Customer.__table__
+    db.execute(
+        update(customers)
+        .where(customers.c.id == bindparam("customer_id"))
+        .values(
+            visit_count=customers.c.visit_count + bindparam("visits"),
+            last_visit_at=_latest(customers.c.last_visit_at, bindparam("visit_time")),
+        ),
+        [{"customer_id": customer_id, "visits": count, "visit_time": latest} for customer_id, (count, latest) in totals.items()],
+    )
+
+
+def backfill_customers(db: Session, *, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Cria/atualiza os clientes a partir dos agendamentos sem customer_id e os vincula.
+    Cada lote é agregado em memória por (estabelecimento, telefone), gravado com um único
+    upsert e vinculado com um UPDATE em lote; um commit por lote.
+    """
+    processed = 0
+    customers_touched = set()
+    last_id = 0
+    while True:
+        batch = db.query(
+            Appointment.id, Appointment.establishment_id, Appointment.customer_name, Appointment.customer_phone,
+            Appointment.customer_email, Appointment.start_time, Appointment.status
+        ).filter(
+            Appointment.customer_id.is_(None), Appointment.id > last_id
+        ).order_by(Appointment.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        aggregates: Dict[Tuple[int, str], dict] = {}
+        members: Dict[Tuple[int, str], List[int]] = {}
+        for row in batch:
+            phone_normalized = normalize_phone(row.customer_phone)
+            if not phone_normalized:
+                continue
+            key = (row.establishment_id, phone_normalized)
+            entry = aggregates.get(key)
+            if entry is None:
+                entry = aggregates[key] = {
+                    "establishment_id": row.establishment_id, "phone_normalized": phone_normalized,
+                    "name": row.customer_name, "phone": row.customer_phone, "email": row.customer_email,
+                    "appointment_count": 0, "visit_count": 0, "last_booking_at": None, "last_visit_at": None,
+                }
+                members[key] = []
+            members[key].append(row.id)
+            entry["appointment_count"] += 1
+            if entry["last_booking_at"] is None or row.start_time >= entry["last_booking_at"]:
+                # Nome, telefone e e-mail ficam com os do agendamento mais recente
+                entry["last_booking_at"] = row.start_time
+                entry["name"], entry["phone"] = row.customer_name, row.customer_phone
+                entry["email"] = row.customer_email or entry["email"]
+            if row.status == AppointmentStatus.COMPLETED:
+                entry["visit_count"] += 1
+                if entry["last_visit_at"] is None or row.start_time > entry["last_visit_at"]:
+                    entry["last_visit_at"] = row.start_time
+
+        if aggregates:
+            ids = _upsert(db, list(aggregates.values()))
+            # Vínculo em lote: um único UPDATE executado com executemany
+            db.execute(
+                update(Appointment.__table__)
+                .where(Appointment.__table__.c.id == bindparam("appointment_id"))
+                .values(customer_id=bindparam("new_customer_id")),
+                [
+                    {"appointment_id": appointment_id, "new_customer_id": ids[key]}
+                    for key, appointment_ids in members.items()
+                    for appointment_id in appointment_ids
+                ],
+            )
+            customers_touched.update(ids.values())
+        db.commit()
+        processed += len(batch)
+
+    return {"appointments": processed, "customers": len(customers_touched)}
+
+
+def get_customers_by_establishment(
+    db: Session, *, establishment_id: int, phone: Optional[str] = None, skip: int = 0, limit: int = 100
+) -> List[Customer]:
+    """Lista os clientes (mais recentes primeiro) ou busca pelo telefone, em qualquer formato."""
+    query = db.query(Customer).filter(Customer.establishment_id == establishment_id)
+    if phone:
+        query = query.filter(Customer.phone_normalized == normalize_phone(phone))
+    return query.order_by(desc(Customer.last_booking_at), desc(Customer.id)).offset(skip).limit(limit).all()
+
+
+def get_customer(db: Session, *, establishment_id: int, customer_id: int) -> Optional[Customer]:
+    return db.query(Customer).filter(
+        Customer.id == customer_id, Customer.establishment_id == establishment_id
+    ).first()
+
+
+def get_customer_history(db: Session, *, customer_id: int, skip: int = 0, limit: int = 50) -> List[Appointment]:
+    """Agendamentos do cliente, mais recentes primeiro (índice customer_id + start_time)."""
+    return db.query(Appointment).filter(
+        Appointment.customer_id == customer_id
+    ).order_by(desc(Appointment.start_time)).offset(skip).limit(limit).all()
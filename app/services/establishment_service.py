@@ -1,17 +1,18 @@
 # Este arquivo contém a lógica de negócios relacionada aos estabelecimentos.
 # Ele interage com o banco de dados e aplica regras de negócio específicas.
 from sqlalchemy.orm import Session, joinedload
-from typing import Optional
+from typing import List, Optional
 
-from app.models.establishment_model import Establishment
+from app.models.establishment_model import Establishment, PastAppointmentPolicy
 from app.schemas.working_hours_schema import WorkingHoursConfig # Nosso schema para os horários
 
 from app.models.user_model import User
-from app.services import user_service
+from app.services import event_service, user_service
 from app.models.role_enum import Role
 from app.models.user_establishment_link import user_establishment_link # Importa a tabela de associação
 
 from app.schemas.establishment_schema import Establishment as EstablishmentSchema, MemberSchema
+from app.schemas.user_schema import UserEstablishmentInfo
 
 
 def get_establishment_by_id(db: Session, *, establishment_id: int) -> Optional[Establishment]:
@@ -20,6 +21,16 @@ def get_establishment_by_id(db: Session, *, establishment_id: int) -> Optional[E
     """
     return db.query(Establishment).filter(Establishment.id == establishment_id).first()
 
+def get_member_role(db: Session, *, establishment_id: int, user_id: int) -> Optional[Role]:
+    """
+    Retorna o papel (OWNER/COLLABORATOR) do usuário no estabelecimento, ou None se ele não for membro.
+    Consulta só a tabela de associação, sem carregar o estabelecimento nem seus usuários.
+    """
+    link = db.query(user_establishment_link.c.role).filter_by(
+        user_id=user_id, establishment_id=establishment_id
+    ).first()
+    return link.role if link else None
+
 def add_collaborator(
     db: Session, *, establishment: Establishment, collaborator_email: str
 ) -> Establishment:
@@ -71,6 +82,23 @@ def remove_collaborator(
 
     return establishment
 
+def get_memberships_for_user(db: Session, *, user_id: int) -> List[UserEstablishmentInfo]:
+    """
+    Lista os estabelecimentos dos quais o usuário é membro, com o papel dele em cada um
+    (resposta do /users/me). Uma única query com join na tabela de associação.
+    """
+    rows = db.query(
+        Establishment.id,
+        Establishment.name,
+        user_establishment_link.c.role
+    ).join(
+        user_establishment_link, user_establishment_link.c.establishment_id == Establishment.id
+    ).filter(
+        user_establishment_link.c.user_id == user_id
+    ).order_by(Establishment.id).all()
+
+    return [UserEstablishmentInfo(id=id, name=name, role=role) for id, name, role in rows]
+
 def get_establishment_for_api_response(db: Session, *, establishment_id: int) -> Optional[EstablishmentSchema]:
     """
     Busca um estabelecimento e monta o schema Pydantic de resposta,
@@ -104,6 +132,7 @@ def get_establishment_for_api_response(db: Session, *, establishment_id: int) ->
         timezone=establishment.timezone,
         display_address=establishment.display_address,
         about_text=establishment.about_text,
+        past_appointment_policy=establishment.past_appointment_policy,
         users=members_list
         # Adicione aqui quaisquer outros campos do schema Establishment
     )
@@ -124,6 +153,17 @@ def update_establishment_working_hours(
     """
     establishment_db_obj.working_hours_config = working_hours_in.dict() # Salva o JSON no campo
 
+    db.add(establishment_db_obj)
+    db.commit()
+    db.refresh(establishment_db_obj)
+    event_service.availability_changed(establishment_db_obj.id)
+    return establishment_db_obj
+
+def update_past_appointment_policy(
+    db: Session, *, establishment_db_obj: Establishment, policy: PastAppointmentPolicy
+) -> Establishment:
+    """Define a política aplicada pelo scheduler aos agendamentos que passaram do horário."""
+    establishment_db_obj.past_appointment_policy = policy.value
     db.add(establishment_db_obj)
     db.commit()
     db.refresh(establishment_db_obj)
@@ -0,0 +1,90 @@
+# app/services/event_service.py
+# Eventos de agenda publicados no stream em tempo real (ver app/core/realtime.py).
+#
+# Sempre chamados depois do commit. Os dados são mínimos e sem dados pessoais do cliente (o
+# payload passa pelo Redis); o painel usa o id para buscar o agendamento quando precisar.
+from datetime import date, datetime
+from typing import Iterable, Optional, Sequence
+
+import pytz
+
+from app.core import realtime
+from app.models.appointment_model import Appointment, AppointmentStatus
+
+APPOINTMENT_CREATED = "appointment.created"
+APPOINTMENT_STATUS_CHANGED = "appointment.status_changed"
+AVAILABILITY_INVALIDATED = "availability.invalidated"
+WAITLIST_OFFERED = "waitlist.offered"
+
+# Status que ocupam o horário (mesma regra do motor de disponibilidade)
+_BLOCKING_STATUSES = (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED)
+
+
+def local_date(value: datetime, timezone_name: Optional[str]) -> date:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=pytz.utc)
+    try:
+        return value.astimezone(pytz.timezone(timezone_name or "UTC")).date()
+    except pytz.UnknownTimeZoneError:
+        return value.date()
+
+
+def appointment_data(appointment: Appointment, *, previous_status: Optional[AppointmentStatus] = None) -> dict:
+    data = {
+        "appointment_id": appointment.id,
+        "service_id": appointment.service_id,
+        "professional_id": appointment.professional_id,
+        "status": appointment.status.value,
+        "start_time": appointment.start_time.isoformat(),
+        "end_time": appointment.end_time.isoformat(),
+    }
+    if previous_status is not None:
+        data["previous_status"] = previous_status.value
+    return data
+
+
+def changes_availability(previous_status: AppointmentStatus, new_status: AppointmentStatus) -> bool:
+    """Só libera ou ocupa horário quando passa de um status que bloqueia para um que não bloqueia (ou o contrário)."""
+    return (previous_status in _BLOCKING_STATUSES) != (new_status in _BLOCKING_STATUSES)
+
+
+def availability_changed(establishment_id: int, dates: Optional[Iterable[date]] = None) -> None:
+    """Horários livres mudaram nas datas (locais) informadas; sem datas, em qualquer dia."""
+    data = {"dates": sorted({day.isoformat() for day in dates})} if dates is not None else {"all": True}
+    realtime.publish(establishment_id, AVAILABILITY_INVALIDATED, data)
+
+
+def appointment_created(appointment: Appointment, *, timezone_name: Optional[str]) -> None:
+    realtime.publish(appointment.establishment_id, APPOINTMENT_CREATED, appointment_data(appointment))
+    availability_changed(appointment.establishment_id, [local_date(appointment.start_time, timezone_name)])
+
+
+def appointment_status_changed(
+    appointment: Appointment, *, previous_status: AppointmentStatus, timezone_name: Optional[str]
+) -> None:
+    data = appointment_data(appointment, previous_status=previous_status)
+    realtime.publish(appointment.establishment_id, APPOINTMENT_STATUS_CHANGED, data)
+    if changes_availability(previous_status, appointment.status):
+        availability_changed(appointment.establishment_id, [local_date(appointment.start_time, timezone_name)])
+
+
+def publish_batch(establishment_id: int, event_type: str, items: Sequence[dict], dates: Iterable[date]) -> None:
+    """
+    Operações em lote: um evento por agendamento (dados montados antes do commit, com
+    appointment_data) e uma única invalidação de disponibilidade com todas as datas afetadas.
+    """
+    for data in items:
+        realtime.publish(establishment_id, event_type, data)
+    dates = set(dates)
+    if dates:
+        availability_changed(establishment_id, dates)
+
+
+def waitlist_offered(entry) -> None:
+    """Um cliente da lista de espera recebeu a reserva de um horário liberado (agendamento PENDING)."""
+    realtime.publish(entry.establishment_id, WAITLIST_OFFERED, {
+        "entry_id": entry.id,
+        "appointment_id": entry.appointment_id,
+        "service_id": entry.service_id,
+        "offer_expires_at": entry.offer_expires_at.isoformat(),
+    })
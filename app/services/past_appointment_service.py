@@ -0,0 +1,123 @@
+# app/services/past_appointment_service.py
+# Fechamento automático dos agendamentos que passaram do horário sem atualização de status.
+#
+# Cada estabelecimento escolhe a política (Establishment.past_appointment_policy). A regra
+# temporal é a do status_validation_service: depois do horário, um agendamento em aberto só pode
+# virar concluído ou não-comparecimento. O fechamento é feito em SQL, por conjunto: um
+# UPDATE ... WHERE id IN (SELECT ... LIMIT n FOR UPDATE SKIP LOCKED) RETURNING por lote, sem
+# carregar as linhas pelo ORM, com um commit por lote. Visitas concluídas e eventos em tempo real
+# são registrados em lote a partir das linhas devolvidas pelo RETURNING, assim como o log de
+# auditoria (um INSERT por lote).
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core import realtime
+from app.core.config import settings
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.establishment_model import Establishment, PastAppointmentPolicy
+from app.services import audit_service, customer_service, event_service
+from app.services.status_validation_service import PAST_DUE_STATUSES
+
+# Status de origem -> status final, por política. Só transições que a regra temporal permite:
+# origem em PAST_DUE_STATUSES, destino em PAST_DUE_TARGETS.
+POLICY_TRANSITIONS: Dict[PastAppointmentPolicy, Dict[AppointmentStatus, AppointmentStatus]] = {
+    PastAppointmentPolicy.COMPLETED: {status: AppointmentStatus.COMPLETED for status in PAST_DUE_STATUSES},
+    PastAppointmentPolicy.NO_SHOW: {status: AppointmentStatus.NO_SHOW for status in PAST_DUE_STATUSES},
+    PastAppointmentPolicy.CONFIRMED_COMPLETED: {
+        AppointmentStatus.CONFIRMED: AppointmentStatus.COMPLETED,
+        AppointmentStatus.RESCHEDULED: AppointmentStatus.COMPLETED,
+        AppointmentStatus.PENDING: AppointmentStatus.NO_SHOW,
+    },
+}
+
+
+def _close_chunk(
+    db: Session, *, policy: PastAppointmentPolicy, source: AppointmentStatus, target: AppointmentStatus,
+    cutoff: datetime, chunk_size: int
+) -> List:
+    table = Appointment.__table__
+    establishments = Establishment.__table__
+    candidates = (
+        select(table.c.id)
+        .where(
+            table.c.establishment_id.in_(
+                select(establishments.c.id).where(establishments.c.past_appointment_policy == policy.value)
+            ),
+            table.c.status == source,
+            table.c.start_time < cutoff, # Poda as partições futuras
+            table.c.end_time < cutoff,
+        )
+        .order_by(table.c.id)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True) # Não espera por linhas que alguém está alterando agora
+    )
+    statement = (
+        update(table)
+        .where(table.c.id.in_(candidates), table.c.start_time < cutoff)
+        .values(status=target, updated_at=func.now())
+        .returning(
+            table.c.id, table.c.establishment_id, table.c.service_id, table.c.professional_id,
+            table.c.customer_id, table.c.status, table.c.start_time, table.c.end_time,
+        )
+    )
+    return db.execute(statement).all()
+
+
+def _publish(rows: List, *, previous_status: AppointmentStatus, max_events: int) -> None:
+    by_establishment = defaultdict(list)
+    for row in rows:
+        by_establishment[row.establishment_id].append(row)
+    for establishment_id, closed in by_establishment.items():
+        if len(closed) > max_events:
+            # Fechamento grande (ex: primeira execução): um único aviso para o painel recarregar
+            realtime.publish(establishment_id, realtime.RESYNC_EVENT, {"reason": "past_appointments_closed", "count": len(closed)})
+            continue
+        # Horários que já passaram não são oferecidos: não há disponibilidade a invalidar
+        event_service.publish_batch(
+            establishment_id,
+            event_service.APPOINTMENT_STATUS_CHANGED,
+            [event_service.appointment_data(row, previous_status=previous_status) for row in closed],
+            (),
+        )
+
+
+def close_past_appointments(
+    db: Session,
+    *,
+    now: Optional[datetime] = None,
+    grace_minutes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Aplica a política de cada estabelecimento aos agendamentos PENDING/CONFIRMED/RESCHEDULED que
+    terminaram há mais de `grace_minutes`. Retorna quantos foram para cada status final.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.PAST_APPOINTMENT_GRACE_MINUTES if grace_minutes is None else grace_minutes)
+    chunk_size = chunk_size or settings.PAST_APPOINTMENT_CHUNK_SIZE
+
+    totals: Dict[str, int] = defaultdict(int)
+    for policy, transitions in POLICY_TRANSITIONS.items():
+        for source, target in transitions.items():
+            while True:
+                rows = _close_chunk(db, policy=policy, source=source, target=target, cutoff=cutoff, chunk_size=chunk_size)
+                audit_service.record(db, [
+                    audit_service.appointment_event(
+                        row, from_status=source, to_status=target, source=audit_service.SOURCE_SCHEDULER, occurred_at=now
+                    )
+                    for row in rows
+                ])
+                if target == AppointmentStatus.COMPLETED:
+                    customer_service.register_completed_visits(
+                        db, [(row.customer_id, row.start_time) for row in rows if row.customer_id]
+                    )
+                db.commit()
+                _publish(rows, previous_status=source, max_events=settings.PAST_APPOINTMENT_MAX_EVENTS)
+                totals[target.value] += len(rows)
+                if len(rows) < chunk_size:
+                    break
+    return dict(totals)
@@ -2,38 +2,113 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.models.appointment_model import Appointment
+from app.models.appointment_series_model import AppointmentSeries
 from app.models.professional_model import Professional
+from app.models.service_model import Service
 from app.schemas.professional_schema import ProfessionalCreate, ProfessionalUpdate
+from app.schemas.working_hours_schema import WorkingHoursConfig
+from app.services import event_service
+
+def _services_for(db: Session, *, establishment_id: int, service_ids: List[int]) -> List[Service]:
+    """Busca os serviços pelos ids, garantindo que todos pertencem ao estabelecimento."""
+    unique_ids = set(service_ids)
+    services = db.query(Service).filter(
+        Service.id.in_(unique_ids), Service.establishment_id == establishment_id
+    ).all() if unique_ids else []
+    if len(services) != len(unique_ids):
+        raise ValueError("Serviço inválido ou não pertence a este estabelecimento.")
+    return services
+
+def _ensure_unique_email(db: Session, *, establishment_id: int, email: Optional[str], professional_id: Optional[int] = None) -> None:
+    if not email:
+        return
+    query = db.query(Professional.id).filter(Professional.establishment_id == establishment_id, Professional.email == email)
+    if professional_id is not None:
+        query = query.filter(Professional.id != professional_id)
+    if query.first():
+        raise ValueError("Já existe um profissional com este e-mail neste estabelecimento.")
 
 def create_professional(db: Session, *, professional_in: ProfessionalCreate, establishment_id: int) -> Professional:
-    """Cria um novo profissional para um estabelecimento."""
+    """Cria um novo profissional para um estabelecimento, com seus serviços e horário (opcionais)."""
+    _ensure_unique_email(db, establishment_id=establishment_id, email=professional_in.email)
     db_professional = Professional(
-        **professional_in.dict(),
+        **professional_in.dict(exclude={"service_ids", "working_hours"}),
         establishment_id=establishment_id
     )
+    db_professional.services = _services_for(db, establishment_id=establishment_id, service_ids=professional_in.service_ids)
+    if professional_in.working_hours:
+        db_professional.working_hours_config = professional_in.working_hours.model_dump()
     db.add(db_professional)
     db.commit()
     db.refresh(db_professional)
     return db_professional
 
+def get_professional(db: Session, *, establishment_id: int, professional_id: int) -> Optional[Professional]:
+    return db.query(Professional).filter(
+        Professional.id == professional_id, Professional.establishment_id == establishment_id
+    ).first()
+
 def get_professionals_by_establishment(db: Session, *, establishment_id: int) -> List[Professional]:
     """Lista todos os profissionais de um estabelecimento."""
-    return db.query(Professional).filter(Professional.establishment_id == establishment_id).all()
+    return db.query(Professional).filter(Professional.establishment_id == establishment_id).order_by(Professional.id).all()
 
 def update_professional(db: Session, *, professional_db_obj: Professional, professional_in: ProfessionalUpdate) -> Professional:
     """Atualiza um profissional."""
-    update_data = professional_in.dict(exclude_unset=True)
+    update_data = professional_in.dict(exclude_unset=True, exclude={"service_ids", "working_hours"})
+    if "email" in update_data:
+        _ensure_unique_email(
+            db, establishment_id=professional_db_obj.establishment_id, email=update_data["email"],
+            professional_id=professional_db_obj.id
+        )
     for field, value in update_data.items():
         setattr(professional_db_obj, field, value)
+    if professional_in.service_ids is not None:
+        professional_db_obj.services = _services_for(
+            db, establishment_id=professional_db_obj.establishment_id, service_ids=professional_in.service_ids
+        )
+    if "working_hours" in professional_in.model_fields_set:
+        professional_db_obj.working_hours_config = professional_in.working_hours.model_dump() if professional_in.working_hours else None
+    db.add(professional_db_obj)
+    db.commit()
+    db.refresh(professional_db_obj)
+    event_service.availability_changed(professional_db_obj.establishment_id)
+    return professional_db_obj
+
+def set_professional_services(db: Session, *, professional_db_obj: Professional, service_ids: List[int]) -> Professional:
+    """Substitui os serviços que o profissional realiza."""
+    professional_db_obj.services = _services_for(
+        db, establishment_id=professional_db_obj.establishment_id, service_ids=service_ids
+    )
+    db.commit()
+    db.refresh(professional_db_obj)
+    event_service.availability_changed(professional_db_obj.establishment_id)
+    return professional_db_obj
+
+def set_professional_working_hours(
+    db: Session, *, professional_db_obj: Professional, working_hours_in: Optional[WorkingHoursConfig]
+) -> Professional:
+    """Define o horário próprio do profissional (None volta a seguir o horário do estabelecimento)."""
+    professional_db_obj.working_hours_config = working_hours_in.model_dump() if working_hours_in else None
     db.add(professional_db_obj)
     db.commit()
     db.refresh(professional_db_obj)
+    event_service.availability_changed(professional_db_obj.establishment_id)
     return professional_db_obj
 
 def delete_professional(db: Session, *, professional_id: int) -> Optional[Professional]:
-    """Deleta um profissional."""
+    """
+    Deleta um profissional. Agendamentos e séries dele continuam, sem profissional (ON DELETE SET
+    NULL); a atualização explícita cobre bancos criados antes da FK ter o ON DELETE.
+    """
     db_professional = db.query(Professional).filter(Professional.id == professional_id).first()
     if db_professional:
+        establishment_id = db_professional.establishment_id
+        for model in (Appointment, AppointmentSeries):
+            db.query(model).filter(model.professional_id == professional_id).update(
+                {model.professional_id: None}, synchronize_session=False
+            )
         db.delete(db_professional)
         db.commit()
-    return db_professional
\ No newline at end of file
+        event_service.availability_changed(establishment_id)
+    return db_professional
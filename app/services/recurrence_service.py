@@ -0,0 +1,277 @@
+# app/services/recurrence_service.py
+# Regras de recorrência (subconjunto do RRULE da RFC 5545) e expansão preguiçosa das séries.
+#
+# Subconjunto aceito:
+#   FREQ=DAILY|WEEKLY|MONTHLY       (obrigatório)
+#   INTERVAL=n                      (a cada n dias/semanas/meses; padrão 1)
+#   BYDAY=MO,WE,FR                  (só WEEKLY; padrão: o dia da semana da primeira ocorrência)
+#   BYMONTHDAY=15 ou -1             (só MONTHLY; -1 = último dia do mês; padrão: o dia da primeira ocorrência)
+#   COUNT=n ou UNTIL=AAAAMMDD       (opcionais, excludentes)
+# Ex: "FREQ=WEEKLY;BYDAY=TU" (toda terça), "FREQ=MONTHLY;INTERVAL=2;BYMONTHDAY=-1;COUNT=6".
+#
+# A expansão salta direto para o período consultado (aritmética de dias/semanas/meses a partir
+# da primeira ocorrência) e só gera as datas do período: o custo é proporcional à janela e ao
+# número de séries ativas nela, nunca ao tamanho da série. COUNT é convertido em `until_date`
+# uma única vez, na criação da série.
+import calendar
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import pytz
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.appointment_model import Appointment
+from app.models.appointment_series_model import AppointmentSeries, AppointmentSeriesException
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+MAX_INTERVAL = 366
+MAX_COUNT = 730 # Ocorrências por série com COUNT (dois anos de uma regra diária)
+LAST_DATE = date(9998, 12, 31) # Limite das buscas sem fim (evita estourar date.max)
+LIST_HORIZON_DAYS = 90 # Janela da listagem de agendamentos quando o período não é informado
+
+
+class RecurrenceRule(NamedTuple):
+    freq: str
+    interval: int = 1
+    by_weekday: Tuple[int, ...] = () # 0 = segunda
+    by_month_day: Tuple[int, ...] = () # Negativos contam do fim do mês
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+
+def _parse_int(name: str, value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Valor inválido para {name} na regra de recorrência: {value!r}.")
+
+
+def _parse_until(value: str) -> date:
+    # AAAAMMDD, opcionalmente com THHMMSS[Z]; vale a data
+    try:
+        return datetime.strptime(value[:8], "%Y%m%d").date()
+    except ValueError:
+        raise ValueError(f"UNTIL inválido na regra de recorrência: {value!r} (use AAAAMMDD).")
+
+
+@lru_cache(maxsize=1024)
+def parse_rrule(value: str) -> RecurrenceRule:
+    """Valida e interpreta a regra. Levanta ValueError com a mensagem para o usuário."""
+    text = (value or "").strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:"):]
+    parts: Dict[str, str] = {}
+    for part in filter(None, text.split(";")):
+        name, separator, part_value = part.partition("=")
+        name = name.strip().upper()
+        if not separator or not part_value.strip():
+            raise ValueError(f"Parte inválida na regra de recorrência: {part!r}.")
+        if name in parts:
+            raise ValueError(f"{name} repetido na regra de recorrência.")
+        parts[name] = part_value.strip().upper()
+
+    unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"Partes não suportadas na regra de recorrência: {', '.join(sorted(unknown))}.")
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError("FREQ precisa ser DAILY, WEEKLY ou MONTHLY.")
+
+    interval = _parse_int("INTERVAL", parts.get("INTERVAL", "1"))
+    if not 1 <= interval <= MAX_INTERVAL:
+        raise ValueError(f"INTERVAL precisa estar entre 1 e {MAX_INTERVAL}.")
+
+    by_weekday: Tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY só é suportado com FREQ=WEEKLY.")
+        try:
+            by_weekday = tuple(sorted({WEEKDAYS[day.strip()] for day in parts["BYDAY"].split(",")}))
+        except KeyError:
+            raise ValueError("BYDAY aceita MO, TU, WE, TH, FR, SA e SU.")
+
+    by_month_day: Tuple[int, ...] = ()
+    if "BYMONTHDAY" in parts:
+        if freq != "MONTHLY":
+            raise ValueError("BYMONTHDAY só é suportado com FREQ=MONTHLY.")
+        by_month_day = tuple(sorted({_parse_int("BYMONTHDAY", day) for day in parts["BYMONTHDAY"].split(",")}))
+        if any(day == 0 or not -31 <= day <= 31 for day in by_month_day):
+            raise ValueError("BYMONTHDAY aceita dias de 1 a 31 ou de -1 a -31.")
+
+    if "COUNT" in parts and "UNTIL" in parts:
+        raise ValueError("Use COUNT ou UNTIL, não os dois.")
+    count = None
+    if "COUNT" in parts:
+        count = _parse_int("COUNT", parts["COUNT"])
+        if not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"COUNT precisa estar entre 1 e {MAX_COUNT}.")
+    until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+
+    return RecurrenceRule(freq, interval, by_weekday, by_month_day, count, until)
+
+
+def _ceil_to_multiple(value: int, step: int) -> int:
+    return max(-(-value // step) * step, 0)
+
+
+def occurrences(
+    rule: RecurrenceRule, dtstart: date, window_start: date, window_end: date, *, until: Optional[date] = None
+) -> Iterator[date]:
+    """
+    Datas das ocorrências em [window_start, window_end], em ordem, para a série que começa em
+    `dtstart` e termina em `until` (ou rule.until). COUNT é ignorado aqui: já vem convertido em `until`.
+    """
+    low = max(window_start, dtstart)
+    high = min(window_end, LAST_DATE)
+    for bound in (until, rule.until):
+        if bound is not None:
+            high = min(high, bound)
+    if low > high:
+        return
+
+    if rule.freq == "DAILY":
+        current = dtstart + timedelta(days=_ceil_to_multiple((low - dtstart).days, rule.interval))
+        step = timedelta(days=rule.interval)
+        while current <= high:
+            yield current
+            current += step
+
+    elif rule.freq == "WEEKLY":
+        weekdays = rule.by_weekday or (dtstart.weekday(),)
+        first_monday = dtstart - timedelta(days=dtstart.weekday())
+        low_monday = low - timedelta(days=low.weekday())
+        weeks = _ceil_to_multiple((low_monday - first_monday).days // 7, rule.interval)
+        monday = first_monday + timedelta(weeks=weeks)
+        step = timedelta(weeks=rule.interval)
+        while monday <= high:
+            for weekday in weekdays:
+                current = monday + timedelta(days=weekday)
+                if current > high:
+                    return
+                if current >= low:
+                    yield current
+            monday += step
+
+    else: # MONTHLY
+        month_days = rule.by_month_day or (dtstart.day,)
+        first_month = dtstart.year * 12 + dtstart.month - 1
+        month = first_month + _ceil_to_multiple(low.year * 12 + low.month - 1 - first_month, rule.interval)
+        while True:
+            year, month_index = divmod(month, 12)
+            if date(year, month_index + 1, 1) > high:
+                return
+            length = calendar.monthrange(year, month_index + 1)[1]
+            # Dias que não existem no mês (31 em abril) são pulados, como na RFC 5545
+            days = sorted({day if day > 0 else length + day + 1 for day in month_days} & set(range(1, length + 1)))
+            for day in days:
+                current = date(year, month_index + 1, day)
+                if current > high:
+                    return
+                if current >= low:
+                    yield current
+            month += rule.interval
+
+
+def first_occurrence(rule: RecurrenceRule, dtstart: date) -> Optional[date]:
+    return next(occurrences(rule, dtstart, dtstart, LAST_DATE), None)
+
+
+def last_occurrence(rule: RecurrenceRule, dtstart: date) -> Optional[date]:
+    """Última data da série (None = sem fim). Com COUNT, percorre as ocorrências uma única vez (até MAX_COUNT)."""
+    if rule.count is not None:
+        last = None
+        for index, current in enumerate(occurrences(rule, dtstart, dtstart, LAST_DATE), start=1):
+            last = current
+            if index == rule.count:
+                break
+        return last
+    return rule.until
+
+
+def is_occurrence(series: AppointmentSeries, day: date) -> bool:
+    return next(occurrences(parse_rrule(series.rrule), series.start_date, day, day, until=series.until_date), None) == day
+
+
+def occurrence_bounds(series: AppointmentSeries, tz, day: date) -> Tuple[datetime, datetime]:
+    """Início e fim (UTC) da ocorrência do dia, no horário local da série."""
+    start = tz.normalize(tz.localize(datetime.combine(day, series.start_time))).astimezone(pytz.utc)
+    return start, start + timedelta(minutes=series.duration_minutes)
+
+
+# --- Expansão no período consultado ---
+
+class Occurrence(NamedTuple):
+    series: AppointmentSeries
+    occurrence_date: date
+    start_time: datetime # UTC
+    end_time: datetime
+
+
+def active_series(
+    db: Session, *, establishment_id: int, start_date: date, end_date: date, series_id: Optional[int] = None
+) -> List[AppointmentSeries]:
+    """Séries com alguma data em [start_date, end_date] (índice establishment_id + start_date)."""
+    query = db.query(AppointmentSeries).filter(
+        AppointmentSeries.establishment_id == establishment_id,
+        AppointmentSeries.start_date <= end_date,
+        or_(AppointmentSeries.until_date.is_(None), AppointmentSeries.until_date >= start_date),
+    )
+    if series_id is not None:
+        query = query.filter(AppointmentSeries.id == series_id)
+    return query.order_by(AppointmentSeries.id).all()
+
+
+def expand_occurrences(
+    db: Session, *, establishment_id: int, tz, start_date: date, end_date: date
+) -> List[Occurrence]:
+    """
+    Ocorrências virtuais com data local em [start_date, end_date]: sem as puladas e sem as já
+    materializadas como agendamento (essas aparecem como linhas de `appointments`).
+    Duas queries (séries e exceções do período), independente do tamanho das séries.
+    """
+    series_list = active_series(db, establishment_id=establishment_id, start_date=start_date, end_date=end_date)
+    if not series_list:
+        return []
+    excepted: Set[Tuple[int, date]] = {
+        (row.series_id, row.occurrence_date)
+        for row in db.query(AppointmentSeriesException.series_id, AppointmentSeriesException.occurrence_date).filter(
+            AppointmentSeriesException.series_id.in_([series.id for series in series_list]),
+            AppointmentSeriesException.occurrence_date >= start_date,
+            AppointmentSeriesException.occurrence_date <= end_date,
+        )
+    }
+    result = []
+    for series in series_list:
+        rule = parse_rrule(series.rrule)
+        for day in occurrences(rule, series.start_date, start_date, end_date, until=series.until_date):
+            if (series.id, day) in excepted:
+                continue
+            start, end = occurrence_bounds(series, tz, day)
+            result.append(Occurrence(series, day, start, end))
+    return result
+
+
+def as_appointment(occurrence: Occurrence) -> Appointment:
+    """Agendamento transiente (fora da sessão, sem id) que representa a ocorrência virtual nas listagens."""
+    series = occurrence.series
+    appointment = Appointment(
+        id=None,
+        start_time=occurrence.start_time,
+        end_time=occurrence.end_time,
+        customer_name=series.customer_name,
+        customer_phone=series.customer_phone,
+        customer_email=series.customer_email,
+        notes_by_customer=series.notes_by_customer,
+        status=series.status,
+        establishment_id=series.establishment_id,
+        service_id=series.service_id,
+        customer_id=series.customer_id,
+        professional_id=series.professional_id,
+        created_at=series.created_at,
+    )
+    appointment.series_id = series.id
+    appointment.occurrence_date = occurrence.occurrence_date
+    return appointment
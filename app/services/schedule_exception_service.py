@@ -0,0 +1,93 @@
+# app/services/schedule_exception_service.py
+# Exceções ao horário semanal: feriados, fechamentos, faixas bloqueadas e horários especiais.
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.professional_model import Professional
+from app.models.schedule_exception_model import ScheduleException
+from app.schemas.schedule_exception_schema import ScheduleExceptionCreate
+from app.services import event_service
+
+
+def create_schedule_exception(db: Session, *, exception_in: ScheduleExceptionCreate, establishment_id: int) -> ScheduleException:
+    if exception_in.professional_id is not None:
+        professional = db.query(Professional.id).filter(
+            Professional.id == exception_in.professional_id, Professional.establishment_id == establishment_id
+        ).first()
+        if not professional:
+            raise ValueError("Profissional inválido ou não pertence a este estabelecimento.")
+    db_exception = ScheduleException(**exception_in.model_dump(), establishment_id=establishment_id)
+    db.add(db_exception)
+    db.commit()
+    db.refresh(db_exception)
+    event_service.availability_changed(establishment_id, _affected_dates(db_exception))
+    return db_exception
+
+
+def get_schedule_exception(db: Session, *, establishment_id: int, exception_id: int) -> Optional[ScheduleException]:
+    return db.query(ScheduleException).filter(
+        ScheduleException.id == exception_id, ScheduleException.establishment_id == establishment_id
+    ).first()
+
+
+def delete_schedule_exception(db: Session, *, exception_db_obj: ScheduleException) -> None:
+    establishment_id, dates = exception_db_obj.establishment_id, _affected_dates(exception_db_obj)
+    db.delete(exception_db_obj)
+    db.commit()
+    event_service.availability_changed(establishment_id, dates)
+
+
+def _affected_dates(exception: ScheduleException) -> Optional[List[date]]:
+    # Exceção anual afeta a mesma data em todos os anos: o cliente recarrega tudo
+    return None if exception.recurring_yearly else [exception.date]
+
+
+def _occurrences(exception: ScheduleException, start_date: date, end_date: date) -> List[date]:
+    """Datas do período em que a exceção vale (uma, ou uma por ano se for recorrente)."""
+    if not exception.recurring_yearly:
+        return [exception.date] if start_date <= exception.date <= end_date else []
+    dates = []
+    for year in range(start_date.year, end_date.year + 1):
+        try:
+            occurrence = exception.date.replace(year=year)
+        except ValueError: # 29/02 em ano não bissexto
+            continue
+        if start_date <= occurrence <= end_date:
+            dates.append(occurrence)
+    return dates
+
+
+def get_exceptions_by_date(
+    db: Session, *, establishment_id: int, start_date: date, end_date: date
+) -> Dict[date, List[ScheduleException]]:
+    """
+    Exceções do período agrupadas por data, numa única query (índice establishment_id + date).
+    Recorrentes anuais entram em todas as datas do período em que caem.
+    """
+    exceptions = db.query(ScheduleException).filter(
+        ScheduleException.establishment_id == establishment_id,
+        or_(
+            ScheduleException.date.between(start_date, end_date),
+            ScheduleException.recurring_yearly.is_(True),
+        ),
+    ).order_by(ScheduleException.id).all()
+    by_date: Dict[date, List[ScheduleException]] = {}
+    for exception in exceptions:
+        for occurrence in _occurrences(exception, start_date, end_date):
+            by_date.setdefault(occurrence, []).append(exception)
+    return by_date
+
+
+def list_schedule_exceptions(
+    db: Session, *, establishment_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[ScheduleException]:
+    """Exceções cadastradas (as recorrentes aparecem sempre, uma vez, com a data original)."""
+    query = db.query(ScheduleException).filter(ScheduleException.establishment_id == establishment_id)
+    if start_date:
+        query = query.filter(or_(ScheduleException.date >= start_date, ScheduleException.recurring_yearly.is_(True)))
+    if end_date:
+        query = query.filter(or_(ScheduleException.date <= end_date, ScheduleException.recurring_yearly.is_(True)))
+    return query.order_by(ScheduleException.date, ScheduleException.id).all()
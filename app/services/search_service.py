@@ -0,0 +1,88 @@
+# app/services/search_service.py
+# Busca da recepção por pedaço de nome, telefone ou e-mail, sempre dentro de um estabelecimento.
+#
+# Com a pg_trgm instalada (ver app/db/search_indexes.py) os filtros usam ILIKE e o operador de
+# similaridade por palavra (<%), ambos atendidos pelos índices GIN trigrama, e o resultado é
+# ordenado por word_similarity (tolera erros de digitação: "mariana" encontra "Marianna").
+# Sem a extensão (ou no SQLite), cai para ILIKE '%termo%' com prefixos primeiro.
+from typing import Dict, List
+
+from sqlalchemy import case, desc, func, literal
+from sqlalchemy.orm import Query, Session
+
+from app.db.search_indexes import trigram_available
+from app.models.customer_model import Customer
+from app.models.professional_model import Professional
+from app.models.service_model import Service
+from app.services.customer_service import normalize_phone
+
+MIN_QUERY_LENGTH = 2
+MIN_PHONE_DIGITS = 3
+
+_trigram_by_database: Dict[str, bool] = {} # Verificado uma vez por banco, por processo
+
+
+def _uses_trigram(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _trigram_by_database:
+        with bind.connect() as connection:
+            _trigram_by_database[key] = trigram_available(connection)
+    return _trigram_by_database[key]
+
+
+def _like_pattern(term: str, *, prefix_only: bool = False) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+
+def _match_and_rank(query: Query, column, term: str, *, trigram: bool) -> Query:
+    """Filtra `column` pelo termo e ordena pelos melhores resultados primeiro."""
+    contains = column.ilike(_like_pattern(term), escape="\\")
+    if trigram:
+        return query.filter(contains | literal(term).op("<%")(column)).order_by(
+            desc(func.word_similarity(term, column))
+        )
+    starts_with = column.ilike(_like_pattern(term, prefix_only=True), escape="\\")
+    return query.filter(contains).order_by(case((starts_with, 0), else_=1))
+
+
+def search_customers(db: Session, *, establishment_id: int, term: str, limit: int = 10) -> List[Customer]:
+    """
+    Clientes por telefone (termo com dígitos suficientes), e-mail (termo com @) ou nome.
+    Empates ficam com quem agendou mais recentemente.
+    """
+    query = db.query(Customer).filter(Customer.establishment_id == establishment_id)
+    digits = normalize_phone(term)
+    if len(digits) >= MIN_PHONE_DIGITS and not any(character.isalpha() for character in term):
+        # Telefone: só dígitos, já normalizado; substring simples (o índice trigrama atende o LIKE)
+        query = query.filter(Customer.phone_normalized.like(_like_pattern(digits), escape="\\"))
+    elif "@" in term:
+        query = _match_and_rank(query, Customer.email, term, trigram=_uses_trigram(db))
+    else:
+        query = _match_and_rank(query, Customer.name, term, trigram=_uses_trigram(db))
+    return query.order_by(desc(Customer.last_booking_at), Customer.id).limit(limit).all()
+
+
+def search_services(db: Session, *, establishment_id: int, term: str, limit: int = 10) -> List[Service]:
+    query = db.query(Service).filter(Service.establishment_id == establishment_id)
+    query = _match_and_rank(query, Service.name, term, trigram=_uses_trigram(db))
+    return query.order_by(Service.name).limit(limit).all()
+
+
+def search_professionals(db: Session, *, establishment_id: int, term: str, limit: int = 10) -> List[Professional]:
+    query = db.query(Professional).filter(Professional.establishment_id == establishment_id)
+    query = _match_and_rank(query, Professional.name, term, trigram=_uses_trigram(db))
+    return query.order_by(Professional.name).limit(limit).all()
+
+
+def search(db: Session, *, establishment_id: int, term: str, limit: int = 10) -> Dict[str, list]:
+    """Busca nos clientes, serviços e profissionais do estabelecimento; até `limit` resultados de cada tipo."""
+    term = term.strip()
+    if len(term) < MIN_QUERY_LENGTH:
+        return {"customers": [], "services": [], "professionals": []}
+    return {
+        "customers": search_customers(db, establishment_id=establishment_id, term=term, limit=limit),
+        "services": search_services(db, establishment_id=establishment_id, term=term, limit=limit),
+        "professionals": search_professionals(db, establishment_id=establishment_id, term=term, limit=limit),
+    }
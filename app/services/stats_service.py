@@ -0,0 +1,473 @@
+# app/services/stats_service.py
+# Estatísticas de agendamentos e faturamento a partir do rollup appointment_daily_stats.
+#
+# O rollup guarda, por (estabelecimento, profissional, serviço, dia local, status), quantos
+# agendamentos estão naquele status. Ele é atualizado pelos mesmos eventos do log de auditoria
+# (audit_service.record chama apply_events): a criação soma 1 no status inicial e cada mudança
+# tira 1 do status anterior e soma 1 no novo, tudo na transação da mudança. Assim o rollup nunca
+# fica à frente nem atrás dos agendamentos, sem fila nem cursor para acompanhar.
+#
+# As leituras agregam O(dias x serviços) linhas do rollup. O faturamento é a contagem vezes o
+# preço atual do serviço (Service.price), o mesmo resultado de somar os preços dos agendamentos.
+#
+# `rebuild` (comando rebuild-stats) recalcula o rollup a partir dos agendamentos, incluindo o
+# arquivo frio e as partições desanexadas (schema appointments_archive); `find_differences`
+# (comando check-stats) compara sem alterar nada. Partições exportadas (CSV + DROP) não podem ser
+# recontadas: os dias até o fim do último mês exportado ficam como estão no rollup.
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import pytz
+
+from sqlalchemy import desc, func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import partitioning
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.appointment_stats_model import AppointmentDailyStat
+from app.models.establishment_model import Establishment
+from app.models.role_enum import Role
+from app.models.service_model import Service
+from app.models.user_establishment_link import user_establishment_link
+from app.services import appointment_archive_service, availability_service, event_service
+
+NO_PROFESSIONAL = 0 # professional_id do rollup para agendamentos sem profissional
+
+# Cancelados não contam como agendamentos; só os concluídos contam no faturamento
+COUNTED_STATUSES = frozenset(AppointmentStatus) - {
+    AppointmentStatus.CANCELLED_BY_CLIENT, AppointmentStatus.CANCELLED_BY_ESTABLISHMENT
+}
+REVENUE_STATUSES = frozenset({AppointmentStatus.COMPLETED})
+
+MAX_RANGE_DAYS = 366
+RECENT_APPOINTMENTS = 5
+UPCOMING_STATUSES = (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED)
+NEXT_APPOINTMENTS_HORIZON_DAYS = 7 # Próximos agendamentos do painel: só os da próxima semana
+UPSERT_CHUNK_ROWS = 1000 # 6 parâmetros por linha: bem abaixo do limite de 65535 do PostgreSQL
+
+# (establishment_id, professional_id, service_id, dia local, status)
+StatKey = Tuple[int, int, int, date, AppointmentStatus]
+
+
+def _insert(db: Session):
+    """INSERT ... ON CONFLICT do dialeto em uso (PostgreSQL em produção, SQLite nos benchmarks)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(AppointmentDailyStat)
+
+
+def _key(establishment_id: int, professional_id: Optional[int], service_id: int, day: date, status: AppointmentStatus) -> StatKey:
+    return (establishment_id, professional_id or NO_PROFESSIONAL, service_id, day, status)
+
+
+def _timezones(db: Session, establishment_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    # Quem acabou de travar/carregar o estabelecimento (criação) não paga outra query; os demais
+    # (fechamento automático, vários estabelecimentos) vêm em uma query só
+    timezones, missing = {}, []
+    for establishment_id in set(establishment_ids):
+        establishment = db.identity_map.get(db.identity_key(Establishment, establishment_id))
+        if establishment is not None:
+            timezones[establishment_id] = establishment.timezone
+        else:
+            missing.append(establishment_id)
+    if missing:
+        timezones.update(db.query(Establishment.id, Establishment.timezone).filter(Establishment.id.in_(missing)).all())
+    return timezones
+
+
+def event_deltas(db: Session, events: Sequence[dict]) -> Counter:
+    """Variação das contagens do rollup causada pelos eventos do log (formato de audit_service.appointment_event)."""
+    timezones = _timezones(db, (event["establishment_id"] for event in events))
+    deltas: Counter = Counter()
+    for event in events:
+        day = event_service.local_date(event["appointment_start_time"], timezones[event["establishment_id"]])
+        if event["from_status"] is not None:
+            deltas[_key(event["establishment_id"], event["professional_id"], event["service_id"], day, event["from_status"])] -= 1
+        deltas[_key(event["establishment_id"], event["professional_id"], event["service_id"], day, event["to_status"])] += 1
+    return deltas
+
+
+def _row(key: StatKey, count: int) -> dict:
+    establishment_id, professional_id, service_id, day, status = key
+    return {
+        "establishment_id": establishment_id, "professional_id": professional_id, "service_id": service_id,
+        "day": day, "status": status, "count": count,
+    }
+
+
+def apply_deltas(db: Session, deltas: Counter) -> None:
+    """
+    Soma as variações no rollup com INSERT ... ON CONFLICT DO UPDATE (uma instrução a cada
+    UPSERT_CHUNK_ROWS chaves). As chaves vão ordenadas: transações concorrentes travam as
+    linhas na mesma ordem e não entram em deadlock. Não faz commit.
+    """
+    rows = [_row(key, delta) for key, delta in sorted(deltas.items()) if delta]
+    for offset in range(0, len(rows), UPSERT_CHUNK_ROWS):
+        statement = _insert(db).values(rows[offset:offset + UPSERT_CHUNK_ROWS])
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                AppointmentDailyStat.establishment_id, AppointmentDailyStat.day, AppointmentDailyStat.professional_id,
+                AppointmentDailyStat.service_id, AppointmentDailyStat.status,
+            ],
+            set_={"count": AppointmentDailyStat.count + statement.excluded.count},
+        )
+        db.execute(statement)
+
+
+def apply_events(db: Session, events: Sequence[dict]) -> None:
+    """Atualiza o rollup com os eventos gravados no log (chamado por audit_service.record)."""
+    if events:
+        apply_deltas(db, event_deltas(db, events))
+
+
+# --- Leituras ---
+
+def _add(by_status: Dict[AppointmentStatus, Tuple[int, float]], status: AppointmentStatus, count: int, revenue: float) -> None:
+    total_count, total_revenue = by_status.get(status, (0, 0.0))
+    by_status[status] = (total_count + count, total_revenue + revenue)
+
+
+def _summary(by_status: Dict[AppointmentStatus, Tuple[int, float]]) -> dict:
+    return {
+        "appointments": sum(count for status, (count, _) in by_status.items() if status in COUNTED_STATUSES),
+        "revenue": round(sum(revenue for status, (_, revenue) in by_status.items() if status in REVENUE_STATUSES), 2),
+        "by_status": {status: count for status, (count, _) in by_status.items() if count},
+    }
+
+
+def _stats_query(db: Session, *columns, establishment_ids: Sequence[int], professional_id: Optional[int] = None,
+                 start_date: Optional[date] = None, end_date: Optional[date] = None):
+    query = db.query(
+        *columns,
+        AppointmentDailyStat.status,
+        func.sum(AppointmentDailyStat.count),
+        func.sum(AppointmentDailyStat.count * func.coalesce(Service.price, 0)),
+    ).outerjoin(Service, Service.id == AppointmentDailyStat.service_id).filter(
+        AppointmentDailyStat.establishment_id.in_(establishment_ids)
+    )
+    if professional_id is not None:
+        query = query.filter(AppointmentDailyStat.professional_id == professional_id)
+    if start_date is not None:
+        query = query.filter(AppointmentDailyStat.day >= start_date)
+    if end_date is not None:
+        query = query.filter(AppointmentDailyStat.day <= end_date)
+    return query.group_by(*columns, AppointmentDailyStat.status)
+
+
+def summarize(
+    db: Session, *, establishment_id: int, professional_id: Optional[int] = None,
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> dict:
+    """Agendamentos (sem cancelados), faturamento (concluídos) e contagem por status no período (sem datas: tudo)."""
+    by_status = {
+        status: (int(count or 0), float(revenue or 0))
+        for status, count, revenue in _stats_query(
+            db, establishment_ids=[establishment_id], professional_id=professional_id,
+            start_date=start_date, end_date=end_date
+        )
+    }
+    return _summary(by_status)
+
+
+def establishment_stats(
+    db: Session, *, establishment_id: int, start_date: date, end_date: date, professional_id: Optional[int] = None
+) -> dict:
+    """Resumo do período e de cada dia de [start_date, end_date] (dias sem agendamentos vêm zerados). Uma query."""
+    by_day: Dict[date, Dict[AppointmentStatus, Tuple[int, float]]] = {}
+    totals: Dict[AppointmentStatus, Tuple[int, float]] = {}
+    for day, status, count, revenue in _stats_query(
+        db, AppointmentDailyStat.day, establishment_ids=[establishment_id], professional_id=professional_id,
+        start_date=start_date, end_date=end_date
+    ):
+        count, revenue = int(count or 0), float(revenue or 0)
+        by_day.setdefault(day, {})[status] = (count, revenue)
+        _add(totals, status, count, revenue)
+    days = []
+    day = start_date
+    while day <= end_date:
+        days.append({"date": day, **_summary(by_day.get(day, {}))})
+        day += timedelta(days=1)
+    return {
+        "establishment_id": establishment_id,
+        "professional_id": professional_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "total": _summary(totals),
+        "days": days,
+    }
+
+
+def default_range(establishment: Establishment) -> Tuple[date, date]:
+    """Período padrão das estatísticas: o mês corrente no fuso do estabelecimento."""
+    return _month_bounds(_today(establishment))
+
+
+def _month_bounds(day: date) -> Tuple[date, date]:
+    first = day.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+
+def _today(establishment: Establishment) -> date:
+    tz = availability_service.establishment_timezone(establishment)
+    return datetime.now(tz).date() if tz else date.today()
+
+
+def professional_stats(db: Session, *, establishment: Establishment, professional_id: int) -> dict:
+    """
+    Totais do profissional (formato do docs/PROFESSIONALS_BACKEND_SPEC.md): agendamentos e
+    faturamento desde sempre e no mês corrente, mais os últimos atendimentos.
+    """
+    month_start, month_end = _month_bounds(_today(establishment))
+    total = summarize(db, establishment_id=establishment.id, professional_id=professional_id)
+    monthly = summarize(
+        db, establishment_id=establishment.id, professional_id=professional_id,
+        start_date=month_start, end_date=month_end
+    )
+    # Índice professional_id + start_time: lê só as últimas linhas
+    recent = db.query(
+        Appointment.id, Appointment.customer_name, Service.name, Appointment.start_time, Appointment.status
+    ).join(Service, Service.id == Appointment.service_id).filter(
+        Appointment.professional_id == professional_id,
+        Appointment.establishment_id == establishment.id,
+        Appointment.start_time <= datetime.now(timezone.utc),
+    ).order_by(desc(Appointment.start_time)).limit(RECENT_APPOINTMENTS).all()
+    return {
+        "total_appointments": total["appointments"],
+        "monthly_appointments": monthly["appointments"],
+        "total_revenue": total["revenue"],
+        "monthly_revenue": monthly["revenue"],
+        "rating": None, # Ainda não há avaliações
+        "recent_appointments": [
+            {"id": id, "client_name": customer_name, "service_name": service_name, "date": start_time, "status": status}
+            for id, customer_name, service_name, start_time, status in recent
+        ],
+    }
+
+
+# --- Painel do dono (todas as unidades) ---
+
+def _next_appointments(db: Session, *, establishment_ids: Sequence[int], now: datetime, limit: int) -> Dict[int, List[dict]]:
+    """
+    Os `limit` próximos agendamentos em aberto de cada estabelecimento, em uma query: row_number
+    por estabelecimento sobre a janela de NEXT_APPOINTMENTS_HORIZON_DAYS (índice establishment_id + start_time).
+    """
+    rank = func.row_number().over(
+        partition_by=Appointment.establishment_id, order_by=(Appointment.start_time, Appointment.id)
+    ).label("rank")
+    upcoming = db.query(
+        Appointment.id, Appointment.establishment_id, Appointment.start_time, Appointment.customer_name,
+        Appointment.status, Appointment.service_id, Appointment.professional_id, rank,
+    ).filter(
+        Appointment.establishment_id.in_(establishment_ids),
+        Appointment.status.in_(UPCOMING_STATUSES),
+        Appointment.start_time >= now,
+        Appointment.start_time < now + timedelta(days=NEXT_APPOINTMENTS_HORIZON_DAYS),
+    ).subquery()
+    rows = db.query(upcoming, Service.name).join(Service, Service.id == upcoming.c.service_id).filter(
+        upcoming.c.rank <= limit
+    ).order_by(upcoming.c.establishment_id, upcoming.c.start_time, upcoming.c.id)
+
+    by_establishment: Dict[int, List[dict]] = {}
+    for row in rows:
+        by_establishment.setdefault(row.establishment_id, []).append({
+            "id": row.id,
+            "start_time": row.start_time,
+            "customer_name": row.customer_name,
+            "status": row.status,
+            "service_id": row.service_id,
+            "service_name": row.name,
+            "professional_id": row.professional_id,
+        })
+    return by_establishment
+
+
+def owner_dashboard(db: Session, *, user_id: int, next_limit: int = RECENT_APPOINTMENTS, now: Optional[datetime] = None) -> dict:
+    """
+    Hoje e esta semana (segunda a domingo, no fuso de cada unidade) de todos os estabelecimentos
+    em que o usuário é dono, com os próximos agendamentos e a soma da rede. Três queries, não
+    importa quantas unidades: os estabelecimentos, o rollup da semana de todos e os próximos agendamentos.
+    """
+    now = now or datetime.now(timezone.utc)
+    establishments = db.query(Establishment.id, Establishment.name, Establishment.timezone).join(
+        user_establishment_link, user_establishment_link.c.establishment_id == Establishment.id
+    ).filter(
+        user_establishment_link.c.user_id == user_id, user_establishment_link.c.role == Role.OWNER
+    ).order_by(Establishment.id).all()
+
+    periods: Dict[int, Tuple[date, date, date]] = {}
+    for establishment_id, _, timezone_name in establishments:
+        today = event_service.local_date(now, timezone_name)
+        week_start = today - timedelta(days=today.weekday())
+        periods[establishment_id] = (today, week_start, week_start + timedelta(days=6))
+
+    today_by: Dict[int, Dict[AppointmentStatus, Tuple[int, float]]] = {id: {} for id in periods}
+    week_by: Dict[int, Dict[AppointmentStatus, Tuple[int, float]]] = {id: {} for id in periods}
+    next_appointments: Dict[int, List[dict]] = {}
+    if periods:
+        # Os fusos podem deixar as unidades em dias diferentes: lê a união das semanas e separa aqui
+        for establishment_id, day, status, count, revenue in _stats_query(
+            db, AppointmentDailyStat.establishment_id, AppointmentDailyStat.day, establishment_ids=list(periods),
+            start_date=min(week_start for _, week_start, _ in periods.values()),
+            end_date=max(week_end for _, _, week_end in periods.values()),
+        ):
+            today, week_start, week_end = periods[establishment_id]
+            count, revenue = int(count or 0), float(revenue or 0)
+            if week_start <= day <= week_end:
+                _add(week_by[establishment_id], status, count, revenue)
+            if day == today:
+                _add(today_by[establishment_id], status, count, revenue)
+        next_appointments = _next_appointments(db, establishment_ids=list(periods), now=now, limit=next_limit)
+
+    total_today: Dict[AppointmentStatus, Tuple[int, float]] = {}
+    total_week: Dict[AppointmentStatus, Tuple[int, float]] = {}
+    units = []
+    for establishment_id, name, timezone_name in establishments:
+        today, week_start, week_end = periods[establishment_id]
+        for totals, by_status in ((total_today, today_by[establishment_id]), (total_week, week_by[establishment_id])):
+            for status, (count, revenue) in by_status.items():
+                _add(totals, status, count, revenue)
+        units.append({
+            "establishment_id": establishment_id,
+            "name": name,
+            "timezone": timezone_name,
+            "today": {"start_date": today, "end_date": today, **_summary(today_by[establishment_id])},
+            "week": {"start_date": week_start, "end_date": week_end, **_summary(week_by[establishment_id])},
+            "next_appointments": next_appointments.get(establishment_id, []),
+        })
+    return {"establishments": units, "today": _summary(total_today), "week": _summary(total_week)}
+
+
+# --- Reconstrução e conferência ---
+
+class _ArchivedPartitions(NamedTuple):
+    detached: List[str] # Tabelas no schema appointments_archive (continuam legíveis)
+    frozen_until: Optional[datetime] # Fim do último mês exportado; antes dele o rollup não é recontado
+
+
+def _archived_partitions(db: Session) -> _ArchivedPartitions:
+    """Partições tiradas da tabela pelo maintain-partitions --archive (nada se a tabela não é particionada)."""
+    connection = db.connection()
+    if not partitioning.is_partitioned(connection):
+        return _ArchivedPartitions([], None)
+    exported = partitioning.exported_months(settings.APPOINTMENT_ARCHIVE_DIR)
+    frozen_until = (
+        datetime.combine(partitioning.add_months(exported[-1], 1), time.min, tzinfo=timezone.utc) if exported else None
+    )
+    return _ArchivedPartitions([partition["name"] for partition in partitioning.detached_partitions(connection)], frozen_until)
+
+
+def _open_since(establishment: Establishment, since: Optional[date], archived: _ArchivedPartitions) -> Optional[date]:
+    """
+    Primeiro dia local recontável: `since`, ou o primeiro dia que começa depois do último mês
+    exportado (o dia que atravessa a virada do mês tem agendamentos exportados).
+    """
+    if archived.frozen_until is None:
+        return since
+    tz = availability_service.establishment_timezone(establishment) or pytz.utc
+    first_day = archived.frozen_until.astimezone(tz).date()
+    if tz.localize(datetime.combine(first_day, time.min)) < archived.frozen_until:
+        first_day += timedelta(days=1)
+    return max(since, first_day) if since is not None else first_day
+
+
+def _expected_counts(
+    db: Session, *, establishment: Establishment, since: Optional[date], detached: Sequence[str] = ()
+) -> Counter:
+    """
+    Contagens recalculadas a partir dos agendamentos (tabela, partições desanexadas e arquivo
+    frio) com dia local >= since.
+    """
+    start = None
+    query = db.query(
+        Appointment.professional_id, Appointment.service_id, Appointment.start_time, Appointment.status
+    ).filter(Appointment.establishment_id == establishment.id)
+    if since is not None:
+        # Um dia de folga cobre qualquer fuso; o dia local exato é conferido abaixo
+        start = datetime.combine(since - timedelta(days=1), time.min, tzinfo=timezone.utc)
+        query = query.filter(Appointment.start_time >= start)
+    sources = [query.yield_per(10_000)]
+    table = Appointment.__table__
+    for name in detached:
+        # Nomes vêm do catálogo (appointments_pAAAA_MM); as colunas tipadas convertem o status
+        sql = f"SELECT professional_id, service_id, start_time, status FROM {partitioning.ARCHIVE_SCHEMA}.{name} WHERE establishment_id = :establishment_id"
+        if start is not None:
+            sql += " AND start_time >= :start"
+        sources.append(db.execute(
+            text(sql).columns(table.c.professional_id, table.c.service_id, table.c.start_time, table.c.status),
+            {"establishment_id": establishment.id, "start": start},
+        ))
+    sources.append(appointment_archive_service.iter_archived_appointments(establishment.id, start=start))
+
+    counts: Counter = Counter()
+    for rows in sources:
+        for row in rows:
+            day = event_service.local_date(row.start_time, establishment.timezone)
+            if since is None or day >= since:
+                counts[_key(establishment.id, row.professional_id, row.service_id, day, row.status)] += 1
+    return counts
+
+
+def _stored_counts(db: Session, *, establishment_id: int, since: Optional[date]) -> Counter:
+    query = db.query(
+        AppointmentDailyStat.professional_id, AppointmentDailyStat.service_id, AppointmentDailyStat.day,
+        AppointmentDailyStat.status, AppointmentDailyStat.count,
+    ).filter(AppointmentDailyStat.establishment_id == establishment_id, AppointmentDailyStat.count != 0)
+    if since is not None:
+        query = query.filter(AppointmentDailyStat.day >= since)
+    return Counter({
+        _key(establishment_id, professional_id, service_id, day, status): count
+        for professional_id, service_id, day, status, count in query
+    })
+
+
+def _establishments(db: Session, establishment_id: Optional[int]) -> List[int]:
+    query = db.query(Establishment.id)
+    if establishment_id is not None:
+        query = query.filter(Establishment.id == establishment_id)
+    return [id for id, in query.order_by(Establishment.id)]
+
+
+def rebuild(db: Session, *, establishment_id: Optional[int] = None, since: Optional[date] = None) -> Dict[str, int]:
+    """
+    Recalcula o rollup (de um estabelecimento ou de todos; com `since`, só os dias a partir dele).
+    Os dias de meses exportados pelo maintain-partitions ficam como estão.
+    Um estabelecimento por transação, com a mesma trava de estabelecimento da criação de agendamentos.
+    """
+    archived = _archived_partitions(db)
+    establishments = rows = 0
+    for current_id in _establishments(db, establishment_id):
+        establishment = db.query(Establishment).filter(Establishment.id == current_id).with_for_update().first()
+        open_since = _open_since(establishment, since, archived)
+        counts = _expected_counts(db, establishment=establishment, since=open_since, detached=archived.detached)
+        delete = db.query(AppointmentDailyStat).filter(AppointmentDailyStat.establishment_id == current_id)
+        if open_since is not None:
+            delete = delete.filter(AppointmentDailyStat.day >= open_since)
+        delete.delete(synchronize_session=False)
+        apply_deltas(db, counts)
+        db.commit()
+        establishments += 1
+        rows += len(counts)
+    return {"establishments": establishments, "rows": rows, "frozen_until": archived.frozen_until}
+
+
+def find_differences(db: Session, *, establishment_id: Optional[int] = None, since: Optional[date] = None) -> List[dict]:
+    """
+    Chaves em que o rollup difere da contagem dos agendamentos (só leitura). Escritas que
+    acontecem durante a conferência podem aparecer como diferença: confira de novo antes de reconstruir.
+    """
+    archived = _archived_partitions(db)
+    differences = []
+    for current_id in _establishments(db, establishment_id):
+        establishment = db.get(Establishment, current_id)
+        open_since = _open_since(establishment, since, archived)
+        expected = _expected_counts(db, establishment=establishment, since=open_since, detached=archived.detached)
+        stored = _stored_counts(db, establishment_id=current_id, since=open_since)
+        for key in sorted(set(expected) | set(stored)):
+            if expected[key] != stored[key]:
+                differences.append({**_row(key, stored[key]), "expected": expected[key]})
+    return differences
@@ -1,5 +1,17 @@
 # app/services/status_validation_service.py
+# Máquina de estados do status de agendamento, descrita por tabelas e compilada no import.
+#
+# As regras são declarativas: RULES diz, para cada fase (antes ou depois do horário do
+# agendamento), quais transições origem -> destino são bloqueadas (e com qual mensagem) ou
+# liberadas; a primeira regra que casa vale. TARGET_GUARDS são janelas de tempo exigidas pelo
+# status de destino. No import, tudo vira uma matriz indexada pelos status
+# (fase x origem x destino -> mensagem de erro ou None), e validar uma transição é um acesso à
+# matriz mais os guardas do destino. A mesma matriz responde quais status são permitidos a
+# seguir (allowed_next_statuses), usada pelo painel e pelas operações em lote.
 from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
 from app.models.appointment_model import Appointment, AppointmentStatus
 
 # Matriz de transições que são IMPOSSÍVEIS e devem ser bloqueadas,
@@ -49,64 +61,148 @@ BLOCKED_TRANSITIONS = {
     ]
 }
 
+# Regra temporal: depois do horário, agendamentos ainda em aberto só podem ser concluídos ou
+# marcados como não-comparecimento (também usada pelo fechamento automático do scheduler)
+PAST_DUE_STATUSES = (AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED, AppointmentStatus.PENDING)
+PAST_DUE_TARGETS = (AppointmentStatus.COMPLETED, AppointmentStatus.NO_SHOW)
+
+IN_PROGRESS_EARLY_START = timedelta(minutes=30) # Atendimento pode começar até 30 minutos antes
+
 class StatusTransitionError(ValueError):
     """Exceção customizada para transições de status inválidas."""
     pass
 
+# --- Regras declarativas ---
+
+class Phase(IntEnum):
+    BEFORE = 0 # Agora <= horário de início
+    AFTER = 1 # O horário de início já passou
+
+ALL_STATUSES: FrozenSet[AppointmentStatus] = frozenset(AppointmentStatus)
+BOTH_PHASES = (Phase.BEFORE, Phase.AFTER)
+CANCELLED = frozenset({AppointmentStatus.CANCELLED_BY_CLIENT, AppointmentStatus.CANCELLED_BY_ESTABLISHMENT})
+GENERIC_MESSAGE = "A transição do status '{current}' para '{new}' não é permitida."
+
+class TransitionRule(NamedTuple):
+    sources: FrozenSet[AppointmentStatus]
+    targets: FrozenSet[AppointmentStatus]
+    phases: Tuple[Phase, ...]
+    message: Optional[str] # None = transição liberada; pode usar {current} e {new}
+
+def _blocked_rules(message: Optional[str] = None, phases: Tuple[Phase, ...] = BOTH_PHASES) -> List[TransitionRule]:
+    return [
+        TransitionRule(frozenset({source}), frozenset(targets), phases, message or GENERIC_MESSAGE)
+        for source, targets in BLOCKED_TRANSITIONS.items()
+    ]
+
+# Ordem importa: a primeira regra que casa com (fase, origem, destino) decide
+RULES: List[TransitionRule] = [
+    # Depois do horário, os em aberto só viram concluído ou não-comparecimento (ignora BLOCKED_TRANSITIONS)
+    TransitionRule(
+        frozenset(PAST_DUE_STATUSES), ALL_STATUSES - frozenset(PAST_DUE_TARGETS), (Phase.AFTER,),
+        "Agendamentos que já passaram do horário só podem ser marcados como 'Concluído' ou 'Não Compareceu'.",
+    ),
+    TransitionRule(frozenset(PAST_DUE_STATUSES), frozenset(PAST_DUE_TARGETS), (Phase.AFTER,), None),
+    # Antes do horário, mensagens específicas para os casos comuns
+    TransitionRule(
+        frozenset({AppointmentStatus.COMPLETED}), frozenset(BLOCKED_TRANSITIONS[AppointmentStatus.COMPLETED]), (Phase.BEFORE,),
+        "Um agendamento concluído não pode ser alterado.",
+    ),
+    TransitionRule(
+        CANCELLED, frozenset({AppointmentStatus.COMPLETED}), (Phase.BEFORE,),
+        "Um agendamento cancelado não pode ser marcado como concluído.",
+    ),
+    TransitionRule(
+        CANCELLED, frozenset({AppointmentStatus.NO_SHOW}), (Phase.BEFORE,),
+        "Um agendamento cancelado não pode ser marcado como não-comparecimento.",
+    ),
+    TransitionRule(
+        frozenset({AppointmentStatus.NO_SHOW}), frozenset({AppointmentStatus.CONFIRMED, AppointmentStatus.PENDING}), (Phase.BEFORE,),
+        "Um agendamento com não-comparecimento não pode voltar a ser confirmado.",
+    ),
+    # Demais transições impossíveis, em qualquer fase
+    *_blocked_rules(),
+]
+
+class Guard(NamedTuple):
+    """Condição de tempo exigida pelo status de destino: predicate(agora, início)."""
+    predicate: Callable[[datetime, datetime], bool]
+    message: str
+
+TARGET_GUARDS: Dict[AppointmentStatus, Tuple[Guard, ...]] = {
+    AppointmentStatus.COMPLETED: (
+        Guard(lambda now, start: now >= start, "Só é possível marcar como concluído após o horário de início."),
+    ),
+    AppointmentStatus.IN_PROGRESS: (
+        Guard(lambda now, start: now >= start - IN_PROGRESS_EARLY_START, "Só é possível iniciar um atendimento 30 minutos antes do horário agendado."),
+        Guard(lambda now, start: now <= start, "Muito tarde para iniciar o atendimento. Use a opção de completar diretamente."),
+    ),
+    AppointmentStatus.NO_SHOW: (
+        Guard(lambda now, start: now >= start, "Só é possível marcar não-comparecimento após o horário agendado."),
+    ),
+}
+
+# --- Compilação (no import) ---
+
+_STATUSES: Tuple[AppointmentStatus, ...] = tuple(AppointmentStatus)
+_INDEX: Dict[AppointmentStatus, int] = {status: index for index, status in enumerate(_STATUSES)}
+
+def _compile_matrix() -> Tuple[Tuple[Tuple[Optional[str], ...], ...], ...]:
+    """_MATRIX[fase][origem][destino] = mensagem de erro, ou None se a transição é permitida."""
+    matrix = []
+    for phase in Phase:
+        rows = []
+        for source in _STATUSES:
+            row = []
+            for target in _STATUSES:
+                if source == target:
+                    row.append("O agendamento já está com este status.")
+                    continue
+                rule = next(
+                    (rule for rule in RULES if phase in rule.phases and source in rule.sources and target in rule.targets), None
+                )
+                message = rule.message if rule else None
+                row.append(message.format(current=source.value, new=target.value) if message else None)
+            rows.append(tuple(row))
+        matrix.append(tuple(rows))
+    return tuple(matrix)
+
+_MATRIX = _compile_matrix()
+_GUARDS: Tuple[Tuple[Guard, ...], ...] = tuple(TARGET_GUARDS.get(status, ()) for status in _STATUSES)
+
+# --- Consultas ---
+
+def transition_error(
+    current_status: AppointmentStatus, new_status: AppointmentStatus, *, start_time: datetime, now: datetime
+) -> Optional[str]:
+    """Mensagem de erro da transição, ou None se ela é permitida no instante `now`."""
+    phase = Phase.AFTER if now > start_time else Phase.BEFORE
+    target = _INDEX[new_status]
+    message = _MATRIX[phase][_INDEX[current_status]][target]
+    if message is not None:
+        return message
+    for guard in _GUARDS[target]:
+        if not guard.predicate(now, start_time):
+            return guard.message
+    return None
+
+def allowed_next_statuses(appointment: Appointment, *, now: Optional[datetime] = None) -> List[AppointmentStatus]:
+    """Status para os quais o agendamento pode ir agora (na ordem do enum)."""
+    now = now or datetime.now(timezone.utc)
+    return [
+        status for status in _STATUSES
+        if transition_error(appointment.status, status, start_time=appointment.start_time, now=now) is None
+    ]
+
 def validate_status_transition(appointment: Appointment, new_status: AppointmentStatus):
     """
     Valida se uma mudança de status é permitida, incluindo regras de integridade e temporais.
     Espelha as validações do frontend para consistência.
     Levanta um StatusTransitionError se a transição for inválida.
     """
-    current_status = appointment.status
-    appointment_time = appointment.start_time
-    now_utc = datetime.now(timezone.utc)
-    is_appointment_passed = now_utc > appointment_time
-
-    # Regra 1: Não pode transicionar para o mesmo status
-    if current_status == new_status:
-        raise StatusTransitionError("O agendamento já está com este status.")
-
-    # REGRA TEMPORAL CRÍTICA (PRIORIDADE MÁXIMA) - igual ao frontend
-    if is_appointment_passed:
-        # Para agendamentos passados com status críticos, só permitir COMPLETED ou NO_SHOW
-        if current_status in [AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED, AppointmentStatus.PENDING]:
-            if new_status not in [AppointmentStatus.COMPLETED, AppointmentStatus.NO_SHOW]:
-                raise StatusTransitionError("Agendamentos que já passaram do horário só podem ser marcados como 'Concluído' ou 'Não Compareceu'.")
-        # Para outros status passados, aplicar matriz normal
-        elif new_status in BLOCKED_TRANSITIONS.get(current_status, []):
-            raise StatusTransitionError(f"A transição do status '{current_status.value}' para '{new_status.value}' não é permitida.")
-    else:
-        # Se não passou do horário, aplicar matriz de bloqueio normalmente
-        if new_status in BLOCKED_TRANSITIONS.get(current_status, []):
-            # Mensagens específicas para casos comuns
-            if current_status == AppointmentStatus.COMPLETED:
-                raise StatusTransitionError("Um agendamento concluído não pode ser alterado.")
-            elif current_status in [AppointmentStatus.CANCELLED_BY_CLIENT, AppointmentStatus.CANCELLED_BY_ESTABLISHMENT] and new_status == AppointmentStatus.COMPLETED:
-                raise StatusTransitionError("Um agendamento cancelado não pode ser marcado como concluído.")
-            elif current_status in [AppointmentStatus.CANCELLED_BY_CLIENT, AppointmentStatus.CANCELLED_BY_ESTABLISHMENT] and new_status == AppointmentStatus.NO_SHOW:
-                raise StatusTransitionError("Um agendamento cancelado não pode ser marcado como não-comparecimento.")
-            elif current_status == AppointmentStatus.NO_SHOW and new_status in [AppointmentStatus.CONFIRMED, AppointmentStatus.PENDING]:
-                raise StatusTransitionError("Um agendamento com não-comparecimento não pode voltar a ser confirmado.")
-            else:
-                raise StatusTransitionError(f"A transição do status '{current_status.value}' para '{new_status.value}' não é permitida.")
-
-    # Regra 3: Validações temporais específicas
-    if new_status == AppointmentStatus.COMPLETED and now_utc < appointment_time:
-        raise StatusTransitionError("Só é possível marcar como concluído após o horário de início.")
-
-    if new_status == AppointmentStatus.IN_PROGRESS:
-        thirty_minutes_before = appointment_time - timedelta(minutes=30)
-        if now_utc < thirty_minutes_before:
-            raise StatusTransitionError("Só é possível iniciar um atendimento 30 minutos antes do horário agendado.")
-        if now_utc > appointment_time:
-            raise StatusTransitionError("Muito tarde para iniciar o atendimento. Use a opção de completar diretamente.")
-
-    if new_status == AppointmentStatus.NO_SHOW:
-        # Para agendamentos críticos passados, não aplicar restrição temporal
-        is_critical_past = is_appointment_passed and current_status in [AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED, AppointmentStatus.PENDING]
-        if not is_critical_past and now_utc < appointment_time:
-            raise StatusTransitionError("Só é possível marcar não-comparecimento após o horário agendado.")
-
-    return True
\ No newline at end of file
+    message = transition_error(
+        appointment.status, new_status, start_time=appointment.start_time, now=datetime.now(timezone.utc)
+    )
+    if message is not None:
+        raise StatusTransitionError(message)
+    return True
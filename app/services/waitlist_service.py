@@ -0,0 +1,349 @@
+# app/services/waitlist_service.py
+# Lista de espera: clientes aguardando um horário de um serviço num período.
+#
+# Cada entrada é expandida em uma janela por dia local (waitlist_windows), em UTC, enquanto está
+# WAITING, e cada (início, fim) distinto do dia com alguém na fila fica em waitlist_shapes. Quando
+# um agendamento que ocupava horário é cancelado, o horário liberado lê as formas do dia que o
+# contêm e, para cada uma, o primeiro da fila no índice das janelas: O(formas do dia x log n),
+# sem varrer as entradas nem as janelas que não servem. Os horários da espera ficam na grade
+# de WAITLIST_TIME_STEP_MINUTES, o que limita as formas de um dia, e uma forma sai junto com a
+# sua última janela. O cliente encontrado recebe uma reserva, que é um agendamento PENDING
+# criado pelo caminho normal (create_appointment, com a trava do estabelecimento) e vale até
+# offer_expires_at. O scheduler fecha as reservas (resolve_offers):
+# confirmada vira BOOKED, cancelada vira DECLINED e vencida é cancelada, o que libera o horário
+# para o próximo da fila.
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Sequence
+
+import logging
+
+import pytz
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.establishment_model import Establishment
+from app.models.service_model import Service
+from app.models.waitlist_model import WaitlistEntry, WaitlistShape, WaitlistStatus, WaitlistWindow
+from app.schemas.appointment_schema import AppointmentCreate
+from app.schemas.waitlist_schema import WaitlistEntryCreate
+from app.services import appointment_service, availability_service, event_service, professional_service, status_validation_service
+
+logger = logging.getLogger("orkestre.waitlist")
+
+# Entradas tentadas por horário liberado quando a reserva não pode ser criada para uma delas
+MAX_OFFER_ATTEMPTS = 3
+
+# professional_id das janelas e formas de quem aceita qualquer profissional (coluna NOT NULL,
+# para entrar no índice como um valor comum)
+ANY_PROFESSIONAL = 0
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=pytz.utc) if value.tzinfo is None else value.astimezone(pytz.utc)
+
+
+def _local(tz, day: date, at: time) -> datetime:
+    return tz.normalize(tz.localize(datetime.combine(day, at))).astimezone(pytz.utc)
+
+
+def _windows(entry: WaitlistEntry, tz, first_day: date) -> List[dict]:
+    """Uma janela [início, fim] em UTC por dia local de first_day até o fim da espera."""
+    rows = []
+    day = first_day
+    while day <= entry.end_date:
+        window_end = (
+            _local(tz, day, entry.latest_time) if entry.latest_time
+            else _local(tz, day + timedelta(days=1), time(0))
+        )
+        rows.append({
+            "entry_id": entry.id,
+            "establishment_id": entry.establishment_id,
+            "service_id": entry.service_id,
+            "professional_id": entry.professional_id or ANY_PROFESSIONAL,
+            "day": day,
+            "window_start": _local(tz, day, entry.earliest_time or time(0)),
+            "window_end": window_end,
+        })
+        day += timedelta(days=1)
+    return rows
+
+
+def _insert(db: Session):
+    return (postgresql if db.get_bind().dialect.name == "postgresql" else sqlite).insert
+
+
+def _shape_key(model):
+    return (model.establishment_id, model.service_id, model.day, model.professional_id, model.window_start, model.window_end)
+
+
+def _add_windows(db: Session, entry: WaitlistEntry, tz, first_day: date) -> None:
+    """Grava as janelas da entrada e registra as formas novas. Não faz commit."""
+    rows = _windows(entry, tz, first_day)
+    if not rows:
+        return
+    db.execute(insert(WaitlistWindow.__table__), rows)
+    # Em ordem: transações concorrentes travam as mesmas chaves na mesma ordem
+    keys = ("establishment_id", "service_id", "day", "professional_id", "window_start", "window_end")
+    shapes = sorted({tuple(row[key] for key in keys) for row in rows})
+    statement = _insert(db)(WaitlistShape).values([dict(zip(keys, shape)) for shape in shapes])
+    # Uma forma que já existe é "atualizada" sem mudar nada só para travar a linha até o commit:
+    # _delete_windows não a apaga enquanto esta janela nova ainda não está visível
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(_shape_key(WaitlistShape)), set_={"day": statement.excluded.day}
+    ))
+
+
+def _delete_windows(db: Session, entry_ids: List[int]) -> None:
+    """
+    Apaga as janelas das entradas e as formas que ficaram sem nenhuma janela: as formas do dia
+    são sempre as que ainda têm alguém na fila. Não faz commit.
+    """
+    keys = db.query(*_shape_key(WaitlistWindow)).filter(WaitlistWindow.entry_id.in_(entry_ids)).distinct().all()
+    db.query(WaitlistWindow).filter(WaitlistWindow.entry_id.in_(entry_ids)).delete(synchronize_session=False)
+    if not keys:
+        return
+    shape = tuple_(*_shape_key(WaitlistShape))
+    # Trava as formas (na mesma ordem do _add_windows) antes de conferir as janelas: uma janela
+    # nova de outra transação já está visível quando a trava é obtida
+    db.query(WaitlistShape.id).filter(shape.in_(keys)).order_by(*_shape_key(WaitlistShape)).with_for_update().all()
+    remaining = select(WaitlistWindow.id).where(*[
+        window_column == shape_column
+        for window_column, shape_column in zip(_shape_key(WaitlistWindow), _shape_key(WaitlistShape))
+    ])
+    db.query(WaitlistShape).filter(shape.in_(keys), ~remaining.exists()).delete(synchronize_session=False)
+
+
+def create_entry(db: Session, *, entry_in: WaitlistEntryCreate, establishment_id: int) -> WaitlistEntry:
+    """Coloca o cliente na fila do serviço (no fim dela) para o período e a faixa do dia pedidos."""
+    service = db.query(Service).filter(Service.id == entry_in.service_id).first()
+    if not service or service.establishment_id != establishment_id or not service.is_active:
+        raise ValueError("Serviço inválido ou não pertence a este estabelecimento.")
+    if entry_in.professional_id is not None:
+        professional = professional_service.get_professional(
+            db, establishment_id=establishment_id, professional_id=entry_in.professional_id
+        )
+        if not professional or not professional.is_active:
+            raise ValueError("Profissional inválido ou não pertence a este estabelecimento.")
+    establishment = db.query(Establishment).filter(Establishment.id == establishment_id).first()
+    tz = availability_service.establishment_timezone(establishment)
+    if tz is None:
+        raise ValueError("Fuso horário do estabelecimento inválido.")
+
+    today = datetime.now(tz).date()
+    if entry_in.end_date < today:
+        raise ValueError("O período da espera já passou.")
+    first_day = max(entry_in.start_date, today)
+    if (entry_in.end_date - first_day).days >= settings.WAITLIST_MAX_DAYS:
+        raise ValueError(f"O período da espera pode ter no máximo {settings.WAITLIST_MAX_DAYS} dias.")
+
+    db_entry = WaitlistEntry(**entry_in.model_dump(), establishment_id=establishment_id, status=WaitlistStatus.WAITING)
+    db.add(db_entry)
+    db.flush()
+    _add_windows(db, db_entry, tz, first_day)
+    db.commit()
+    db.refresh(db_entry)
+    return db_entry
+
+
+def get_entry(db: Session, *, establishment_id: int, entry_id: int) -> Optional[WaitlistEntry]:
+    return db.query(WaitlistEntry).filter(
+        WaitlistEntry.id == entry_id, WaitlistEntry.establishment_id == establishment_id
+    ).first()
+
+
+def list_entries(
+    db: Session, *, establishment_id: int, status: Optional[WaitlistStatus] = None,
+    service_id: Optional[int] = None, skip: int = 0, limit: int = 100
+) -> List[WaitlistEntry]:
+    """Entradas do estabelecimento na ordem da fila."""
+    query = db.query(WaitlistEntry).filter(WaitlistEntry.establishment_id == establishment_id)
+    if status is not None:
+        query = query.filter(WaitlistEntry.status == status)
+    if service_id is not None:
+        query = query.filter(WaitlistEntry.service_id == service_id)
+    return query.order_by(WaitlistEntry.id).offset(skip).limit(limit).all()
+
+
+def cancel_entry(db: Session, *, entry_db_obj: WaitlistEntry) -> WaitlistEntry:
+    """Retira da fila uma entrada que ainda aguarda (uma reserva oferecida é cancelada pelo agendamento)."""
+    if entry_db_obj.status != WaitlistStatus.WAITING:
+        raise ValueError("Só é possível retirar da fila uma entrada que ainda aguarda um horário.")
+    entry_db_obj.status = WaitlistStatus.CANCELLED
+    _delete_windows(db, [entry_db_obj.id])
+    db.commit()
+    db.refresh(entry_db_obj)
+    return entry_db_obj
+
+
+# --- Horário liberado -> reserva ---
+
+def frees_slot(previous_status: AppointmentStatus, new_status: AppointmentStatus) -> bool:
+    """Cancelamento de um agendamento que ocupava horário."""
+    return new_status in status_validation_service.CANCELLED and event_service.changes_availability(previous_status, new_status)
+
+
+def freed_slot(appointment: Appointment, *, timezone_name: Optional[str]) -> dict:
+    """Dados do horário liberado, lidos antes do commit (que expira os objetos carregados)."""
+    return {
+        "establishment_id": appointment.establishment_id,
+        "service_id": appointment.service_id,
+        "professional_id": appointment.professional_id,
+        "start_time": appointment.start_time,
+        "end_time": appointment.end_time,
+        "timezone_name": timezone_name,
+    }
+
+
+def find_match(
+    db: Session, *, establishment_id: int, service_id: int, professional_id: Optional[int],
+    day: date, start_time: datetime, end_time: datetime, skip: Sequence[int] = ()
+) -> Optional[int]:
+    """
+    Primeira entrada da fila (menor id) cuja janela no dia contém [start_time, end_time]. Lê as
+    formas do dia que contêm o horário (uq_waitlist_shapes_key) e, para cada uma, o menor entry_id
+    com essa janela (ix_waitlist_windows_shape): O(formas do dia x log n). Sem profissional no
+    horário, só as entradas sem preferência servem. `skip`: entradas já tentadas para este horário.
+    """
+    professionals = [ANY_PROFESSIONAL] if professional_id is None else [ANY_PROFESSIONAL, professional_id]
+    head = select(WaitlistWindow.entry_id).where(
+        WaitlistWindow.establishment_id == WaitlistShape.establishment_id,
+        WaitlistWindow.service_id == WaitlistShape.service_id,
+        WaitlistWindow.day == WaitlistShape.day,
+        WaitlistWindow.professional_id == WaitlistShape.professional_id,
+        WaitlistWindow.window_start == WaitlistShape.window_start,
+        WaitlistWindow.window_end == WaitlistShape.window_end,
+        WaitlistWindow.entry_id.notin_(skip),
+    ).order_by(WaitlistWindow.entry_id).limit(1).correlate(WaitlistShape).scalar_subquery()
+    # Forma só com entradas já tentadas dá NULL, ignorado pelo min
+    return db.query(func.min(head)).filter(
+        WaitlistShape.establishment_id == establishment_id,
+        WaitlistShape.service_id == service_id,
+        WaitlistShape.day == day,
+        WaitlistShape.professional_id.in_(professionals),
+        WaitlistShape.window_start <= _as_utc(start_time),
+        WaitlistShape.window_end >= _as_utc(end_time),
+    ).scalar()
+
+
+def offer_freed_slot(
+    db: Session, *, establishment_id: int, service_id: int, professional_id: Optional[int],
+    start_time: datetime, end_time: datetime, timezone_name: Optional[str], now: Optional[datetime] = None
+) -> Optional[WaitlistEntry]:
+    """
+    Oferece o horário liberado ao primeiro da fila: cria a reserva (agendamento PENDING) e marca a
+    entrada como OFFERED. Chamada depois do commit do cancelamento. Se a reserva não pode ser
+    criada para a entrada, ela continua na fila e o horário vai para a seguinte (até
+    MAX_OFFER_ATTEMPTS entradas). Retorna a entrada atendida.
+    """
+    now = now or datetime.now(pytz.utc)
+    start_time, end_time = _as_utc(start_time), _as_utc(end_time)
+    if start_time <= now:
+        return None
+    match = dict(
+        establishment_id=establishment_id, service_id=service_id, professional_id=professional_id,
+        day=event_service.local_date(start_time, timezone_name), start_time=start_time, end_time=end_time,
+    )
+    skip: List[int] = []
+    while len(skip) < MAX_OFFER_ATTEMPTS:
+        # Sem ninguém na fila (o caso comum), o custo é só a busca pelas formas do dia
+        if find_match(db, **match, skip=skip) is None:
+            return None
+
+        # Mesma trava do create_appointment, tomada antes de reler a fila: duas vagas liberadas ao
+        # mesmo tempo não oferecem a mesma entrada
+        db.query(Establishment).filter(Establishment.id == establishment_id).with_for_update().first()
+        entry_id = find_match(db, **match, skip=skip)
+        entry = db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first() if entry_id else None
+        if entry is None:
+            db.rollback()
+            return None
+
+        entry.status = WaitlistStatus.OFFERED
+        entry.offer_expires_at = min(now + timedelta(minutes=settings.WAITLIST_HOLD_MINUTES), start_time)
+        _delete_windows(db, [entry.id])
+        try:
+            appointment_in = AppointmentCreate(
+                start_time=start_time,
+                customer_name=entry.customer_name,
+                customer_phone=entry.customer_phone,
+                customer_email=entry.customer_email,
+                notes_by_customer=entry.notes_by_customer,
+                service_id=service_id,
+                professional_id=professional_id,
+            )
+            # Faz o commit junto com a mudança da entrada
+            appointment = appointment_service.create_appointment(
+                db, appointment_in=appointment_in, establishment_id=establishment_id
+            )
+        except ValueError as error:
+            # Desfaz a mudança da entrada (continua na fila) e tenta a próxima
+            db.rollback()
+            logger.warning(
+                "Reserva da lista de espera não criada para a entrada %s (estabelecimento %s, %s): %s",
+                entry_id, establishment_id, start_time.isoformat(), error,
+            )
+            skip.append(entry_id)
+            continue
+        entry.appointment_id = appointment.id
+        db.commit()
+        db.refresh(entry)
+        event_service.waitlist_offered(entry)
+        return entry
+    return None
+
+
+def resolve_offers(db: Session, *, now: Optional[datetime] = None) -> dict:
+    """
+    Fecha as reservas oferecidas e as esperas cujo período já passou (scheduler). Reserva vencida
+    ainda PENDING é cancelada pelo caminho normal, que oferece o horário ao próximo da fila.
+    """
+    now = now or datetime.now(pytz.utc)
+    totals = {status.value: 0 for status in (WaitlistStatus.BOOKED, WaitlistStatus.DECLINED, WaitlistStatus.EXPIRED)}
+    offered = db.query(WaitlistEntry).filter(WaitlistEntry.status == WaitlistStatus.OFFERED).order_by(WaitlistEntry.id).all()
+    appointment_ids = [entry.appointment_id for entry in offered if entry.appointment_id]
+    appointments = {
+        appointment.id: appointment for appointment in
+        db.query(Appointment).filter(Appointment.id.in_(appointment_ids))
+    } if appointment_ids else {}
+
+    expired_holds = []
+    for entry in offered:
+        appointment = appointments.get(entry.appointment_id)
+        if appointment is not None and appointment.status in status_validation_service.CANCELLED:
+            entry.status = WaitlistStatus.DECLINED
+        elif appointment is not None and appointment.status != AppointmentStatus.PENDING:
+            entry.status = WaitlistStatus.BOOKED
+        elif _as_utc(entry.offer_expires_at) <= now:
+            entry.status = WaitlistStatus.EXPIRED
+            if appointment is not None:
+                expired_holds.append(appointment.id)
+        else:
+            continue
+        totals[entry.status.value] += 1
+    db.commit()
+
+    for appointment_id in expired_holds:
+        appointment = appointment_service.get_appointment(db, appointment_id=appointment_id)
+        if appointment is not None and appointment.status == AppointmentStatus.PENDING:
+            try:
+                appointment_service.update_appointment_status(
+                    db, appointment_db_obj=appointment, status_in=AppointmentStatus.CANCELLED_BY_ESTABLISHMENT
+                )
+            except status_validation_service.StatusTransitionError:
+                continue # Confirmada (ou cancelada) enquanto isso: o status do banco prevalece
+
+    # Esperas que já passaram (um dia de folga cobre qualquer fuso)
+    past = select(WaitlistEntry.id).where(
+        WaitlistEntry.status == WaitlistStatus.WAITING, WaitlistEntry.end_date < now.date() - timedelta(days=1)
+    )
+    # Janelas e formas de dias que já passaram (não recebem mais vagas)
+    db.query(WaitlistWindow).filter(WaitlistWindow.entry_id.in_(past)).delete(synchronize_session=False)
+    db.query(WaitlistShape).filter(WaitlistShape.day < now.date() - timedelta(days=1)).delete(synchronize_session=False)
+    totals[WaitlistStatus.EXPIRED.value] += db.query(WaitlistEntry).filter(
+        WaitlistEntry.id.in_(past)
+    ).update({WaitlistEntry.status: WaitlistStatus.EXPIRED}, synchronize_session=False)
+    db.commit()
+    return totals
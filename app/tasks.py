@@ -3,7 +3,6 @@ import os
 import re
 import pytz
 import time # Precisaremos do 'time' para uma pequena pausa
-from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
@@ -12,14 +11,32 @@ from app.db.session import SessionLocal
 from app.models.appointment_model import Appointment
 from app.core.config import settings
 
-# --- Bloco de Inicialização do Cliente Twilio ---
-if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
-    twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-else:
-    twilio_client = None
+# --- Cliente Twilio (criado sob demanda) ---
+# O cliente NÃO é construído no import: o módulo twilio.rest é pesado e quem só importa
+# app.tasks (scheduler, testes) não deve pagar esse custo. A primeira chamada cria e
+# guarda a instância; as seguintes reutilizam.
+_twilio_client = None
+
+def get_twilio_client():
+    """Retorna o cliente Twilio, criando-o na primeira chamada. None se não houver credenciais."""
+    global _twilio_client
+    if _twilio_client is None and settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
+        from twilio.rest import Client
+        _twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+    return _twilio_client
+
+def reset_twilio_client():
+    """
+    Esquece o cliente atual (chamada após o fork e no shutdown). O cliente mantém uma
+    sessão HTTP com sockets abertos que não pode ser compartilhada entre processos;
+    o próximo get_twilio_client() cria um novo no processo corrente.
+    """
+    global _twilio_client
+    _twilio_client = None
 
 # --- Função Principal da Tarefa ---
 def send_whatsapp_reminder(appointment_id: int):
+    twilio_client = get_twilio_client()
     if not twilio_client:
         print("ERRO: Credenciais do Twilio não configuradas.")
         return "Falha: credenciais Twilio ausentes."
@@ -0,0 +1,69 @@
+# benchmarks/bench_available_slots.py
+# get_available_slots em uma grade de intervalo x duração x densidade de agendamentos,
+# nos dias de troca de horário de verão e com agendamentos recorrentes de idades diferentes.
+from datetime import timedelta
+
+import pytest
+
+from app.services import appointment_service
+
+from conftest import DST_FALL_BACK, DST_SPRING_FORWARD, REGULAR_DAY
+
+INTERVALS = [10, 15, 30]
+DURATIONS = [30, 60, 90]
+DENSITIES = [0.0, 0.5, 0.9]
+
+
+@pytest.mark.benchmark(group="available_slots:grid")
+@pytest.mark.parametrize("density", DENSITIES)
+@pytest.mark.parametrize("duration_minutes", DURATIONS)
+@pytest.mark.parametrize("interval_minutes", INTERVALS)
+def bench_available_slots_grid(benchmark, db, factory, interval_minutes, duration_minutes, density):
+    establishment = factory.establishment(interval_minutes=interval_minutes)
+    service = factory.service(establishment, duration_minutes=duration_minutes)
+    booked = factory.book_day(establishment, service, REGULAR_DAY, density=density)
+    benchmark.extra_info["booked_appointments"] = booked
+
+    slots = benchmark(
+        appointment_service.get_available_slots,
+        db,
+        establishment_id=establishment.id,
+        service_id=service.id,
+        appointment_date=REGULAR_DAY,
+    )
+    if density == 0.0:
+        assert slots
+
+
+@pytest.mark.benchmark(group="available_slots:dst")
+@pytest.mark.parametrize("day", [REGULAR_DAY, DST_SPRING_FORWARD, DST_FALL_BACK], ids=["regular", "spring-forward", "fall-back"])
+def bench_available_slots_dst(benchmark, db, factory, day):
+    establishment = factory.establishment(interval_minutes=15, timezone="America/New_York")
+    service = factory.service(establishment, duration_minutes=45)
+    factory.book_day(establishment, service, day, density=0.5)
+
+    benchmark(
+        appointment_service.get_available_slots,
+        db,
+        establishment_id=establishment.id,
+        service_id=service.id,
+        appointment_date=day,
+    )
+
+
+@pytest.mark.benchmark(group="available_slots:recurring")
+@pytest.mark.parametrize("series_age_weeks", [1, 52, 520], ids=["1-week", "1-year", "10-years"])
+def bench_available_slots_recurring(benchmark, db, factory, series_age_weeks):
+    # O custo da expansão depende da janela consultada, não de quantas ocorrências a série já teve
+    establishment = factory.establishment(interval_minutes=15)
+    service = factory.service(establishment, duration_minutes=30)
+    factory.recurring(establishment, service, REGULAR_DAY - timedelta(weeks=series_age_weeks), series=8)
+
+    slots = benchmark(
+        appointment_service.get_available_slots,
+        db,
+        establishment_id=establishment.id,
+        service_id=service.id,
+        appointment_date=REGULAR_DAY,
+    )
+    assert slots and min(slots).hour >= 12 # As 8 séries ocupam a manhã inteira (08:00-12:00)
@@ -0,0 +1,14 @@
+# benchmarks/bench_establishment_response.py
+# get_establishment_for_api_response (estabelecimento + membros com papéis) por número de membros.
+import pytest
+
+from app.services import establishment_service
+
+
+@pytest.mark.benchmark(group="establishment_response")
+@pytest.mark.parametrize("members", [1, 10, 50])
+def bench_establishment_for_api_response(benchmark, db, factory, members):
+    establishment = factory.establishment(members=members)
+
+    response = benchmark(establishment_service.get_establishment_for_api_response, db, establishment_id=establishment.id)
+    assert len(response.users) == members
@@ -0,0 +1,55 @@
+# benchmarks/bench_schemas.py
+# Parsing do WorkingHoursConfig e serialização dos schemas de horários e de agendamentos.
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.schemas.appointment_schema import Appointment as AppointmentSchema
+from app.schemas.working_hours_schema import WorkingHoursConfig
+
+from conftest import working_hours_config
+
+
+@pytest.mark.benchmark(group="working_hours")
+def bench_working_hours_parse(benchmark):
+    raw_config = working_hours_config(interval_minutes=15)
+    benchmark(WorkingHoursConfig.model_validate, raw_config)
+
+
+@pytest.mark.benchmark(group="working_hours")
+def bench_working_hours_serialize(benchmark):
+    config = WorkingHoursConfig.model_validate(working_hours_config(interval_minutes=15))
+    benchmark(config.model_dump_json)
+
+
+def _appointments(count: int):
+    start = datetime(2030, 1, 7, 11, 0, tzinfo=timezone.utc)
+    return [
+        Appointment(
+            id=index,
+            start_time=start + timedelta(minutes=30 * index),
+            end_time=start + timedelta(minutes=30 * index + 30),
+            customer_name=f"Cliente {index}",
+            customer_phone="11999990000",
+            customer_email=f"cliente{index}@example.com",
+            notes_by_customer="Pet com medo de barulho",
+            status=AppointmentStatus.CONFIRMED,
+            establishment_id=1,
+            service_id=1,
+            created_at=start,
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.mark.benchmark(group="appointment_schema")
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def bench_appointment_schema_serialization(benchmark, count):
+    """O que o FastAPI faz com response_model=List[AppointmentSchema]: ORM -> schema -> JSON."""
+    appointments = _appointments(count)
+
+    def serialize():
+        return [AppointmentSchema.model_validate(appointment).model_dump(mode="json") for appointment in appointments]
+
+    benchmark(serialize)
@@ -0,0 +1,59 @@
+# benchmarks/bench_series.py
+# Criação de série recorrente sem fim: todas as ocorrências até o limite (SERIES_MAX_DAYS) são
+# verificadas com um carregamento da agenda, inclusive conflitos depois dos primeiros meses com
+# agendamentos gravados e com outras séries.
+from datetime import datetime, time, timedelta
+
+import pytest
+import pytz
+
+from app.core.config import settings
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.schemas.appointment_series_schema import AppointmentSeriesCreate
+from app.services import appointment_series_service
+
+from conftest import REGULAR_DAY
+
+TZ = pytz.timezone("America/Sao_Paulo")
+LATE_WEEKS = 30 # Depois dos 90 dias que eram verificados antes
+
+
+def _series_in(service, at: time = time(10, 0)) -> AppointmentSeriesCreate:
+    return AppointmentSeriesCreate(
+        service_id=service.id, customer_name="Cliente Recorrente", customer_phone="11999990000",
+        start_time=TZ.localize(datetime.combine(REGULAR_DAY, at)), rrule="FREQ=WEEKLY",
+    )
+
+
+@pytest.mark.benchmark(group="series:create")
+def bench_series_create_open_ended(benchmark, db, factory):
+    def setup():
+        establishment = factory.establishment()
+        return (), {"establishment_id": establishment.id, "series_in": _series_in(factory.service(establishment))}
+
+    series = benchmark.pedantic(
+        lambda **kwargs: appointment_series_service.create_series(db, **kwargs), setup=setup, rounds=5
+    )
+    assert series.until_date == REGULAR_DAY + timedelta(days=settings.SERIES_MAX_DAYS - 1)
+
+
+@pytest.mark.parametrize("blocker", ["appointment", "series"])
+def bench_series_create_late_conflict(db, factory, blocker):
+    establishment = factory.establishment()
+    service = factory.service(establishment)
+    late_day = REGULAR_DAY + timedelta(weeks=LATE_WEEKS)
+    if blocker == "appointment":
+        start = TZ.localize(datetime.combine(late_day, time(8, 0))).astimezone(pytz.utc)
+        db.add(Appointment(
+            start_time=start, end_time=start + timedelta(minutes=service.duration_minutes),
+            customer_name="Cliente Benchmark", customer_phone="11999990000", status=AppointmentStatus.CONFIRMED,
+            establishment_id=establishment.id, service_id=service.id,
+        ))
+        db.commit()
+    else:
+        factory.recurring(establishment, service, late_day, series=1) # Semanal às 08:00 a partir de late_day
+
+    with pytest.raises(ValueError, match=late_day.strftime("%d/%m/%Y")):
+        appointment_series_service.create_series(
+            db, series_in=_series_in(service, time(8, 0)), establishment_id=establishment.id
+        )
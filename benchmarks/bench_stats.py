@@ -0,0 +1,161 @@
+# benchmarks/bench_stats.py
+# Estatísticas pelo rollup diário x agregação direta dos agendamentos (join com Service.price),
+# conferência de que o rollup incremental bate com a reconstrução (também depois de arquivar
+# partições, no PostgreSQL), e o painel do dono com o mesmo número de queries para qualquer
+# número de unidades.
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import event, func, text
+
+from app.core.config import settings
+from app.db import partitioning
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.role_enum import Role
+from app.models.service_model import Service
+from app.models.user_establishment_link import user_establishment_link
+from app.services import audit_service, stats_service
+
+from conftest import REGULAR_DAY
+
+
+def _scan_summary(db, establishment_id: int) -> dict:
+    # Como seria sem o rollup: agrega todos os agendamentos do estabelecimento a cada leitura
+    by_status = {
+        status: (int(count), float(revenue or 0))
+        for status, count, revenue in db.query(
+            Appointment.status, func.count(Appointment.id), func.sum(Service.price)
+        ).join(Service, Service.id == Appointment.service_id).filter(
+            Appointment.establishment_id == establishment_id
+        ).group_by(Appointment.status)
+    }
+    return stats_service._summary(by_status)
+
+
+def _book_days(factory, days: int):
+    establishment = factory.establishment(interval_minutes=30)
+    service = factory.service(establishment, duration_minutes=30)
+    booked = sum(
+        factory.book_day(establishment, service, REGULAR_DAY + timedelta(days=offset), density=0.7)
+        for offset in range(days)
+    )
+    return establishment, booked
+
+
+@pytest.mark.benchmark(group="stats:summary")
+@pytest.mark.parametrize("days", [30, 180])
+@pytest.mark.parametrize("source", ["rollup", "scan"])
+def bench_stats_summary(benchmark, db, factory, days, source):
+    establishment, booked = _book_days(factory, days)
+    stats_service.rebuild(db, establishment_id=establishment.id)
+    benchmark.extra_info["appointments"] = booked
+
+    if source == "rollup":
+        result = benchmark(stats_service.summarize, db, establishment_id=establishment.id)
+    else:
+        result = benchmark(_scan_summary, db, establishment.id)
+    assert result == _scan_summary(db, establishment.id)
+
+
+@pytest.mark.benchmark(group="stats:incremental")
+def bench_stats_incremental_matches_rebuild(benchmark, db, factory):
+    # Mudanças aleatórias de status pelo caminho normal (audit_service.record) e depois a conferência
+    establishment, _ = _book_days(factory, 14)
+    stats_service.rebuild(db, establishment_id=establishment.id)
+    appointments = db.query(Appointment).filter(Appointment.establishment_id == establishment.id).all()
+    rng = random.Random(7)
+    statuses = list(AppointmentStatus)
+    for _ in range(3):
+        changes = [(appointment, rng.choice(statuses)) for appointment in rng.sample(appointments, len(appointments) // 3)]
+        audit_service.record(db, [
+            audit_service.appointment_event(appointment, from_status=appointment.status, to_status=new_status)
+            for appointment, new_status in changes if new_status != appointment.status
+        ])
+        for appointment, new_status in changes:
+            appointment.status = new_status
+        db.commit()
+
+    differences = benchmark(stats_service.find_differences, db, establishment_id=establishment.id)
+    assert differences == []
+    assert stats_service.summarize(db, establishment_id=establishment.id) == _scan_summary(db, establishment.id)
+
+
+@pytest.mark.benchmark(group="stats:dashboard")
+@pytest.mark.parametrize("units", [1, 25])
+def bench_owner_dashboard(benchmark, db, engine, factory, units):
+    establishments = []
+    for _ in range(units):
+        establishment, _ = _book_days(factory, 7)
+        establishments.append(establishment)
+    owner_id = db.execute(
+        user_establishment_link.select().where(user_establishment_link.c.establishment_id == establishments[0].id)
+    ).first().user_id
+    for establishment in establishments[1:]:
+        db.execute(user_establishment_link.insert().values(user_id=owner_id, establishment_id=establishment.id, role=Role.OWNER))
+        stats_service.rebuild(db, establishment_id=establishment.id)
+    stats_service.rebuild(db, establishment_id=establishments[0].id)
+    now = pytz.timezone("America/Sao_Paulo").localize(datetime.combine(REGULAR_DAY + timedelta(days=2), time(7, 0)))
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        dashboard = stats_service.owner_dashboard(db, user_id=owner_id, now=now)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 3 # Unidades, rollup da semana e próximos agendamentos
+    assert len(dashboard["establishments"]) == units
+    assert all(len(unit["next_appointments"]) == stats_service.RECENT_APPOINTMENTS for unit in dashboard["establishments"])
+    assert dashboard["week"] == stats_service._summary({
+        status: (count, 0.0) for status, count in db.query(Appointment.status, func.count(Appointment.id)).filter(
+            Appointment.establishment_id.in_([establishment.id for establishment in establishments])
+        ).group_by(Appointment.status)
+    })
+
+    benchmark(stats_service.owner_dashboard, db, user_id=owner_id, now=now)
+
+
+@pytest.mark.benchmark(group="stats:archive")
+@pytest.mark.parametrize("mode", ["detach", "export"])
+def bench_stats_after_partition_archive(benchmark, db, engine, factory, tmp_path, monkeypatch, mode):
+    # Partição arquivada pelo maintain-partitions --archive: a conferência não acusa diferença e a
+    # reconstrução não perde as contagens (desanexada é relida; exportada fica congelada)
+    if engine.dialect.name != "postgresql":
+        pytest.skip("Particionamento só existe no PostgreSQL (use BENCH_DATABASE_URL)")
+    month = date(2029, 5, 1) if mode == "detach" else date(2029, 7, 1)
+    with engine.connect() as connection:
+        if not partitioning.is_partitioned(connection):
+            partitioning.partition_appointments(connection, months_ahead=0)
+        if month not in {partition["month"] for partition in partitioning.list_partitions(connection)}:
+            partitioning._create_partition(connection, month)
+            connection.commit()
+
+    establishment = factory.establishment(interval_minutes=30)
+    service = factory.service(establishment, duration_minutes=30)
+    for offset in range(5):
+        factory.book_day(establishment, service, month + timedelta(days=10 + offset), density=0.7)
+    factory.book_day(establishment, service, REGULAR_DAY, density=0.7) # Mês que continua na tabela
+    stats_service.rebuild(db, establishment_id=establishment.id)
+    before = stats_service.summarize(db, establishment_id=establishment.id)
+    db.commit()
+
+    monkeypatch.setattr(settings, "APPOINTMENT_ARCHIVE_DIR", str(tmp_path))
+    try:
+        with engine.connect() as connection:
+            archived = partitioning.archive_partitions(
+                connection, older_than_months=1, mode=mode, archive_dir=str(tmp_path),
+                today=partitioning.add_months(month, 2),
+            )
+        assert month in [item["month"] for item in archived]
+
+        differences = benchmark(stats_service.find_differences, db, establishment_id=establishment.id)
+        assert differences == []
+        stats_service.rebuild(db, establishment_id=establishment.id)
+        assert stats_service.summarize(db, establishment_id=establishment.id) == before
+        assert stats_service.find_differences(db, establishment_id=establishment.id) == []
+    finally:
+        db.rollback()
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {partitioning.ARCHIVE_SCHEMA} CASCADE"))
@@ -0,0 +1,121 @@
+# benchmarks/bench_status_validation.py
+# validate_status_transition percorrendo a matriz completa de status
+# para agendamentos no passado, iminentes e futuros, e a equivalência da máquina de estados
+# compilada com a implementação anterior (legacy_status_validation.py). A mudança de status pelo
+# serviço valida a transição com o status do banco, não com o do objeto já carregado.
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.services import appointment_service
+from app.services.status_validation_service import (
+    StatusTransitionError, allowed_next_statuses, transition_error, validate_status_transition,
+)
+
+from legacy_status_validation import legacy_transition_error
+
+STATUSES = list(AppointmentStatus)
+OFFSETS = {
+    "past": timedelta(hours=-2),
+    "starting_soon": timedelta(minutes=10),
+    "future": timedelta(days=3),
+}
+
+
+def _sweep(appointments):
+    allowed = 0
+    for appointment in appointments:
+        for new_status in STATUSES:
+            try:
+                validate_status_transition(appointment, new_status)
+                allowed += 1
+            except StatusTransitionError:
+                pass
+    return allowed
+
+
+@pytest.mark.benchmark(group="status_validation")
+@pytest.mark.parametrize("moment", list(OFFSETS))
+def bench_validate_status_transition_matrix(benchmark, moment):
+    start = datetime.now(timezone.utc) + OFFSETS[moment]
+    appointments = [Appointment(status=status, start_time=start) for status in STATUSES]
+    benchmark.extra_info["transitions_per_round"] = len(STATUSES) ** 2
+
+    benchmark(_sweep, appointments)
+
+
+# Instantes em torno das fronteiras das regras temporais (início e 30 minutos antes), mais
+# deslocamentos aleatórios (seed fixa) em uma janela de dois dias
+BOUNDARY_OFFSETS = [
+    timedelta(0), timedelta(microseconds=1), timedelta(microseconds=-1),
+    timedelta(minutes=30), timedelta(minutes=30, microseconds=1), timedelta(minutes=30, microseconds=-1),
+    timedelta(minutes=-30), timedelta(hours=2), timedelta(hours=-2), timedelta(days=3), timedelta(days=-3),
+]
+
+
+def _offsets(samples: int, seed: int = 42):
+    generator = random.Random(seed)
+    return BOUNDARY_OFFSETS + [timedelta(seconds=generator.uniform(-86400, 86400)) for _ in range(samples)]
+
+
+def _assert_equivalent(offsets):
+    start = datetime(2030, 1, 7, 12, 0, tzinfo=timezone.utc)
+    checked = 0
+    for offset in offsets:
+        now = start - offset # offset > 0: o agendamento ainda vai começar
+        for current in STATUSES:
+            for new in STATUSES:
+                expected = legacy_transition_error(current, new, start_time=start, now=now)
+                assert transition_error(current, new, start_time=start, now=now) == expected, (current, new, offset)
+                checked += 1
+    return checked
+
+
+def bench_status_matrix_equivalence(benchmark):
+    # Mesma decisão e mesma mensagem que a cadeia de if/elif, para todo par de status
+    checked = benchmark.pedantic(_assert_equivalent, args=(_offsets(500),), rounds=1, iterations=1)
+    benchmark.extra_info["transitions_checked"] = checked
+
+
+@pytest.mark.benchmark(group="status_validation:allowed_next")
+@pytest.mark.parametrize("moment", list(OFFSETS))
+def bench_allowed_next_statuses(benchmark, moment):
+    start = datetime.now(timezone.utc) + OFFSETS[moment]
+    appointments = [Appointment(status=status, start_time=start) for status in STATUSES]
+
+    allowed = benchmark(lambda: [allowed_next_statuses(appointment) for appointment in appointments])
+    assert all(appointment.status not in statuses for appointment, statuses in zip(appointments, allowed))
+
+
+@pytest.mark.benchmark(group="status_validation:update")
+def bench_update_status_validates_locked_row(benchmark, db, factory):
+    # O cliente cancela depois que este objeto (ainda PENDING) foi lido: a confirmação tem que ser
+    # recusada pelo status do banco (cancelado -> CONFIRMED é bloqueado)
+    establishment = factory.establishment()
+    service = factory.service(establishment)
+    start = datetime.now(timezone.utc) + timedelta(days=3)
+
+    def stale_cancel():
+        appointment = Appointment(
+            start_time=start, end_time=start + timedelta(minutes=30), customer_name="Cliente Benchmark",
+            customer_phone="11999990000", status=AppointmentStatus.PENDING,
+            establishment_id=establishment.id, service_id=service.id,
+        )
+        db.add(appointment)
+        db.commit()
+        assert transition_error(
+            appointment.status, AppointmentStatus.CONFIRMED, start_time=start, now=datetime.now(timezone.utc)
+        ) is None
+        db.execute(update(Appointment).where(Appointment.id == appointment.id).values(status=AppointmentStatus.CANCELLED_BY_CLIENT))
+        db.commit()
+        with pytest.raises(StatusTransitionError):
+            appointment_service.update_appointment_status(
+                db, appointment_db_obj=appointment, status_in=AppointmentStatus.CONFIRMED
+            )
+        return appointment.id
+
+    appointment_id = benchmark.pedantic(stale_cancel, rounds=5, iterations=1)
+    assert appointment_service.get_appointment(db, appointment_id=appointment_id).status == AppointmentStatus.CANCELLED_BY_CLIENT
@@ -0,0 +1,210 @@
+# benchmarks/bench_waitlist.py
+# Busca do primeiro da lista de espera para um horário cancelado: pelo índice de janelas x
+# varredura das entradas, com milhares de clientes aguardando, e o fluxo completo cancelamento ->
+# reserva para o primeiro da fila compatível. O caso "same_day_miss" põe toda a lista num só dia,
+# com janelas que não contêm o horário: a busca lê só as formas do dia, não as janelas. Uma forma
+# sai com a sua última janela, e uma reserva que não pode ser criada passa o horário adiante.
+import random
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+import pytest
+import pytz
+
+from app.models.appointment_model import Appointment, AppointmentStatus
+from app.models.waitlist_model import WaitlistEntry, WaitlistShape, WaitlistStatus, WaitlistWindow
+from app.services import appointment_service, waitlist_service
+from app.services.waitlist_service import _shape_key
+
+from conftest import REGULAR_DAY
+
+TZ = pytz.timezone("America/Sao_Paulo")
+DAYS = 30
+
+
+def _fill_waitlist(db, establishment, services, entries: int, seed: int = 11, same_day: bool = False) -> None:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(entries):
+        if same_day:
+            # Todos no mesmo dia, só de manhã, com várias formas de janela na grade
+            first_day = REGULAR_DAY
+            earliest = time(8 + rng.randrange(3), rng.choice([0, 15, 30, 45]))
+            latest = time(11 + rng.randrange(2), rng.choice([0, 15, 30, 45]))
+        else:
+            first_day = REGULAR_DAY + timedelta(days=rng.randrange(DAYS))
+            earliest = rng.choice([None, time(8, 0), time(13, 0)])
+            latest = time(12, 0) if earliest == time(8, 0) else None
+        rows.append(WaitlistEntry(
+            establishment_id=establishment.id,
+            service_id=rng.choice(services).id,
+            customer_name=f"Cliente {index}",
+            customer_phone="11999990000",
+            start_date=first_day,
+            end_date=first_day if same_day else first_day + timedelta(days=rng.randrange(7)),
+            earliest_time=earliest,
+            latest_time=latest,
+            status=WaitlistStatus.WAITING,
+        ))
+    db.add_all(rows)
+    db.flush()
+    for entry in rows:
+        waitlist_service._add_windows(db, entry, TZ, entry.start_date)
+    db.commit()
+
+
+def _scan_match(db, *, establishment_id: int, service_id: int, start_time: datetime, end_time: datetime) -> Optional[int]:
+    # Como seria sem as janelas: percorre todas as entradas aguardando e confere o período e a faixa do dia
+    start_local, end_local = start_time.astimezone(TZ), end_time.astimezone(TZ)
+    for entry in db.query(WaitlistEntry).filter(
+        WaitlistEntry.establishment_id == establishment_id,
+        WaitlistEntry.service_id == service_id,
+        WaitlistEntry.status == WaitlistStatus.WAITING,
+    ).order_by(WaitlistEntry.id):
+        if not entry.start_date <= start_local.date() <= entry.end_date:
+            continue
+        if entry.earliest_time and start_local.time() < entry.earliest_time:
+            continue
+        if entry.latest_time and (end_local.date() > start_local.date() or end_local.time() > entry.latest_time):
+            continue
+        return entry.id
+    return None
+
+
+def _slots(services, count: int, seed: int = 3, afternoon_only: bool = False):
+    rng = random.Random(seed)
+    for _ in range(count):
+        service = rng.choice(services)
+        day = REGULAR_DAY if afternoon_only else REGULAR_DAY + timedelta(days=rng.randrange(DAYS))
+        hour = rng.randrange(14, 17) if afternoon_only else rng.randrange(8, 17)
+        start = TZ.localize(datetime.combine(day, time(hour, rng.choice([0, 30])))).astimezone(pytz.utc)
+        yield service.id, start, start + timedelta(minutes=service.duration_minutes)
+
+
+@pytest.mark.benchmark(group="waitlist:match")
+@pytest.mark.parametrize("entries", [500, 5000])
+@pytest.mark.parametrize("source", ["index", "scan"])
+@pytest.mark.parametrize("layout", ["spread", "same_day_miss"])
+def bench_waitlist_match(benchmark, db, factory, entries, source, layout):
+    establishment = factory.establishment()
+    services = [factory.service(establishment, duration_minutes=minutes) for minutes in (30, 60, 90)]
+    same_day = layout == "same_day_miss"
+    _fill_waitlist(db, establishment, services, entries, same_day=same_day)
+    slots = list(_slots(services, 50, afternoon_only=same_day))
+    benchmark.extra_info["entries"] = entries
+    benchmark.extra_info["shapes"] = db.query(WaitlistShape).filter(WaitlistShape.establishment_id == establishment.id).count()
+
+    def index_match():
+        return [
+            waitlist_service.find_match(
+                db, establishment_id=establishment.id, service_id=service_id, professional_id=None,
+                day=start.astimezone(TZ).date(), start_time=start, end_time=end,
+            )
+            for service_id, start, end in slots
+        ]
+
+    def scan_match():
+        return [
+            _scan_match(db, establishment_id=establishment.id, service_id=service_id, start_time=start, end_time=end)
+            for service_id, start, end in slots
+        ]
+
+    result = benchmark(index_match if source == "index" else scan_match)
+    assert result == scan_match()
+    if same_day:
+        # Ninguém aceita a tarde; as formas do dia não crescem com a lista (grade de 15 minutos)
+        assert all(entry_id is None for entry_id in result)
+        assert benchmark.extra_info["shapes"] <= 3 * 12 * 8
+    else:
+        assert any(entry_id is not None for entry_id in result)
+
+
+@pytest.mark.benchmark(group="waitlist:offer")
+def bench_waitlist_offer_on_cancel(benchmark, db, factory):
+    # Cancelamento pelo caminho normal: o primeiro da fila compatível recebe a reserva (PENDING)
+    establishment = factory.establishment()
+    service = factory.service(establishment, duration_minutes=30)
+    _fill_waitlist(db, establishment, [service], 2000)
+    starts = iter(range(8 * 60, 12 * 60, 30)) # Um horário livre por rodada (a reserva anterior ocupa o seu)
+
+    def cancel_and_offer():
+        minutes = next(starts)
+        start = TZ.localize(datetime.combine(
+            REGULAR_DAY + timedelta(days=3), time(minutes // 60, minutes % 60)
+        )).astimezone(pytz.utc)
+        appointment = Appointment(
+            start_time=start, end_time=start + timedelta(minutes=30), customer_name="Cliente Benchmark",
+            customer_phone="11999990000", status=AppointmentStatus.CONFIRMED,
+            establishment_id=establishment.id, service_id=service.id,
+        )
+        db.add(appointment)
+        db.commit()
+        expected = _scan_match(
+            db, establishment_id=establishment.id, service_id=service.id,
+            start_time=start, end_time=start + timedelta(minutes=30),
+        )
+        appointment_service.update_appointment_status(
+            db, appointment_db_obj=appointment, status_in=AppointmentStatus.CANCELLED_BY_CLIENT
+        )
+        return expected
+
+    expected = benchmark.pedantic(cancel_and_offer, rounds=5, iterations=1)
+    entry = db.get(WaitlistEntry, expected)
+    assert entry.status == WaitlistStatus.OFFERED
+    hold = appointment_service.get_appointment(db, appointment_id=entry.appointment_id)
+    assert hold.status == AppointmentStatus.PENDING and hold.customer_name == entry.customer_name
+    assert not db.query(WaitlistWindow).filter(WaitlistWindow.entry_id == entry.id).count()
+
+
+def _dead_shapes(db, establishment_id: int) -> int:
+    windows = {tuple(row) for row in db.query(*_shape_key(WaitlistWindow)).filter(WaitlistWindow.establishment_id == establishment_id)}
+    shapes = {tuple(row) for row in db.query(*_shape_key(WaitlistShape)).filter(WaitlistShape.establishment_id == establishment_id)}
+    assert windows <= shapes # Toda janela tem a sua forma
+    return len(shapes - windows)
+
+
+def bench_waitlist_shapes_pruned(db, factory):
+    # Retirar da fila e receber uma reserva apagam as formas que ficaram sem janelas
+    establishment = factory.establishment()
+    service = factory.service(establishment, duration_minutes=30)
+    _fill_waitlist(db, establishment, [service], 300, same_day=True)
+    assert _dead_shapes(db, establishment.id) == 0
+    entries = db.query(WaitlistEntry).filter(WaitlistEntry.establishment_id == establishment.id).order_by(WaitlistEntry.id).all()
+    for entry in entries[::2]:
+        waitlist_service.cancel_entry(db, entry_db_obj=entry)
+    for minutes in range(11 * 60, 12 * 60, 30):
+        start = TZ.localize(datetime.combine(REGULAR_DAY, time(minutes // 60, minutes % 60))).astimezone(pytz.utc)
+        assert waitlist_service.offer_freed_slot(
+            db, establishment_id=establishment.id, service_id=service.id, professional_id=None,
+            start_time=start, end_time=start + timedelta(minutes=30), timezone_name=establishment.timezone,
+            now=start - timedelta(days=1),
+        ) is not None
+    assert _dead_shapes(db, establishment.id) == 0
+
+
+def bench_waitlist_offer_skips_failed_entry(db, factory):
+    # A reserva não pode ser criada para o primeiro da fila (telefone inválido para um agendamento):
+    # ele continua aguardando e o horário vai para o seguinte
+    establishment = factory.establishment()
+    service = factory.service(establishment, duration_minutes=30)
+    _fill_waitlist(db, establishment, [service], 5, same_day=True)
+    first, second = db.query(WaitlistEntry).filter(
+        WaitlistEntry.establishment_id == establishment.id
+    ).order_by(WaitlistEntry.id).limit(2).all()
+    for entry in (first, second):
+        entry.earliest_time, entry.latest_time = time(8, 0), time(12, 0)
+        waitlist_service._delete_windows(db, [entry.id])
+        waitlist_service._add_windows(db, entry, TZ, entry.start_date)
+    first.customer_phone = "123"
+    db.commit()
+    start = TZ.localize(datetime.combine(REGULAR_DAY, time(9, 0))).astimezone(pytz.utc)
+
+    offered = waitlist_service.offer_freed_slot(
+        db, establishment_id=establishment.id, service_id=service.id, professional_id=None,
+        start_time=start, end_time=start + timedelta(minutes=30), timezone_name=establishment.timezone,
+        now=start - timedelta(days=1),
+    )
+    assert offered is not None and offered.id == second.id
+    db.refresh(first)
+    assert first.status == WaitlistStatus.WAITING
+    assert db.query(WaitlistWindow).filter(WaitlistWindow.entry_id == first.id).count()
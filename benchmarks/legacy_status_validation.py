@@ -0,0 +1,104 @@
+# benchmarks/legacy_status_validation.py
+# Cópia congelada do validate_status_transition anterior à máquina de estados compilada
+# (cadeia de if/elif), com o instante `now` injetado e devolvendo a mensagem de erro (ou None).
+# Serve de referência para a verificação de equivalência em bench_status_validation.py.
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.models.appointment_model import AppointmentStatus
+
+# Cópia da tabela original (não importada do serviço): uma mudança nela lá não pode mudar os
+# dois lados da verificação de equivalência
+BLOCKED_TRANSITIONS = {
+    AppointmentStatus.COMPLETED: [
+        AppointmentStatus.PENDING,
+        AppointmentStatus.CONFIRMED,
+        AppointmentStatus.IN_PROGRESS,
+        AppointmentStatus.CANCELLED_BY_CLIENT,
+        AppointmentStatus.CANCELLED_BY_ESTABLISHMENT,
+        AppointmentStatus.NO_SHOW,
+        AppointmentStatus.RESCHEDULED,
+    ],
+    AppointmentStatus.CANCELLED_BY_CLIENT: [
+        AppointmentStatus.PENDING,
+        AppointmentStatus.CONFIRMED,
+        AppointmentStatus.IN_PROGRESS,
+        AppointmentStatus.COMPLETED,
+        AppointmentStatus.NO_SHOW,
+        AppointmentStatus.CANCELLED_BY_ESTABLISHMENT
+        # RESCHEDULED não está na lista - cancelados podem ser reagendados
+    ],
+    AppointmentStatus.CANCELLED_BY_ESTABLISHMENT: [
+        AppointmentStatus.PENDING,
+        AppointmentStatus.CONFIRMED,
+        AppointmentStatus.IN_PROGRESS,
+        AppointmentStatus.COMPLETED,
+        AppointmentStatus.NO_SHOW,
+        AppointmentStatus.CANCELLED_BY_CLIENT
+        # RESCHEDULED não está na lista - cancelados podem ser reagendados
+    ],
+    AppointmentStatus.NO_SHOW: [
+        AppointmentStatus.PENDING,
+        AppointmentStatus.CONFIRMED,
+        AppointmentStatus.IN_PROGRESS,
+        AppointmentStatus.COMPLETED,
+        AppointmentStatus.CANCELLED_BY_CLIENT,
+        AppointmentStatus.CANCELLED_BY_ESTABLISHMENT,
+        AppointmentStatus.RESCHEDULED
+    ],
+    AppointmentStatus.RESCHEDULED: [
+        AppointmentStatus.CONFIRMED,  # Reagendado não deve ter botão confirmar
+        AppointmentStatus.IN_PROGRESS,
+        AppointmentStatus.COMPLETED,
+        AppointmentStatus.NO_SHOW
+    ]
+}
+
+_CRITICAL = [AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED, AppointmentStatus.PENDING]
+_CANCELLED = [AppointmentStatus.CANCELLED_BY_CLIENT, AppointmentStatus.CANCELLED_BY_ESTABLISHMENT]
+
+
+def legacy_transition_error(
+    current_status: AppointmentStatus, new_status: AppointmentStatus, *, start_time: datetime, now: datetime
+) -> Optional[str]:
+    appointment_time = start_time
+    now_utc = now
+    is_appointment_passed = now_utc > appointment_time
+
+    if current_status == new_status:
+        return "O agendamento já está com este status."
+
+    if is_appointment_passed:
+        if current_status in _CRITICAL:
+            if new_status not in [AppointmentStatus.COMPLETED, AppointmentStatus.NO_SHOW]:
+                return "Agendamentos que já passaram do horário só podem ser marcados como 'Concluído' ou 'Não Compareceu'."
+        elif new_status in BLOCKED_TRANSITIONS.get(current_status, []):
+            return f"A transição do status '{current_status.value}' para '{new_status.value}' não é permitida."
+    else:
+        if new_status in BLOCKED_TRANSITIONS.get(current_status, []):
+            if current_status == AppointmentStatus.COMPLETED:
+                return "Um agendamento concluído não pode ser alterado."
+            elif current_status in _CANCELLED and new_status == AppointmentStatus.COMPLETED:
+                return "Um agendamento cancelado não pode ser marcado como concluído."
+            elif current_status in _CANCELLED and new_status == AppointmentStatus.NO_SHOW:
+                return "Um agendamento cancelado não pode ser marcado como não-comparecimento."
+            elif current_status == AppointmentStatus.NO_SHOW and new_status in [AppointmentStatus.CONFIRMED, AppointmentStatus.PENDING]:
+                return "Um agendamento com não-comparecimento não pode voltar a ser confirmado."
+            else:
+                return f"A transição do status '{current_status.value}' para '{new_status.value}' não é permitida."
+
+    if new_status == AppointmentStatus.COMPLETED and now_utc < appointment_time:
+        return "Só é possível marcar como concluído após o horário de início."
+
+    if new_status == AppointmentStatus.IN_PROGRESS:
+        thirty_minutes_before = appointment_time - timedelta(minutes=30)
+        if now_utc < thirty_minutes_before:
+            return "Só é possível iniciar um atendimento 30 minutos antes do horário agendado."
+        if now_utc > appointment_time:
+            return "Muito tarde para iniciar o atendimento. Use a opção de completar diretamente."
+
+    if new_status == AppointmentStatus.NO_SHOW:
+        is_critical_past = is_appointment_passed and current_status in _CRITICAL
+        if not is_critical_past and now_utc < appointment_time:
+            return "Só é possível marcar não-comparecimento após o horário agendado."
+    return None
@@ -0,0 +1,386 @@
+# benchmarks/load_test.py
+# Teste de carga ponta a ponta do fluxo de agendamento (asyncio + aiohttp).
+#
+# Reproduz jornadas realistas contra uma instância da API:
+#   - booking: página do estabelecimento -> lista de serviços -> horários disponíveis -> cria agendamento;
+#   - agenda:  dono logado consultando a agenda dos próximos dias (polling);
+#   - login:   dono fazendo login.
+#
+# A carga é de malha aberta (open loop): as jornadas chegam em um processo de Poisson com a taxa
+# pedida, independentemente de as anteriores terem terminado. Assim a latência medida inclui a
+# fila do servidor, e rodando várias taxas em sequência (--rate 5,10,20,40) dá para achar o ponto
+# de saturação de um deploy.
+#
+# Os tenants vêm do gerador de dados sintéticos (mesma seed):
+#   python manage.py generate-data --establishments 200 --seed 42
+#   python benchmarks/load_test.py --seed 42 --tenants 50 --rate 10,20,40,80 --duration 30
+#   python benchmarks/load_test.py --spawn-server --workers 4 --rate 20,40 --json resultado.json
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import aiohttp
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+
+# Mesmos valores do app/db/synthetic_data.py (o script roda fora do app, sem importar o pacote)
+SYNTHETIC_EMAIL = "owner.{seed}.{index}@synthetic.orkestre.dev"
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+DEFAULT_MIX = "booking=70,agenda=25,login=5"
+
+
+@dataclass
+class Tenant:
+    index: int
+    email: str
+    token: str
+    establishment_id: int
+    timezone: str
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0 # 5xx, timeouts e falhas de conexão
+    conflicts: int = 0 # 409, ou 400 na criação (horário recusado)
+    client_errors: int = 0 # demais 4xx
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil por ranking mais próximo (sem interpolação), como nos relatórios de latência usuais."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+class Recorder:
+    """Acumula amostras por rota (template do path, não o path concreto) e por jornada."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.journeys: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.dropped = 0
+        self.no_slots = 0
+
+    def record(self, route: str, status: int, elapsed_ms: float) -> None:
+        stats = self.routes[route]
+        stats.latencies_ms.append(elapsed_ms)
+        if status == 0 or status >= 500:
+            stats.errors += 1
+        elif status == 409 or (status == 400 and route.startswith("POST") and route.endswith("/appointments/")):
+            stats.conflicts += 1
+        elif status >= 400:
+            stats.client_errors += 1
+
+    def summary(self, duration_s: float) -> dict:
+        def describe(stats: RouteStats) -> dict:
+            count = len(stats.latencies_ms)
+            return {
+                "count": count,
+                "per_second": round(count / duration_s, 2),
+                "p50_ms": _round(percentile(stats.latencies_ms, 50)),
+                "p95_ms": _round(percentile(stats.latencies_ms, 95)),
+                "p99_ms": _round(percentile(stats.latencies_ms, 99)),
+                "error_rate": round(stats.errors / count, 4) if count else 0.0,
+                "conflict_rate": round(stats.conflicts / count, 4) if count else 0.0,
+                "client_error_rate": round(stats.client_errors / count, 4) if count else 0.0,
+            }
+
+        return {
+            "routes": {route: describe(stats) for route, stats in sorted(self.routes.items())},
+            "journeys": {name: describe(stats) for name, stats in sorted(self.journeys.items())},
+            "dropped": self.dropped,
+            "bookings_without_slots": self.no_slots,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+class LoadDriver:
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, tenants: List[Tenant], *, rng: random.Random, days_ahead: int):
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.tenants = tenants
+        self.rng = rng
+        self.days_ahead = days_ahead
+        self.recorder = Recorder()
+
+    async def request(self, method: str, route: str, path: str, **kwargs):
+        """Executa uma requisição e registra a latência sob o template `route`. Retorna (status, corpo JSON ou None)."""
+        started = time.perf_counter()
+        status, body = 0, None
+        try:
+            async with self.session.request(method, self.base_url + path, **kwargs) as response:
+                status = response.status
+                if response.content_type == "application/json":
+                    body = await response.json()
+                else:
+                    await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = 0
+        self.recorder.record(f"{method} {route}", status, (time.perf_counter() - started) * 1000)
+        return status, body
+
+    # --- Jornadas ---
+
+    async def booking_journey(self, tenant: Tenant) -> None:
+        establishment_path = f"{API}/establishments/{tenant.establishment_id}"
+        status, _ = await self.request("GET", f"{API}/establishments/{{id}}", establishment_path)
+        if status != 200:
+            return
+        status, services = await self.request("GET", f"{API}/establishments/{{id}}/services/", f"{establishment_path}/services/")
+        active = [service for service in services or [] if service.get("is_active", True)] if status == 200 else []
+        if not active:
+            return
+        service = self.rng.choice(active)
+
+        # Tenta alguns dias até achar horário livre, como um cliente folheando o calendário
+        local_today = datetime.now(ZoneInfo(tenant.timezone)).date()
+        for _ in range(3):
+            day = local_today + timedelta(days=self.rng.randint(1, self.days_ahead))
+            status, slots = await self.request(
+                "GET",
+                f"{API}/establishments/{{id}}/services/{{id}}/available-slots",
+                f"{establishment_path}/services/{service['id']}/available-slots",
+                params={"appointment_date": day.isoformat()},
+            )
+            if status == 200 and slots:
+                break
+        else:
+            self.recorder.no_slots += 1
+            return
+
+        slot = datetime.combine(day, datetime.strptime(self.rng.choice(slots), "%H:%M:%S").time(), tzinfo=ZoneInfo(tenant.timezone))
+        await self.request(
+            "POST",
+            f"{API}/establishments/{{id}}/appointments/",
+            f"{establishment_path}/appointments/",
+            json={
+                "start_time": slot.isoformat(),
+                "customer_name": "Cliente Carga",
+                "customer_phone": f"119{self.rng.randint(10000000, 99999999)}",
+                "service_id": service["id"],
+            },
+        )
+
+    async def agenda_journey(self, tenant: Tenant) -> None:
+        today = date.today()
+        await self.request(
+            "GET",
+            f"{API}/establishments/{{id}}/appointments/",
+            f"{API}/establishments/{tenant.establishment_id}/appointments/",
+            params={"start_date": today.isoformat(), "end_date": (today + timedelta(days=7)).isoformat()},
+            headers={"Authorization": f"Bearer {tenant.token}"},
+        )
+
+    async def login_journey(self, tenant: Tenant) -> None:
+        await self.request("POST", f"{API}/auth/login", f"{API}/auth/login", json={"email": tenant.email, "password": SYNTHETIC_PASSWORD})
+
+    async def run_journey(self, name: str, scheduled_at: float) -> None:
+        tenant = self.rng.choice(self.tenants)
+        await getattr(self, f"{name}_journey")(tenant)
+        # Latência da jornada medida a partir da chegada agendada (evita omissão coordenada)
+        self.recorder.journeys[name].latencies_ms.append((time.perf_counter() - scheduled_at) * 1000)
+
+    async def open_loop(self, *, rate: float, duration_s: float, mix: Dict[str, int], max_in_flight: int, drain_timeout_s: float) -> dict:
+        """Dispara jornadas em chegadas de Poisson com taxa `rate`/s durante `duration_s` segundos."""
+        self.recorder = Recorder()
+        names, weights = zip(*mix.items())
+        in_flight = set()
+        started = time.perf_counter()
+        next_arrival = started
+        while True:
+            next_arrival += self.rng.expovariate(rate)
+            if next_arrival - started >= duration_s:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                # O cliente não segura mais: conta como descartada em vez de atrasar as próximas chegadas
+                self.recorder.dropped += 1
+                continue
+            task = asyncio.create_task(self.run_journey(self.rng.choices(names, weights=weights, k=1)[0], next_arrival))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=drain_timeout_s)
+        elapsed = time.perf_counter() - started
+        report = self.recorder.summary(elapsed)
+        completed = sum(len(stats.latencies_ms) for stats in self.recorder.journeys.values())
+        requests = sum(len(stats.latencies_ms) for stats in self.recorder.routes.values())
+        report.update({
+            "offered_rate": rate,
+            "achieved_rate": round(completed / elapsed, 2),
+            "requests_per_second": round(requests / elapsed, 2),
+            "elapsed_s": round(elapsed, 2),
+        })
+        return report
+
+
+async def load_tenants(session: aiohttp.ClientSession, base_url: str, *, seed: int, count: int) -> List[Tenant]:
+    """Faz login nos donos gerados pelo generate-data e descobre o estabelecimento e o fuso de cada um."""
+    tenants = []
+    for index in range(count):
+        email = SYNTHETIC_EMAIL.format(seed=seed, index=index)
+        async with session.post(f"{base_url}{API}/auth/login", json={"email": email, "password": SYNTHETIC_PASSWORD}) as response:
+            if response.status != 200:
+                if index == 0:
+                    raise RuntimeError(f"Login de {email} falhou ({response.status}). Rode antes: python manage.py generate-data --seed {seed}")
+                break
+            token = (await response.json())["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        async with session.get(f"{base_url}{API}/users/me", headers=headers) as response:
+            me = await response.json()
+        establishment_id = me["establishments"][0]["id"]
+        async with session.get(f"{base_url}{API}/establishments/{establishment_id}") as response:
+            establishment = await response.json()
+        tenants.append(Tenant(index, email, token, establishment_id, establishment["timezone"]))
+    return tenants
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ("booking", "agenda", "login"):
+            raise argparse.ArgumentTypeError(f"Jornada desconhecida: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+def print_report(report: dict, *, slo_p99_ms: float) -> None:
+    print(
+        f"\n== taxa oferecida {report['offered_rate']}/s | atingida {report['achieved_rate']} jornadas/s | "
+        f"{report['requests_per_second']} req/s | descartadas {report['dropped']} | sem horário {report['bookings_without_slots']}"
+    )
+    print(f"{'rota':<72}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'erro%':>8}{'confl%':>8}")
+    for title, rows in (("", report["routes"]), ("jornada ", report["journeys"])):
+        for name, stats in rows.items():
+            marker = " !" if (stats["p99_ms"] or 0) > slo_p99_ms else ""
+            # Erros e conflitos são contados por rota; nas jornadas só a latência ponta a ponta importa
+            rates = f"{stats['error_rate'] * 100:>8.2f}{stats['conflict_rate'] * 100:>8.2f}" if not title else f"{'-':>8}{'-':>8}"
+            print(
+                f"{title + name:<72}{stats['count']:>7}{stats['p50_ms'] or '-':>9}{stats['p95_ms'] or '-':>9}"
+                f"{stats['p99_ms'] or '-':>9}{rates}{marker}"
+            )
+
+
+def is_saturated(report: dict, *, slo_p99_ms: float, max_error_rate: float) -> bool:
+    """Saturado: não acompanha a taxa oferecida, estoura o p99 ou passa do limite de erros."""
+    if report["achieved_rate"] < 0.95 * report["offered_rate"] or report["dropped"]:
+        return True
+    for stats in report["routes"].values():
+        if (stats["p99_ms"] or 0) > slo_p99_ms or stats["error_rate"] > max_error_rate:
+            return True
+    return False
+
+
+def spawn_server(bind: str, workers: int, log_path: Optional[str]) -> subprocess.Popen:
+    """Sobe a API localmente via `manage.py serve` (gunicorn + UvicornWorker)."""
+    log = open(log_path, "w") if log_path else None # Sem log, a saída do servidor se mistura ao relatório
+    return subprocess.Popen(
+        [sys.executable, "manage.py", "serve", "--workers", str(workers), "--bind", bind],
+        cwd=PROJECT_ROOT,
+        stdout=log,
+        stderr=subprocess.STDOUT if log else None,
+    )
+
+
+async def wait_for_server(base_url: str, timeout_s: float) -> None:
+    deadline = time.perf_counter() + timeout_s
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            try:
+                async with session.get(base_url + "/") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"A API não respondeu em {base_url} dentro de {timeout_s}s")
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.max_in_flight)
+    reports = []
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        tenants = await load_tenants(session, args.base_url, seed=args.seed, count=args.tenants)
+        print(f"{len(tenants)} tenants prontos em {args.base_url}.")
+        driver = LoadDriver(session, args.base_url, tenants, rng=rng, days_ahead=args.days_ahead)
+        if args.warmup > 0:
+            await driver.open_loop(rate=args.rates[0], duration_s=args.warmup, mix=args.mix, max_in_flight=args.max_in_flight, drain_timeout_s=args.timeout)
+
+        for rate in args.rates:
+            report = await driver.open_loop(
+                rate=rate, duration_s=args.duration, mix=args.mix, max_in_flight=args.max_in_flight, drain_timeout_s=args.timeout
+            )
+            report["saturated"] = is_saturated(report, slo_p99_ms=args.slo_p99_ms, max_error_rate=args.max_error_rate)
+            reports.append(report)
+            print_report(report, slo_p99_ms=args.slo_p99_ms)
+            if report["saturated"]:
+                print(f"\nPonto de saturação: {rate} jornadas/s (p99 > {args.slo_p99_ms}ms, erros > {args.max_error_rate:.0%} ou taxa não atingida).")
+                if not args.keep_going:
+                    break
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"base_url": args.base_url, "mix": args.mix, "steps": reports}, output, indent=2)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga (malha aberta) do fluxo de agendamento.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="URL da API.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed usada no generate-data (define os logins dos tenants).")
+    parser.add_argument("--tenants", type=int, default=20, help="Quantos estabelecimentos sintéticos usar.")
+    parser.add_argument("--rate", dest="rates", default="10", type=lambda v: [float(r) for r in v.split(",")], help="Taxas de chegada em jornadas/s, separadas por vírgula (ex: 10,20,40).")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos em cada taxa.")
+    parser.add_argument("--warmup", type=float, default=5, help="Segundos de aquecimento (descartados) antes da primeira taxa.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Pesos das jornadas (padrão: {DEFAULT_MIX}).")
+    parser.add_argument("--max-in-flight", type=int, default=500, help="Máximo de jornadas simultâneas no cliente; acima disso são descartadas.")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout por requisição (s).")
+    parser.add_argument("--days-ahead", type=int, default=14, help="Janela de dias futuros consultada nas jornadas de booking.")
+    parser.add_argument("--slo-p99-ms", type=float, default=500, help="p99 máximo por rota antes de considerar saturado.")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Taxa de erro máxima por rota antes de considerar saturado.")
+    parser.add_argument("--keep-going", action="store_true", help="Continua nas próximas taxas mesmo depois de saturar.")
+    parser.add_argument("--json", default=None, help="Grava o relatório completo neste arquivo JSON.")
+    parser.add_argument("--spawn-server", action="store_true", help="Sobe a API localmente (manage.py serve) durante o teste.")
+    parser.add_argument("--workers", type=int, default=None, help="Workers da API iniciada com --spawn-server.")
+    parser.add_argument("--server-log", default=None, help="Arquivo para a saída da API iniciada com --spawn-server.")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn_server:
+        bind = args.base_url.split("://", 1)[-1].rstrip("/")
+        server = spawn_server(bind, args.workers or os.cpu_count() or 1, args.server_log)
+        asyncio.run(wait_for_server(args.base_url, timeout_s=60))
+    try:
+        return asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
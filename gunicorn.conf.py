@@ -0,0 +1,43 @@
+# gunicorn.conf.py
+# Perfil oficial do servidor de produção: gunicorn gerenciando workers uvicorn.
+#   gunicorn -c gunicorn.conf.py app.main:app
+# (ou simplesmente `python manage.py serve`, que monta este mesmo comando)
+#
+# Todos os valores vêm de app.core.config.settings (variáveis de ambiente / .env).
+import multiprocessing
+import sys
+
+from app.core.config import settings
+
+bind = settings.SERVER_BIND
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Um worker por núcleo satura a máquina: cada UvicornWorker já é assíncrono e os
+# endpoints síncronos rodam no threadpool do próprio worker.
+workers = settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+
+# Com preload o app é importado UMA vez no master e os workers nascem por fork,
+# compartilhando a memória das páginas de código (copy-on-write) e subindo mais rápido.
+# Por isso os recursos com sockets (pool do SQLAlchemy, cliente Twilio) precisam ser
+# descartados no filho: ver post_fork abaixo.
+preload_app = settings.SERVER_PRELOAD_APP
+
+# Tempo para um worker terminar as requisições em andamento antes de ser morto (SIGTERM/HUP).
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+timeout = 60
+keepalive = 5
+
+
+def post_fork(server, worker):
+    # Só reseta o que o master de fato carregou (com preload_app=False nada foi importado).
+    if "app.db.session" in sys.modules:
+        sys.modules["app.db.session"].reset_engine_after_fork()
+    if "app.tasks" in sys.modules:
+        sys.modules["app.tasks"].reset_twilio_client()
+    server.log.info("Worker %s: pool do banco e clientes externos reiniciados após o fork.", worker.pid)
+
+
+def child_exit(server, worker):
+    # Em modo multiprocess do Prometheus, remove os arquivos de métricas "ao vivo" do worker morto.
+    if "app.core.metrics" in sys.modules:
+        sys.modules["app.core.metrics"].mark_worker_dead(worker.pid)
@@ -0,0 +1,337 @@
+# manage.py
+# Comandos administrativos da aplicação. Execute a partir da raiz do projeto:
+#   python manage.py init-db
+#   python manage.py serve --workers 4
+#   python manage.py generate-data --establishments 1000 --appointments-per-establishment 10000 --seed 42
+#   python manage.py partition-appointments
+#   python manage.py maintain-partitions --archive
+#   python manage.py archive-appointments --older-than-days 365
+#   python manage.py backfill-customers
+#   python manage.py rebuild-stats
+#   python manage.py check-stats --since 2025-01-01
+# Os imports pesados (SQLAlchemy, modelos) ficam dentro de cada comando para que
+# `python manage.py --help` continue instantâneo.
+import argparse
+import os
+import sys
+
+
+def init_db_command(args: argparse.Namespace) -> int:
+    """Cria as tabelas que ainda não existem no banco (Base.metadata.create_all)."""
+    from app.db.session import init_db
+
+    print("Criando tabelas no banco de dados...")
+    init_db()
+    print("Tabelas criadas/verificadas com sucesso.")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """Sobe o servidor de produção (gunicorn + UvicornWorker) com o gunicorn.conf.py do projeto."""
+    # As opções da linha de comando viram variáveis de ambiente, lidas pelo gunicorn.conf.py
+    if args.workers is not None:
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    if args.bind is not None:
+        os.environ["SERVER_BIND"] = args.bind
+    if args.preload is not None:
+        os.environ["SERVER_PRELOAD_APP"] = "true" if args.preload else "false"
+
+    command = ["gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+    print(f"Executando: {' '.join(command)}")
+    os.execvp(command[0], command) # Substitui este processo pelo gunicorn (sinais vão direto para o master)
+    return 0
+
+
+def generate_data_command(args: argparse.Namespace) -> int:
+    """Gera tenants sintéticos (determinísticos pela seed) e carrega em lote, medindo linhas/s."""
+    from datetime import date
+
+    from app.db import synthetic_data
+    from app.db.session import engine
+    from app.services.user_service import get_password_hash
+
+    anchor_date = date.fromisoformat(args.anchor_date) if args.anchor_date else date.today()
+    method = args.method
+    if method == "auto":
+        method = "copy" if engine.dialect.name == "postgresql" else "executemany"
+
+    print(
+        f"Gerando {args.establishments} estabelecimentos x {args.appointments_per_establishment} agendamentos "
+        f"(seed={args.seed}, âncora={anchor_date.isoformat()}, método={method})..."
+    )
+    with engine.connect() as connection:
+        try:
+            report = synthetic_data.generate(
+                connection,
+                establishments=args.establishments,
+                appointments_per_establishment=args.appointments_per_establishment,
+                seed=args.seed,
+                anchor_date=anchor_date,
+                method=method,
+                batch_size=args.batch_size,
+                history_days=args.history_days,
+                future_days=args.future_days,
+                hashed_password=get_password_hash(synthetic_data.SYNTHETIC_PASSWORD),
+                progress=lambda done, rows: print(f"  {done} estabelecimentos, {rows} linhas carregadas"),
+            )
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+
+    print(f"{'tabela':<26}{'linhas':>12}{'segundos':>12}{'linhas/s':>12}")
+    for table, stats in report["tables"].items():
+        print(f"{table:<26}{stats['rows']:>12}{stats['load_seconds']:>12}{stats['rows_per_second'] or '-':>12}")
+    print(f"Total: {report['total_rows']} linhas em {report['total_seconds']}s ({report['rows_per_second']} linhas/s, geração + carga).")
+    print(f"Login dos usuários gerados: owner.{args.seed}.<n>@{synthetic_data.EMAIL_DOMAIN} / {synthetic_data.SYNTHETIC_PASSWORD}")
+    return 0
+
+
+def _print_partitions(connection) -> None:
+    from app.db import partitioning
+
+    for partition in partitioning.list_partitions(connection):
+        print(f"  {partition['name']:<32} ~{partition['estimated_rows']} linhas")
+
+
+def partition_appointments_command(args: argparse.Namespace) -> int:
+    """Converte a tabela appointments em particionada por mês (operação única, bloqueia a tabela)."""
+    from app.core.config import settings
+    from app.db import partitioning
+    from app.db.session import engine
+
+    months_ahead = args.months_ahead if args.months_ahead is not None else settings.APPOINTMENT_PARTITION_MONTHS_AHEAD
+    with engine.connect() as connection:
+        try:
+            result = partitioning.partition_appointments(connection, months_ahead=months_ahead)
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+        print(
+            f"Tabela particionada: {result['rows']} agendamentos em {result['partitions']} partições mensais "
+            f"({result['first_month']:%Y-%m} a {result['last_month']:%Y-%m}) + default."
+        )
+        _print_partitions(connection)
+    return 0
+
+
+def maintain_partitions_command(args: argparse.Namespace) -> int:
+    """Cria as partições futuras e, com --archive, arquiva os meses antigos."""
+    from app.core.config import settings
+    from app.db import partitioning
+    from app.db.session import engine
+
+    months_ahead = args.months_ahead if args.months_ahead is not None else settings.APPOINTMENT_PARTITION_MONTHS_AHEAD
+    with engine.connect() as connection:
+        if not partitioning.is_partitioned(connection):
+            print("A tabela appointments não está particionada (rode `python manage.py partition-appointments`).", file=sys.stderr)
+            return 1
+        created = partitioning.ensure_partitions(connection, months_ahead=months_ahead)
+        print(f"Partições criadas: {', '.join(created) if created else 'nenhuma'}")
+        if args.archive:
+            try:
+                archived = partitioning.archive_partitions(
+                    connection,
+                    older_than_months=args.older_than_months or settings.APPOINTMENT_ARCHIVE_AFTER_MONTHS,
+                    mode=args.mode or settings.APPOINTMENT_ARCHIVE_MODE,
+                    archive_dir=args.archive_dir or settings.APPOINTMENT_ARCHIVE_DIR,
+                )
+            except ValueError as e:
+                print(f"Erro: {e}", file=sys.stderr)
+                return 1
+            for item in archived:
+                destination = item.get("file") or f"{partitioning.ARCHIVE_SCHEMA}.{item['name']}"
+                print(f"Arquivada: {item['name']} -> {destination}")
+            if not archived:
+                print("Nenhuma partição antiga para arquivar.")
+        _print_partitions(connection)
+    return 0
+
+
+def archive_appointments_command(args: argparse.Namespace) -> int:
+    """Move agendamentos finalizados antigos para o arquivo frio (JSON-lines gzip) e os apaga da tabela."""
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.services import appointment_archive_service
+
+    older_than_days = args.older_than_days if args.older_than_days is not None else settings.COLD_STORAGE_AFTER_DAYS
+    db = SessionLocal()
+    try:
+        result = appointment_archive_service.archive_old_appointments(
+            db,
+            older_than_days=older_than_days,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    if args.dry_run:
+        print(f"{result['archived']} agendamentos seriam arquivados (mais antigos que {older_than_days} dias).")
+    else:
+        print(f"{result['archived']} agendamentos arquivados em {result['files']} arquivos mensais em {settings.COLD_STORAGE_DIR}.")
+    return 0
+
+
+def backfill_customers_command(args: argparse.Namespace) -> int:
+    """Preenche o diretório de clientes a partir dos agendamentos ainda sem customer_id."""
+    import time
+
+    from app.db.session import SessionLocal, init_db
+    from app.services import customer_service
+
+    init_db() # Garante a tabela customers e a coluna appointments.customer_id
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = customer_service.backfill_customers(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"{result['appointments']} agendamentos vinculados a {result['customers']} clientes em {elapsed:.1f}s.")
+    return 0
+
+
+def close_past_appointments_command(args: argparse.Namespace) -> int:
+    """Aplica uma vez a política de agendamentos passados de cada estabelecimento (o scheduler faz isso a cada ciclo)."""
+    from app.db.session import SessionLocal
+    from app.services import past_appointment_service
+
+    db = SessionLocal()
+    try:
+        totals = past_appointment_service.close_past_appointments(
+            db, grace_minutes=args.grace_minutes, chunk_size=args.chunk_size
+        )
+    finally:
+        db.close()
+    print(f"{sum(totals.values())} agendamentos fechados: {totals}")
+    return 0
+
+
+def rebuild_stats_command(args: argparse.Namespace) -> int:
+    """Recalcula o rollup de estatísticas a partir dos agendamentos (tabela, partições desanexadas e arquivo frio)."""
+    import time
+    from datetime import date
+
+    from app.db.session import SessionLocal, init_db
+    from app.services import stats_service
+
+    init_db() # Garante a tabela appointment_daily_stats
+    since = date.fromisoformat(args.since) if args.since else None
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = stats_service.rebuild(db, establishment_id=args.establishment_id, since=since)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"Rollup recalculado: {result['establishments']} estabelecimentos, {result['rows']} linhas em {elapsed:.1f}s.")
+    if result["frozen_until"]:
+        print(f"Dias antes de {result['frozen_until']:%Y-%m-%d %H:%M} UTC (partições exportadas) mantidos como estavam.")
+    return 0
+
+
+def check_stats_command(args: argparse.Namespace) -> int:
+    """Compara o rollup de estatísticas com a contagem dos agendamentos; sai com 1 se houver diferença."""
+    from datetime import date
+
+    from app.db.session import SessionLocal, init_db
+    from app.services import stats_service
+
+    init_db() # Registra todos os modelos e garante a tabela appointment_daily_stats
+    since = date.fromisoformat(args.since) if args.since else None
+    db = SessionLocal()
+    try:
+        differences = stats_service.find_differences(db, establishment_id=args.establishment_id, since=since)
+    finally:
+        db.close()
+    if not differences:
+        print("Rollup consistente com os agendamentos.")
+        return 0
+    print(f"{'estab.':>8}{'prof.':>8}{'serviço':>9}  {'dia':<12}{'status':<28}{'rollup':>8}{'esperado':>10}")
+    for item in differences[:args.limit]:
+        print(
+            f"{item['establishment_id']:>8}{item['professional_id']:>8}{item['service_id']:>9}  {item['day'].isoformat():<12}"
+            f"{item['status'].value:<28}{item['count']:>8}{item['expected']:>10}"
+        )
+    if len(differences) > args.limit:
+        print(f"... e mais {len(differences) - args.limit}.")
+    print(f"{len(differences)} diferenças. Para corrigir: python manage.py rebuild-stats", file=sys.stderr)
+    return 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Comandos administrativos do Orkestre Backend.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_db_parser = subparsers.add_parser("init-db", help="Cria as tabelas do banco de dados.")
+    init_db_parser.set_defaults(func=init_db_command)
+
+    serve_parser = subparsers.add_parser("serve", help="Sobe o servidor de produção com múltiplos workers.")
+    serve_parser.add_argument("--workers", type=int, default=None, help="Número de workers (padrão: um por núcleo).")
+    serve_parser.add_argument("--bind", default=None, help="Endereço:porta (padrão: SERVER_BIND).")
+    serve_parser.add_argument("--preload", dest="preload", action="store_true", default=None, help="Importa o app no master antes do fork.")
+    serve_parser.add_argument("--no-preload", dest="preload", action="store_false", help="Cada worker importa o app sozinho.")
+    serve_parser.set_defaults(func=serve_command)
+
+    generate_parser = subparsers.add_parser("generate-data", help="Gera tenants sintéticos para testes de escala.")
+    generate_parser.add_argument("--establishments", type=int, default=100, help="Quantidade de estabelecimentos.")
+    generate_parser.add_argument("--appointments-per-establishment", type=int, default=1000, help="Agendamentos por estabelecimento.")
+    generate_parser.add_argument("--seed", type=int, default=42, help="Seed do gerador (mesma seed + mesma âncora = mesmos dados).")
+    generate_parser.add_argument("--anchor-date", default=None, help="Data de referência YYYY-MM-DD (padrão: hoje).")
+    generate_parser.add_argument("--history-days", type=int, default=365, help="Dias de histórico antes da âncora.")
+    generate_parser.add_argument("--future-days", type=int, default=60, help="Dias de agenda futura depois da âncora.")
+    generate_parser.add_argument("--method", choices=["auto", "copy", "executemany"], default="auto", help="COPY (PostgreSQL) ou INSERT em lote.")
+    generate_parser.add_argument("--batch-size", type=int, default=50_000, help="Linhas acumuladas antes de cada descarga.")
+    generate_parser.set_defaults(func=generate_data_command)
+
+    partition_parser = subparsers.add_parser("partition-appointments", help="Converte appointments em tabela particionada por mês (PostgreSQL).")
+    partition_parser.add_argument("--months-ahead", type=int, default=None, help="Meses futuros já criados (padrão: APPOINTMENT_PARTITION_MONTHS_AHEAD).")
+    partition_parser.set_defaults(func=partition_appointments_command)
+
+    maintain_parser = subparsers.add_parser("maintain-partitions", help="Cria partições futuras e arquiva as antigas.")
+    maintain_parser.add_argument("--months-ahead", type=int, default=None, help="Meses futuros mantidos criados.")
+    maintain_parser.add_argument("--archive", action="store_true", help="Arquiva as partições antigas.")
+    maintain_parser.add_argument("--older-than-months", type=int, default=None, help="Idade mínima (meses) para arquivar (padrão: APPOINTMENT_ARCHIVE_AFTER_MONTHS).")
+    maintain_parser.add_argument("--mode", choices=["detach", "export"], default=None, help="detach: move para o schema de arquivo; export: CSV gzip + DROP.")
+    maintain_parser.add_argument("--archive-dir", default=None, help="Diretório dos arquivos exportados (padrão: APPOINTMENT_ARCHIVE_DIR).")
+    maintain_parser.set_defaults(func=maintain_partitions_command)
+
+    archive_parser = subparsers.add_parser("archive-appointments", help="Move agendamentos finalizados antigos para o arquivo frio.")
+    archive_parser.add_argument("--older-than-days", type=int, default=None, help="Idade mínima em dias (padrão: COLD_STORAGE_AFTER_DAYS).")
+    archive_parser.add_argument("--batch-size", type=int, default=5000, help="Agendamentos por lote (um commit por lote).")
+    archive_parser.add_argument("--dry-run", action="store_true", help="Só conta o que seria arquivado.")
+    archive_parser.set_defaults(func=archive_appointments_command)
+
+    backfill_parser = subparsers.add_parser("backfill-customers", help="Cria o diretório de clientes a partir dos agendamentos existentes.")
+    backfill_parser.add_argument("--batch-size", type=int, default=5000, help="Agendamentos por lote (um commit por lote).")
+    backfill_parser.set_defaults(func=backfill_customers_command)
+
+    close_parser = subparsers.add_parser("close-past-appointments", help="Conclui/marca não-comparecimento nos agendamentos passados, pela política de cada estabelecimento.")
+    close_parser.add_argument("--grace-minutes", type=int, default=None, help="Folga após o fim do atendimento (padrão: PAST_APPOINTMENT_GRACE_MINUTES).")
+    close_parser.add_argument("--chunk-size", type=int, default=None, help="Agendamentos por UPDATE (padrão: PAST_APPOINTMENT_CHUNK_SIZE).")
+    close_parser.set_defaults(func=close_past_appointments_command)
+
+    rebuild_stats_parser = subparsers.add_parser("rebuild-stats", help="Recalcula o rollup de estatísticas (backfill).")
+    rebuild_stats_parser.add_argument("--establishment-id", type=int, default=None, help="Só este estabelecimento (padrão: todos).")
+    rebuild_stats_parser.add_argument("--since", default=None, help="Só os dias a partir de YYYY-MM-DD (padrão: todo o histórico).")
+    rebuild_stats_parser.set_defaults(func=rebuild_stats_command)
+
+    check_stats_parser = subparsers.add_parser("check-stats", help="Confere o rollup de estatísticas contra os agendamentos.")
+    check_stats_parser.add_argument("--establishment-id", type=int, default=None, help="Só este estabelecimento (padrão: todos).")
+    check_stats_parser.add_argument("--since", default=None, help="Só os dias a partir de YYYY-MM-DD (padrão: todo o histórico).")
+    check_stats_parser.add_argument("--limit", type=int, default=50, help="Diferenças listadas (o total é sempre informado).")
+    check_stats_parser.set_defaults(func=check_stats_command)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
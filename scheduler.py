@@ -4,7 +4,10 @@ import pytz
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.db import partitioning
+from app.services import past_appointment_service, waitlist_service
 # Importamos a função da tarefa DIRETAMENTE
 from app.tasks import send_whatsapp_reminder
 # Importamos os modelos necessários para a query
@@ -62,8 +65,58 @@ def schedule_and_send_reminders():
     finally:
         db.close()
 
+def maintain_appointment_partitions():
+    """
+    Garante que as partições mensais dos próximos meses já existam (sem efeito se a tabela
+    não estiver particionada). Barato: só cria algo na virada do mês.
+    """
+    try:
+        with engine.connect() as connection:
+            created = partitioning.ensure_partitions(
+                connection, months_ahead=settings.APPOINTMENT_PARTITION_MONTHS_AHEAD
+            )
+        if created:
+            print(f"Partições de agendamentos criadas: {', '.join(created)}")
+    except Exception as e:
+        print(f"ERRO ao manter partições de agendamentos: {e}")
+
+def close_past_appointments():
+    """
+    Conclui ou marca como não-comparecimento os agendamentos que passaram do horário, conforme a
+    política de cada estabelecimento (UPDATEs em lote; nada muda para quem usa a política manual).
+    """
+    db: Session = SessionLocal()
+    try:
+        totals = past_appointment_service.close_past_appointments(db)
+        if any(totals.values()):
+            print(f"Agendamentos passados fechados: {totals}")
+    except Exception as e:
+        print(f"ERRO ao fechar agendamentos passados: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def resolve_waitlist_offers():
+    """
+    Fecha as reservas da lista de espera (confirmadas, canceladas ou vencidas) e as esperas cujo
+    período passou. Reserva vencida é cancelada e o horário vai para o próximo da fila.
+    """
+    db: Session = SessionLocal()
+    try:
+        totals = waitlist_service.resolve_offers(db)
+        if any(totals.values()):
+            print(f"Lista de espera atualizada: {totals}")
+    except Exception as e:
+        print(f"ERRO ao atualizar a lista de espera: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
 if __name__ == "__main__":
     while True:
+        maintain_appointment_partitions()
+        close_past_appointments()
+        resolve_waitlist_offers()
         schedule_and_send_reminders()
         sleep_interval = 600 # 10 minutos
         print(f"Agendador dormindo por {sleep_interval / 60} minutos...")